@@ -0,0 +1,80 @@
+import asyncio
+import random
+
+from async_exchange.algorithms.random_trader import DEFAULT_PRICE
+from async_exchange.orders import BUY, SELL
+from async_exchange.trader import MarketView, Trader
+
+# Number of price levels of each side in the ``MarketView``
+DEFAULT_DEPTH = 10
+
+
+class DecisionTrader(Trader):
+    """A trader whose decisions are made by a pure ``decide`` function.
+
+    ``decide`` takes a ``MarketView`` and returns a list of
+    ``(side, amount, price)`` orders, which the trader submits. As the
+    function gets everything it needs from the view, it can run in the
+    ``executor`` of the trader (e.g. the process pool of the
+    ``TradingSession``), while the orders are still matched in the event
+    loop. To be sent to another process, ``decide`` must be a module-level
+    function.
+    """
+
+    depth = DEFAULT_DEPTH
+
+    @staticmethod
+    def decide(view: MarketView) -> list:
+        raise NotImplementedError
+
+    async def sleep(self):
+        await asyncio.sleep(random.random() * 1.0)
+
+    async def cycle(self):
+        while True:
+            await self.sleep()
+            await self.make_decision()
+
+    async def make_decision(self) -> list:
+        """Run ``decide`` on the current market view, and submit the
+        resulting orders. Returns the list of fills."""
+        view = self.market_view(self.depth, seed=random.getrandbits(64))
+        orders = await self.run_decision(self.decide, view)
+        if not orders:
+            return []
+        return self.submit_many(orders)
+
+
+def random_orders(view: MarketView) -> list:
+    """The decision of ``RandomTrader.place_random_order`` as a function of
+    the market view."""
+    rng = random.Random(view.seed)
+    side = rng.choice((BUY, SELL))
+
+    best_buy = max(view.buy_levels, default=None)
+    best_sell = min(view.sell_levels, default=None)
+    if best_buy is None and best_sell is None:
+        max_stocks = view.money // DEFAULT_PRICE
+        if max_stocks == 0:
+            return []
+        return [(side, rng.randint(1, max_stocks), DEFAULT_PRICE)]
+
+    if best_buy is None:
+        best_buy = best_sell
+    if best_sell is None:
+        best_sell = best_buy
+
+    median_price = (best_buy + best_sell) // 2
+    deviation = int(median_price ** 0.5)
+    price = median_price + rng.randint(-deviation, deviation)
+    if side == BUY:
+        max_stocks = view.money // max(1, price)
+    else:
+        max_stocks = view.stocks
+    if max_stocks == 0:
+        return []
+    return [(side, rng.randint(1, max_stocks), price)]
+
+
+class RandomDecisionTrader(DecisionTrader):
+    decide = staticmethod(random_orders)
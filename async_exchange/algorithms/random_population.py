@@ -0,0 +1,143 @@
+import asyncio
+import logging
+
+import numpy as np
+
+from async_exchange.algorithms.random_trader import DEFAULT_PRICE
+from async_exchange.orders import BUY, ORDER_CLASSES
+from async_exchange.trader import (
+    NotEnoughMoneyError,
+    NotEnoughStocksError,
+    Trader,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TICK = 0.5
+
+
+class PopulationMember(Trader):
+    """A ``Trader`` whose money and stocks are stored in the arrays of a
+    ``RandomTraderPopulation``, and which trades through the exchange API of
+    the population."""
+
+    def __init__(self, population, index, money=100, stocks=10):
+        self._population = population
+        self._index = index
+        super().__init__(
+            exchange_api=population.exchange_api, money=money, stocks=stocks
+        )
+
+    @property
+    def exchange_api(self):
+        return self._population.exchange_api
+
+    @exchange_api.setter
+    def exchange_api(self, exchange_api):
+        if exchange_api is not self._population.exchange_api:
+            raise ValueError(
+                "A member of a population trades through the exchange API "
+                "of the population, register the population instead"
+            )
+
+    @property
+    def money(self):
+        return int(self._population.money[self._index])
+
+    @money.setter
+    def money(self, value):
+        if value < 0:
+            raise NotEnoughMoneyError
+        self._population.money[self._index] = value
+
+    @property
+    def stocks(self):
+        return int(self._population.stocks[self._index])
+
+    @stocks.setter
+    def stocks(self, value):
+        if value < 0:
+            raise NotEnoughStocksError
+        self._population.stocks[self._index] = value
+
+
+class RandomTraderPopulation:
+    """A population of ``size`` random traders acting together.
+
+    The money and stocks of the agents are kept in NumPy arrays. Every
+    ``tick``, each agent makes the decision of
+    ``RandomTrader.place_random_order``: all sides, prices and amounts are
+    drawn at once from a single vectorised RNG call, and the orders are
+    submitted as one batch in a random arrival order.
+
+    Unlike the per-object traders, all agents of a tick see the top of the
+    order book and their balances as of the beginning of the tick.
+
+    The population can be passed to the ``TradingSession`` as a trader.
+    """
+
+    def __init__(
+        self, size, money=100, stocks=10, tick=DEFAULT_TICK, seed=None
+    ):
+        self.exchange_api = None
+        self.tick = tick
+        self.rng = np.random.default_rng(seed)
+
+        self.money = np.empty(size, dtype=np.int64)
+        self.stocks = np.empty(size, dtype=np.int64)
+        self.members = [
+            PopulationMember(self, index, money=money, stocks=stocks)
+            for index in range(size)
+        ]
+
+    def __len__(self):
+        return len(self.members)
+
+    async def cycle(self):
+        while True:
+            await asyncio.sleep(self.tick)
+            self.step()
+
+    def step(self) -> list:
+        """Let every agent place a random order. Returns the list of fills
+        of the tick."""
+        size = len(self.members)
+        side_draws, price_draws, amount_draws, arrival_draws = self.rng.random(
+            (4, size)
+        )
+        sides = (side_draws >= 0.5).astype(np.int64)
+
+        best_buy, best_sell = self.exchange_api.best_bid_ask()
+        if best_buy is None and best_sell is None:
+            prices = np.full(size, DEFAULT_PRICE, dtype=np.int64)
+            max_stocks = self.money // DEFAULT_PRICE
+        else:
+            if best_buy is None:
+                best_buy = best_sell
+            if best_sell is None:
+                best_sell = best_buy
+
+            median_price = (best_buy + best_sell) // 2
+            deviation = int(median_price ** 0.5)
+            prices = (
+                median_price
+                - deviation
+                + (price_draws * (2 * deviation + 1)).astype(np.int64)
+            )
+            max_stocks = np.where(
+                sides == BUY,
+                self.money // np.maximum(1, prices),
+                self.stocks,
+            )
+
+        amounts = 1 + (amount_draws * max_stocks).astype(np.int64)
+        active = np.flatnonzero(max_stocks > 0)
+        active = active[np.argsort(arrival_draws[active])]
+
+        orders = [
+            ORDER_CLASSES[sides[index]](
+                self.members[index], int(amounts[index]), int(prices[index])
+            )
+            for index in active
+        ]
+        return self.exchange_api.process_orders(orders)
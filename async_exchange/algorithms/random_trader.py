@@ -24,20 +24,17 @@ class RandomTrader(Trader):
             await self.sleep()
             self.place_random_order()
 
+    def step(self):
+        self.place_random_order()
+        return random.random() * 1.0
+
     def place_random_order(self):
         buy_or_sell = RANDOM_CHOICE[random.randint(0, 1)]
 
-        existing_buy_orders, existing_sell_orders = self.inspect_exchange()
-        if len(existing_buy_orders) == 0 and len(existing_sell_orders) == 0:
+        best_buy, best_sell = self.exchange_api.best_bid_ask()
+        if best_buy is None and best_sell is None:
             return self.submit_order(buy_or_sell, price=None, amount=None)
 
-        best_buy = None
-        best_sell = None
-        if len(existing_buy_orders) != 0:
-            best_buy = max(existing_buy_orders)
-        if len(existing_sell_orders) != 0:
-            best_sell = min(existing_sell_orders)
-
         if best_buy is None:
             best_buy = best_sell
         if best_sell is None:
@@ -0,0 +1,669 @@
+"""An ``Exchange`` that keeps the standing orders in NumPy arrays.
+
+Requires the optional ``numpy`` dependency.
+"""
+from array import array
+from functools import partial
+import logging
+import operator
+import time
+from weakref import WeakValueDictionary
+
+import numpy as np
+
+from async_exchange.exchange import Exchange, Fill, PriceLevels
+from async_exchange.orders import BUY, ORDER_CLASSES, _Order
+from async_exchange.trader import (
+    NotEnoughMoneyError,
+    NotEnoughStocksError,
+    Trader,
+)
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.ERROR)
+
+NO_SLOT = -1
+# Owner links of the orders restored from a snapshot, which are not linked
+# to the other orders of their owner
+RESTORED = -2
+DEFAULT_CAPACITY = 1024
+
+
+class OrderArrays:
+    """Typed arrays of 64-bit integers describing the standing orders, one
+    slot per order.
+
+    The columns are ``array.array``s, whose items are read as Python ints,
+    so the matching loop does not create a NumPy scalar per access. Bulk
+    operations view them as NumPy arrays (``numpy.frombuffer``); the views
+    must be dropped before the arrays grow.
+
+    Released slots are chained into a free list through the ``next`` array
+    and reused by the following allocations, before the slots never used.
+    When no slot is left, the capacity of the arrays is doubled.
+    """
+
+    FIELDS = (
+        "order_id",
+        "side",
+        "price",
+        "amount",
+        "owner",
+        "timestamp",
+        # Neighbours in the price level
+        "prev",
+        "next",
+        # Neighbours in the list of the owner's orders
+        "owner_prev",
+        "owner_next",
+    )
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = 0
+        for name in self.FIELDS:
+            setattr(self, name, array("q"))
+        self._free_head = NO_SLOT
+        # Number of slots used at least once
+        self._used = 0
+        self._grow(max(1, capacity))
+
+    @classmethod
+    def from_columns(cls, columns: dict, count: int):
+        """New arrays whose first ``count`` slots hold the ``columns``, a
+        dict mapping every field to a contiguous buffer of ``count`` 64-bit
+        integers."""
+        arrays = cls.__new__(cls)
+        arrays._free_head = NO_SLOT
+        for name in cls.FIELDS:
+            column = array("q")
+            column.frombytes(memoryview(columns[name]).cast("B"))
+            setattr(arrays, name, column)
+        arrays.capacity = arrays._used = count
+        return arrays
+
+    def _grow(self, capacity):
+        zeros = bytes(8 * (capacity - self.capacity))
+        for name in self.FIELDS:
+            getattr(self, name).frombytes(zeros)
+        self.capacity = capacity
+
+    def allocate(self) -> int:
+        slot = self._free_head
+        if slot != NO_SLOT:
+            self._free_head = self.next[slot]
+            return slot
+        if self._used == self.capacity:
+            self._grow(2 * self.capacity)
+        slot = self._used
+        self._used += 1
+        return slot
+
+    def release(self, slot: int):
+        # No order has the id 0, which marks the slot as free
+        self.order_id[slot] = 0
+        self.next[slot] = self._free_head
+        self._free_head = slot
+
+    def view(self, name):
+        """A NumPy view of the ``name`` column."""
+        return np.frombuffer(getattr(self, name), dtype=np.int64)
+
+
+def _check_integers(*values):
+    for value in values:
+        try:
+            operator.index(value)
+        except TypeError:
+            raise TypeError(
+                "The prices and amounts of an ArrayExchange must be"
+                f" integers, got {value!r}"
+            ) from None
+
+
+class ArrayLevel:
+    """FIFO queue of the orders standing at a single price, linked through
+    the ``prev``/``next`` slots of the exchange's ``OrderArrays``.
+
+    Iterating over the level yields the order objects, like for ``Level``.
+    """
+
+    def __init__(self, exchange):
+        self._exchange = exchange
+        self._arrays = exchange._arrays
+        self.head = NO_SLOT
+        self.tail = NO_SLOT
+        self.volume = 0
+        self._length = 0
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        slot = self.head
+        while slot != NO_SLOT:
+            yield self._exchange._order_at(slot)
+            slot = self._arrays.next[slot]
+
+    def __repr__(self):
+        return f"ArrayLevel({list(self)!r})"
+
+    def append(self, slot: int):
+        arrays = self._arrays
+        arrays.prev[slot] = self.tail
+        arrays.next[slot] = NO_SLOT
+        if self.tail == NO_SLOT:
+            self.head = slot
+        else:
+            arrays.next[self.tail] = slot
+        self.tail = slot
+        self.volume += arrays.amount[slot]
+        self._length += 1
+
+    def popleft(self) -> int:
+        slot = self.head
+        if slot == NO_SLOT:
+            raise IndexError("pop from an empty ArrayLevel")
+        self.remove(slot)
+        return slot
+
+    def remove(self, slot: int):
+        """Unlink the ``slot``, which must be standing in this level."""
+        arrays = self._arrays
+        prev_slot = arrays.prev[slot]
+        next_slot = arrays.next[slot]
+        if prev_slot == NO_SLOT:
+            self.head = next_slot
+        else:
+            arrays.next[prev_slot] = next_slot
+        if next_slot == NO_SLOT:
+            self.tail = prev_slot
+        else:
+            arrays.prev[next_slot] = prev_slot
+        self.volume -= arrays.amount[slot]
+        self._length -= 1
+
+
+class ArrayExchange(Exchange):
+    """An ``Exchange`` storing prices, amounts, owner ids and timestamps of
+    the standing orders in preallocated typed arrays (``OrderArrays``)
+    instead of keeping an object per order.
+
+    Order objects are only handles: the exchange keeps weak references to
+    them, and creates a new handle when a standing order is read (e.g. via
+    ``standing_orders`` or by iterating over a price level) and nobody holds
+    one. The amounts of the live handles are kept in sync with the arrays.
+
+    Prices and amounts must be integers, or else a ``TypeError`` is
+    raised when the order is submitted or amended.
+
+    The matching loop is not faster than the one of the ``Exchange``
+    (see ``benchmarks/matching_engine.py``): the engine is meant for large
+    books, which are snapshotted and restored with vectorized operations,
+    without an object per order.
+    """
+
+    def __init__(
+        self,
+        logger=None,
+        capacity=DEFAULT_CAPACITY,
+        instrument=False,
+        journal=None,
+    ):
+        super().__init__(
+            logger=logger, instrument=instrument, journal=journal
+        )
+        self._arrays = OrderArrays(capacity)
+
+        new_level = partial(ArrayLevel, self)
+        self.buy_levels = PriceLevels(reverse=True, level_factory=new_level)
+        self.sell_levels = PriceLevels(level_factory=new_level)
+        self._levels = (self.buy_levels, self.sell_levels)
+
+        # Order id -> slot of the standing orders, except the restored ones
+        self._slots = {}
+        # Sorted ids of the orders restored from a snapshot, their slots,
+        # and the next order id when they were restored
+        self._restored_ids = None
+        self._restored_slots = None
+        self._restored_next_id = None
+        # The restored slots of each owner, grouped on demand
+        self._restored_owner_slots = None
+        self._handles = WeakValueDictionary()
+
+        self._owners = []
+        self._owner_ids = {}
+        # Heads and tails of the lists of the owners' standing orders,
+        # indexed by the owner id
+        self._owner_heads = []
+        self._owner_tails = []
+
+    def process_order(self, order):
+        _check_integers(order.price, order.amount)
+        super().process_order(order)
+
+    def process_orders(self, orders) -> list:
+        orders = list(orders)
+        for order in orders:
+            _check_integers(order.price, order.amount)
+        return super().process_orders(orders)
+
+    def _owner_id(self, trader: Trader) -> int:
+        owner_id = self._owner_ids.get(trader)
+        if owner_id is None:
+            owner_id = self._owner_ids[trader] = len(self._owners)
+            self._owners.append(trader)
+            self._owner_heads.append(NO_SLOT)
+            self._owner_tails.append(NO_SLOT)
+        return owner_id
+
+    def _order_at(self, slot: int) -> _Order:
+        """Get the handle of the order standing in the ``slot``."""
+        arrays = self._arrays
+        order_id = arrays.order_id[slot]
+        order = self._handles.get(order_id)
+        if order is None:
+            order = ORDER_CLASSES[arrays.side[slot]](
+                self._owners[arrays.owner[slot]],
+                arrays.amount[slot],
+                arrays.price[slot],
+            )
+            order._id = order_id
+            self._handles[order_id] = order
+        return order
+
+    def _set_amount(self, slot: int, amount: int):
+        self._arrays.amount[slot] = amount
+        order = self._handles.get(self._arrays.order_id[slot])
+        if order is not None:
+            order.amount = amount
+
+    def _add_order(self, order: _Order, levels: PriceLevels):
+        arrays = self._arrays
+        owner_id = self._owner_id(order.owner)
+        slot = arrays.allocate()
+        arrays.order_id[slot] = order.id
+        arrays.side[slot] = order.side
+        arrays.price[slot] = order.price
+        arrays.amount[slot] = order.amount
+        arrays.owner[slot] = owner_id
+        arrays.timestamp[slot] = time.monotonic_ns()
+
+        levels[order.price].append(slot)
+        levels.index_price(order.price)
+        if self._feed is not None:
+            self._feed.level_changed(order.side, order.price)
+
+        owner_tail = self._owner_tails[owner_id]
+        arrays.owner_prev[slot] = owner_tail
+        arrays.owner_next[slot] = NO_SLOT
+        if owner_tail == NO_SLOT:
+            self._owner_heads[owner_id] = slot
+        else:
+            arrays.owner_next[owner_tail] = slot
+        self._owner_tails[owner_id] = slot
+
+        self._slots[order.id] = slot
+        self._handles[order.id] = order
+
+    def _snapshot_orders(self):
+        arrays = self._arrays
+        next_slots = arrays.next
+        slots = array("q")
+        append = slots.append
+        for levels in self._levels:
+            for level in levels.values():
+                slot = level.head
+                while slot != NO_SLOT:
+                    append(slot)
+                    slot = next_slots[slot]
+        slots = np.frombuffer(slots, dtype=np.int64)
+        orders = {
+            name: arrays.view(name)[slots]
+            for name in ("order_id", "price", "amount", "owner")
+        }
+        orders["side"] = arrays.view("side")[slots].astype(np.int8)
+        return orders, list(self._owners)
+
+    def _restore_orders(self, snapshot, owners: list):
+        """Build new arrays from the columns of the ``snapshot``, and link
+        the slots of the price levels with vectorized operations.
+
+        The restored orders are not linked to the lists of their owners:
+        they are looked up by their ids in a sorted array (see
+        ``_slot_of``), grouped by owner only when first needed (see
+        ``_restored_slots_of``), and their handles are created when read.
+        """
+        self._owners = list(owners)
+        self._owner_ids = {owner: index for index, owner in enumerate(owners)}
+        self._owner_heads = [NO_SLOT] * len(owners)
+        self._owner_tails = [NO_SLOT] * len(owners)
+        count = snapshot.order_count
+        if count == 0:
+            return
+        if snapshot.orders["price"].format != "q":
+            raise TypeError("The prices of an ArrayExchange must be integers")
+
+        columns = {
+            name: np.frombuffer(snapshot.orders[name], dtype=np.int64)
+            for name in ("order_id", "price", "amount", "owner")
+        }
+        side = np.frombuffer(snapshot.sides, dtype=np.int8)
+        columns["side"] = side.astype(np.int64)
+        columns["timestamp"] = np.full(count, time.monotonic_ns())
+        columns["owner_prev"] = columns["owner_next"] = np.full(
+            count, RESTORED
+        )
+
+        # The price levels are runs of consecutive slots
+        price = columns["price"]
+        level_start = np.ones(count, dtype=bool)
+        level_start[1:] = (side[1:] != side[:-1]) | (price[1:] != price[:-1])
+        starts = np.flatnonzero(level_start)
+        ends = np.append(starts[1:], count) - 1
+        columns["next"] = next_slots = np.arange(1, count + 1)
+        next_slots[ends] = NO_SLOT
+        columns["prev"] = prev_slots = np.arange(-1, count - 1)
+        prev_slots[starts] = NO_SLOT
+        volumes = np.add.reduceat(columns["amount"], starts)
+
+        # The ids in their order, and their slots, scattered over the range
+        # of the ids when it is dense enough, instead of sorted
+        order_id = columns["order_id"]
+        if snapshot.next_order_id <= 4 * count:
+            positions = np.full(snapshot.next_order_id, NO_SLOT)
+            positions[order_id] = np.arange(count)
+            self._restored_ids = np.flatnonzero(positions != NO_SLOT)
+            self._restored_slots = positions[self._restored_ids]
+        else:
+            self._restored_slots = np.argsort(order_id)
+            self._restored_ids = order_id[self._restored_slots]
+        self._restored_next_id = snapshot.next_order_id
+        self._restored_owner_slots = None
+
+        self._arrays = OrderArrays.from_columns(columns, count)
+        for start, end, volume in zip(
+            starts.tolist(), ends.tolist(), volumes.tolist()
+        ):
+            levels = self._levels[side[start]]
+            level_price = int(price[start])
+            level = levels[level_price]
+            level.head = start
+            level.tail = end
+            level.volume = volume
+            level._length = end - start + 1
+            levels.index_price(level_price)
+
+    def _slot_of(self, order_id: int):
+        """The slot of the standing order with the ``order_id``, or
+        ``None``."""
+        slot = self._slots.get(order_id)
+        if slot is None and self._restored_ids is not None:
+            restored_ids = self._restored_ids
+            index = int(restored_ids.searchsorted(order_id))
+            if index == len(restored_ids) or restored_ids[index] != order_id:
+                return None
+            slot = int(self._restored_slots[index])
+            # The slot was released since, and maybe reused
+            if self._arrays.order_id[slot] != order_id:
+                return None
+        return slot
+
+    def _restored_slots_of(self, owner_id: int) -> list:
+        """The slots of the restored orders of the owner still standing, in
+        the order of their ids. The restored slots are grouped by owner
+        the first time."""
+        if self._restored_ids is None:
+            return []
+        restored_owner_slots = self._restored_owner_slots
+        # The owners registered since have no restored orders
+        if (
+            restored_owner_slots is not None
+            and owner_id >= len(restored_owner_slots)
+        ):
+            return []
+        if self._restored_owner_slots is None:
+            slots = self._restored_slots
+            standing = self._arrays.view("order_id")[slots] == (
+                self._restored_ids
+            )
+            slots = slots[standing]
+            owner = self._arrays.view("owner")[slots]
+            # The stable sort of 16-bit integers is a radix sort
+            if len(self._owners) <= np.iinfo(np.uint16).max:
+                owner = owner.astype(np.uint16)
+            slots = slots[np.argsort(owner, kind="stable")]
+            ends = np.cumsum(np.bincount(owner, minlength=len(self._owners)))
+            self._restored_owner_slots = np.split(slots, ends[:-1])
+
+        # The restored ids are below the ids of the orders added since
+        order_ids = self._arrays.order_id
+        next_id = self._restored_next_id
+        return [
+            slot
+            for slot in self._restored_owner_slots[owner_id].tolist()
+            if 0 < order_ids[slot] < next_id
+        ]
+
+    def _discard_slot(self, slot: int):
+        """Remove the order in the ``slot`` from the owner's list and the
+        index of standing orders, and release the slot."""
+        arrays = self._arrays
+        owner_id = arrays.owner[slot]
+        prev_slot = arrays.owner_prev[slot]
+        if prev_slot == RESTORED:
+            # Neither linked nor indexed in ``_slots``: releasing the slot
+            # removes the restored order
+            arrays.release(slot)
+            return
+        next_slot = arrays.owner_next[slot]
+        if prev_slot == NO_SLOT:
+            self._owner_heads[owner_id] = next_slot
+        else:
+            arrays.owner_next[prev_slot] = next_slot
+        if next_slot == NO_SLOT:
+            self._owner_tails[owner_id] = prev_slot
+        else:
+            arrays.owner_prev[next_slot] = prev_slot
+
+        del self._slots[arrays.order_id[slot]]
+        arrays.release(slot)
+
+    def _unlink_slot(self, slot: int):
+        side = self._arrays.side[slot]
+        levels = self._levels[side]
+        price = self._arrays.price[slot]
+        level = levels[price]
+        level.remove(slot)
+        if len(level) == 0:
+            levels.remove_level(price)
+        if self._feed is not None:
+            self._feed.level_changed(side, price)
+
+    def _match_order(
+        self,
+        order: _Order,
+        levels: PriceLevels,
+        opposite_levels: PriceLevels,
+        fills: list = None,
+    ):
+        arrays = self._arrays
+        is_buy = order.side == BUY
+        sign = 1 if is_buy else -1
+        opposite_side = 1 - order.side
+        feed = self._feed
+        stats = self._stats
+        while order.amount > 0:
+            best_price = opposite_levels.best_price
+            if best_price is None or sign * (order.price - best_price) < 0:
+                self._add_order(order, levels)
+                return
+
+            level = opposite_levels[best_price]
+            slot = level.head
+            matched_owner = self._owners[arrays.owner[slot]]
+            matched_amount = arrays.amount[slot]
+            if is_buy:
+                buyer, seller = order.owner, matched_owner
+            else:
+                buyer, seller = matched_owner, order.owner
+
+            stocks_to_transfer = min(order.amount, matched_amount)
+            money_to_transfer = stocks_to_transfer * best_price
+
+            new_matched_amount = matched_amount
+            try:
+                self._exchange_assets(
+                    buyer, seller, stocks_to_transfer, money_to_transfer
+                )
+            except NotEnoughMoneyError:
+                if stats is not None:
+                    stats.money_retries += 1
+                logger.warning(
+                    f"Could not complete exchange: buyer {buyer}"
+                    " does not have enough money. Adjusting the buyer's order"
+                    " and retrying the exchange."
+                )
+                buyer_can_afford = int(buyer.money / best_price)
+                if is_buy:
+                    order.amount = buyer_can_afford
+                else:
+                    new_matched_amount = buyer_can_afford
+            except NotEnoughStocksError:
+                if stats is not None:
+                    stats.stock_retries += 1
+                logger.warning(
+                    f"Could not complete exchange: seller {seller}"
+                    " does not have enough stocks. Adjusting the seller's"
+                    " order and retrying the exchange."
+                )
+                if is_buy:
+                    new_matched_amount = seller.stocks
+                else:
+                    order.amount = seller.stocks
+            else:
+                order.amount -= stocks_to_transfer
+                new_matched_amount -= stocks_to_transfer
+                if stats is not None:
+                    stats.fills += 1
+                self._last_trade = (best_price, stocks_to_transfer)
+                if fills is not None:
+                    matched_id = arrays.order_id[slot]
+                    if is_buy:
+                        buy_id, sell_id = order.id, matched_id
+                    else:
+                        buy_id, sell_id = matched_id, order.id
+                    fills.append(
+                        Fill(buy_id, sell_id, best_price, stocks_to_transfer)
+                    )
+
+            if new_matched_amount != matched_amount:
+                self._set_amount(slot, new_matched_amount)
+                level.volume += new_matched_amount - matched_amount
+                if feed is not None:
+                    feed.level_changed(opposite_side, best_price)
+            if new_matched_amount <= 0:
+                level.popleft()
+                self._discard_slot(slot)
+                if len(level) == 0:
+                    opposite_levels.remove_level(best_price)
+
+    def cancel_order(self, order: _Order) -> bool:
+        """ Cancel the given ``order`` by removing it from the OrderBook.
+        The order is identified by its ``id``. If the order's price level
+        becomes empty, the level is removed from the OrderBook.
+        """
+        slot = self._slot_of(order.id)
+        if slot is None:
+            return False
+
+        self._unlink_slot(slot)
+        self._discard_slot(slot)
+        self._book_changed()
+        return True
+
+    def cancel_all(self, trader: Trader) -> int:
+        """ Cancel all standing orders of the ``trader``. Returns the number
+        of cancelled orders.
+        """
+        owner_id = self._owner_ids.get(trader)
+        if owner_id is None:
+            return 0
+
+        arrays = self._arrays
+        cancelled = 0
+        for slot in self._restored_slots_of(owner_id):
+            self._unlink_slot(slot)
+            arrays.release(slot)
+            cancelled += 1
+        slot = self._owner_heads[owner_id]
+        while slot != NO_SLOT:
+            next_slot = arrays.owner_next[slot]
+            self._unlink_slot(slot)
+            del self._slots[arrays.order_id[slot]]
+            arrays.release(slot)
+            cancelled += 1
+            slot = next_slot
+        self._owner_heads[owner_id] = NO_SLOT
+        self._owner_tails[owner_id] = NO_SLOT
+        self._book_changed()
+        return cancelled
+
+    def amend_order(self, order: _Order, amount: int) -> bool:
+        """ Change the ``amount`` of the given standing ``order``.
+        Reducing the amount keeps the order's time priority, increasing it
+        moves the order to the back of its price level, and a non-positive
+        amount cancels the order. Returns ``False`` if the order is not in
+        the OrderBook.
+        """
+        _check_integers(amount)
+        slot = self._slot_of(order.id)
+        if slot is None:
+            return False
+        if amount <= 0:
+            return self.cancel_order(order)
+
+        arrays = self._arrays
+        side = arrays.side[slot]
+        price = arrays.price[slot]
+        level = self._levels[side][price]
+        current_amount = arrays.amount[slot]
+        if amount > current_amount:
+            level.remove(slot)
+            self._set_amount(slot, amount)
+            level.append(slot)
+        else:
+            level.volume += amount - current_amount
+            self._set_amount(slot, amount)
+        if self._feed is not None:
+            self._feed.level_changed(side, price)
+        self._book_changed()
+        return True
+
+    def get_order(self, order_id: int):
+        """Get the standing order with the ``order_id``, or ``None``."""
+        slot = self._slot_of(order_id)
+        if slot is None:
+            return None
+        return self._order_at(slot)
+
+    def standing_orders(self, trader):
+        """Get two tuples of the standing buy and sell orders of the
+        ``trader``, in the order of their submission.
+        """
+        buy_orders = []
+        sell_orders = []
+        owner_id = self._owner_ids.get(trader)
+        if owner_id is not None:
+            arrays = self._arrays
+            slots = self._restored_slots_of(owner_id)
+            slot = self._owner_heads[owner_id]
+            while slot != NO_SLOT:
+                slots.append(slot)
+                slot = arrays.owner_next[slot]
+            for slot in slots:
+                order = self._order_at(slot)
+                if order.side == BUY:
+                    buy_orders.append(order)
+                else:
+                    sell_orders.append(order)
+        return tuple(buy_orders), tuple(sell_orders)
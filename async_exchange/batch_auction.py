@@ -0,0 +1,183 @@
+import logging
+
+from async_exchange.exchange import Exchange, Fill
+from async_exchange.orders import _Order
+from async_exchange.trader import NotEnoughMoneyError, NotEnoughStocksError
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.ERROR)
+
+
+class BatchAuctionExchange(Exchange):
+    """An ``Exchange`` matching orders in discrete-time batch auctions.
+
+    Submitted orders are added to the order book without being matched, so
+    the book may be crossed between the auctions. Every ``run_auction``
+    computes a single clearing price from the aggregated demand and supply
+    curves, and fills all crossing orders at that price at once.
+    """
+
+    def __init__(self, logger=None, instrument=False, journal=None):
+        super().__init__(
+            logger=logger, instrument=instrument, journal=journal
+        )
+        self.last_clearing_price = None
+
+    def process_order(self, order: _Order):
+        if self._stats is not None:
+            self._stats.orders += 1
+        if order.amount == 0:
+            return
+
+        order._id = next(self._order_ids)
+        self._add_order(order, self._levels[order.side])
+        self._book_changed()
+
+    def process_orders(self, orders) -> list:
+        """Add a batch of ``orders`` to the order book until the next
+        auction. Returns an empty list, as the fills only happen in the
+        auction.
+        """
+        order_ids = self._order_ids
+        levels = self._levels
+        stats = self._stats
+        for order in orders:
+            if stats is not None:
+                stats.orders += 1
+            if order.amount == 0:
+                continue
+            order._id = next(order_ids)
+            self._add_order(order, levels[order.side])
+        self._book_changed()
+        return []
+
+    def clearing_price(self):
+        """Get the price maximising the executable volume of the crossing
+        orders, or ``None`` if the book is not crossed.
+
+        Among the prices with the same volume, the ones with the smallest
+        imbalance between the demand and the supply are preferred, and the
+        median of them is taken.
+        """
+        best_buy = self.best_buy
+        best_sell = self.best_sell
+        if best_buy is None or best_sell is None or best_buy < best_sell:
+            return None
+
+        buy_volumes = {
+            price: level.volume
+            for price, level in self.buy_levels.items()
+            if price >= best_sell
+        }
+        sell_volumes = {
+            price: level.volume
+            for price, level in self.sell_levels.items()
+            if price <= best_buy
+        }
+        prices = sorted(buy_volumes.keys() | sell_volumes.keys())
+
+        # Cumulative volumes of the buy orders at or above each price, and
+        # of the sell orders at or below it
+        demand = {}
+        cumulative_volume = 0
+        for price in reversed(prices):
+            cumulative_volume += buy_volumes.get(price, 0)
+            demand[price] = cumulative_volume
+        supply = {}
+        cumulative_volume = 0
+        for price in prices:
+            cumulative_volume += sell_volumes.get(price, 0)
+            supply[price] = cumulative_volume
+
+        def rank(price):
+            return (
+                min(demand[price], supply[price]),
+                -abs(demand[price] - supply[price]),
+            )
+
+        best_rank = max(rank(price) for price in prices)
+        best_prices = [price for price in prices if rank(price) == best_rank]
+        return best_prices[(len(best_prices) - 1) // 2]
+
+    def run_auction(self) -> list:
+        """Fill all crossing orders at the clearing price, in price-time
+        priority. Returns the list of ``Fill``s of the auction.
+        """
+        fills = []
+        price = self.clearing_price()
+        if price is None:
+            return fills
+
+        self.last_clearing_price = price
+        buy_levels = self.buy_levels
+        sell_levels = self.sell_levels
+        stats = self._stats
+        while True:
+            best_buy = buy_levels.best_price
+            best_sell = sell_levels.best_price
+            if best_buy is None or best_sell is None:
+                break
+            if best_buy < price or best_sell > price:
+                break
+
+            buy_order = buy_levels[best_buy].head
+            sell_order = sell_levels[best_sell].head
+            buy_amount = buy_order.amount
+            sell_amount = sell_order.amount
+            stocks_to_transfer = min(buy_amount, sell_amount)
+
+            try:
+                self._exchange_assets(
+                    buy_order.owner,
+                    sell_order.owner,
+                    stocks_to_transfer,
+                    stocks_to_transfer * price,
+                )
+            except NotEnoughMoneyError:
+                if stats is not None:
+                    stats.money_retries += 1
+                logger.warning(
+                    f"Could not complete exchange: buyer {buy_order.owner}"
+                    " does not have enough money. Adjusting the buyer's order"
+                    " and retrying the exchange."
+                )
+                buy_order.amount = int(buy_order.owner.money / price)
+            except NotEnoughStocksError:
+                if stats is not None:
+                    stats.stock_retries += 1
+                logger.warning(
+                    f"Could not complete exchange: seller {sell_order.owner}"
+                    " does not have enough stocks. Adjusting the seller's"
+                    " order and retrying the exchange."
+                )
+                sell_order.amount = sell_order.owner.stocks
+            else:
+                buy_order.amount -= stocks_to_transfer
+                sell_order.amount -= stocks_to_transfer
+                if stats is not None:
+                    stats.fills += 1
+                self._last_trade = (price, stocks_to_transfer)
+                fills.append(
+                    Fill(
+                        buy_order.id, sell_order.id, price, stocks_to_transfer
+                    )
+                )
+
+            self._settle_head(buy_levels, best_buy, buy_amount)
+            self._settle_head(sell_levels, best_sell, sell_amount)
+        self._book_changed(fills)
+        return fills
+
+    def _settle_head(self, levels, price, previous_amount):
+        """Account for the change of the amount of the first order of the
+        price level, and remove the order if it is exhausted."""
+        level = levels[price]
+        order = level.head
+        level.volume += order.amount - previous_amount
+        if self._feed is not None:
+            self._feed.level_changed(order.side, price)
+        if order.amount <= 0:
+            level.popleft()
+            self._discard_order(order)
+            if len(level) == 0:
+                levels.remove_level(price)
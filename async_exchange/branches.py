@@ -0,0 +1,100 @@
+"""Parallel what-if continuations of the state of an exchange.
+
+``run_branches`` forks a worker process per seed. Each worker starts from a
+copy-on-write copy of the whole process, with the exchange, its order book
+and the traders in the state they were in at the call, and continues it
+independently of the other branches. Only the result of each branch is
+pickled back to the parent; the book is never pickled.
+
+As ``fork`` copies the process, the continuation can be any callable,
+including a closure over the traders or a scheduler, and the parent's state
+is left untouched by the branches. This requires the ``fork`` start method,
+which is not available on Windows.
+"""
+import gc
+import multiprocessing
+from multiprocessing.connection import wait
+import os
+import random
+
+
+def _run_branch(connection, continuation, exchange, seed):
+    random.seed(seed)
+    try:
+        result = (True, continuation(exchange, seed))
+    except Exception as error:
+        result = (False, error)
+    connection.send(result)
+    connection.close()
+
+
+def run_branches(exchange, continuation, seeds, workers=None) -> list:
+    """Run ``continuation(exchange, seed)`` in a forked copy of the current
+    process for every seed in ``seeds``, and return their results in the
+    order of the seeds.
+
+    The module ``random`` of each branch is seeded with its seed, which the
+    continuation can also use to seed its own generators. At most
+    ``workers`` branches run at once (the number of CPUs by default). An
+    exception raised by a continuation is raised again here.
+
+    The branches must not write to files or connections shared with the
+    parent: an exchange with an ``OrderJournal`` is rejected, as every
+    branch would append to the same journal.
+    """
+    if getattr(exchange, "_journal", None) is not None:
+        raise ValueError("An exchange with a journal cannot be branched")
+    context = multiprocessing.get_context("fork")
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    seeds = list(seeds)
+    results = [None] * len(seeds)
+    pending = iter(enumerate(seeds))
+    # Read end of the pipe of each running branch -> (index, process)
+    running = {}
+
+    # The objects inherited by the branches are moved out of the reach of
+    # the garbage collector, which would otherwise write to all their
+    # pages, and defeat the copy-on-write, in every branch
+    gc.freeze()
+    try:
+        while True:
+            for index, seed in pending:
+                reader, writer = context.Pipe(duplex=False)
+                process = context.Process(
+                    target=_run_branch,
+                    args=(writer, continuation, exchange, seed),
+                    daemon=True,
+                )
+                process.start()
+                writer.close()
+                running[reader] = (index, process)
+                if len(running) >= workers:
+                    break
+            if not running:
+                break
+
+            for reader in wait(list(running)):
+                index, process = running.pop(reader)
+                try:
+                    success, result = reader.recv()
+                except EOFError:
+                    process.join()
+                    raise RuntimeError(
+                        f"The branch with the seed {seeds[index]} exited "
+                        f"with code {process.exitcode}"
+                    ) from None
+                finally:
+                    reader.close()
+                process.join()
+                if not success:
+                    raise result
+                results[index] = result
+    finally:
+        for reader, (_, process) in running.items():
+            process.terminate()
+            process.join()
+            reader.close()
+        gc.unfreeze()
+    return results
@@ -1,7 +1,16 @@
-from collections import defaultdict, deque
+from collections import namedtuple
+from heapq import heapify, heappop, heappush, nsmallest
+from array import array
+from itertools import count
 import logging
 
-from async_exchange.orders import BuyOrder, SellOrder, _Order
+from async_exchange.instrumentation import instrument as _instrument
+from async_exchange.market_data import (
+    DEFAULT_SNAPSHOT_INTERVAL,
+    MarketDataFeed,
+)
+from async_exchange.orders import BUY, ORDER_CLASSES, SELL, _Order
+from async_exchange.snapshot import Snapshot, typed_array, write_snapshot
 from async_exchange.trader import (
     NotEnoughMoneyError,
     NotEnoughStocksError,
@@ -11,17 +20,188 @@ from async_exchange.trader import (
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.ERROR)
 
+Fill = namedtuple("Fill", ("buy_order_id", "sell_order_id", "price", "amount"))
+
+# Read-only snapshot of the best prices and the last trade. The ``version``
+# changes whenever the order book changes.
+TopOfBook = namedtuple(
+    "TopOfBook",
+    ("version", "best_buy", "best_sell", "last_price", "last_amount"),
+)
+
+
+class Level:
+    """FIFO queue of the orders standing at a single price.
+
+    The queue is an intrusive doubly linked list: every order keeps the
+    references to its neighbours, so that appending, popping the head and
+    removing an arbitrary order are all O(1).
+
+    The total ``volume`` of the level is maintained incrementally. Whoever
+    changes the amount of a standing order must update the ``volume`` too.
+    """
+
+    def __init__(self):
+        self.head = None
+        self.tail = None
+        self.volume = 0
+        self._length = 0
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        order = self.head
+        while order is not None:
+            yield order
+            order = order._next
+
+    def __repr__(self):
+        return f"Level({list(self)!r})"
+
+    def append(self, order):
+        order._prev = self.tail
+        order._next = None
+        if self.tail is None:
+            self.head = order
+        else:
+            self.tail._next = order
+        self.tail = order
+        self.volume += order.amount
+        self._length += 1
+
+    def popleft(self):
+        order = self.head
+        if order is None:
+            raise IndexError("pop from an empty Level")
+        self.remove(order)
+        return order
+
+    def remove(self, order):
+        """Unlink the ``order``, which must be standing in this level."""
+        if order._prev is None:
+            self.head = order._next
+        else:
+            order._prev._next = order._next
+        if order._next is None:
+            self.tail = order._prev
+        else:
+            order._next._prev = order._prev
+        order._prev = order._next = None
+        self.volume -= order.amount
+        self._length -= 1
+
+
+class PriceLevels(dict):
+    """Mapping of price to ``Level`` with a heap index of the prices.
+
+    The best price (the lowest one, or the highest one if ``reverse`` is set)
+    is available in amortized O(1), and a new price level is indexed in
+    O(log n). Prices of emptied or removed levels are dropped from the heap
+    lazily, when they reach its top.
+    """
+
+    def __init__(self, reverse=False, level_factory=Level):
+        super().__init__()
+        self._sign = -1 if reverse else 1
+        self._level_factory = level_factory
+        self._heap = []
+        self._indexed_prices = set()
+
+    def __missing__(self, price):
+        level = self[price] = self._level_factory()
+        return level
+
+    def add(self, order):
+        """Append the ``order`` to its price level and index the price."""
+        self[order.price].append(order)
+        self.index_price(order.price)
+
+    def index_price(self, price):
+        """Make sure the ``price`` is considered for the best price."""
+        if price not in self._indexed_prices:
+            self._indexed_prices.add(price)
+            heappush(self._heap, self._sign * price)
+            if len(self._heap) > 2 * len(self._indexed_prices) + 64:
+                self._rebuild_index()
+
+    def remove_level(self, price):
+        self.pop(price, None)
+        self._indexed_prices.discard(price)
+
+    def volumes(self, depth=None):
+        """Get a dict of price to the volume of the price level.
+
+        If ``depth`` is given, only the ``depth`` best non-empty price levels
+        are included, from the best one.
+        """
+        if depth is None:
+            return {price: level.volume for price, level in self.items()}
+
+        prices = nsmallest(
+            depth,
+            (price for price, level in self.items() if len(level) > 0),
+            key=lambda price: self._sign * price,
+        )
+        return {price: self[price].volume for price in prices}
+
+    def _rebuild_index(self):
+        """Drop the stale prices accumulated in the heap."""
+        self._heap = [self._sign * price for price in self._indexed_prices]
+        heapify(self._heap)
 
-class Level(deque):
-    pass
+    @property
+    def best_price(self):
+        heap = self._heap
+        while heap:
+            price = self._sign * heap[0]
+            if price in self._indexed_prices and len(self.get(price, ())):
+                return price
+            heappop(heap)
+            self._indexed_prices.discard(price)
+        return None
 
 
 class Exchange:
-    def __init__(self, logger=None):
-        self.buy_levels = defaultdict(Level)
-        self.sell_levels = defaultdict(Level)
+    """A continuous double auction matching the orders in price-time
+    priority.
+
+    With ``instrument``, the exchange counts the orders, fills, cancels and
+    retried exchanges, and records the latencies of ``process_order`` and
+    ``cancel_order`` (see ``async_exchange.instrumentation``). They are read
+    with ``get_stats``, and sent to the logger by ``log_stats``.
+
+    With a ``journal`` (an ``OrderJournal``), the operations changing the
+    order book and their fills are recorded, to be replayed offline.
+    """
+
+    def __init__(self, logger=None, instrument=False, journal=None):
+        self.buy_levels = PriceLevels(reverse=True)
+        self.sell_levels = PriceLevels()
+        # Price levels of each order side, indexed by the side
+        self._levels = (self.buy_levels, self.sell_levels)
+        self._order_ids = count(1)
+        self._orders = {}
+        self._owner_orders = {}
 
         self._logger = logger
+        # The ``MarketDataFeed``, only while somebody is subscribed
+        self._feed = None
+
+        # Incremented by every operation changing the order book
+        self._version = 0
+        self._top_of_book = TopOfBook(0, None, None, None, None)
+        # Price and amount of the last trade
+        self._last_trade = (None, None)
+
+        self._journal = journal
+        if journal is not None:
+            journal.attach(self)
+
+        # The ``ExchangeStats``, only if instrumented
+        self._stats = None
+        if instrument:
+            self._stats = _instrument(self)
 
     def log_event(self, event_type, message):
         if self._logger is not None:
@@ -31,53 +211,72 @@ class Exchange:
         _repr = "\n______________\n"
         _repr += "Buy   |   Sell  price\n      |\n"
         _repr += "\n".join(
-            f"      |- {sum(order.amount for order in level):4}   {price}"
+            f"      |- {level.volume:4}   {price}"
             for price, level in sorted(self.sell_levels.items(), reverse=True)
-            if sum(order.amount for order in level) > 0
+            if level.volume > 0
         )
         _repr += "\n------+-------\n"
         _repr += "\n".join(
-            f"{sum(order.amount for order in level):4} -|   {price:8}"
+            f"{level.volume:4} -|   {price:8}"
             for price, level in sorted(self.buy_levels.items(), reverse=True)
-            if sum(order.amount for order in level) > 0
+            if level.volume > 0
         )
         _repr += "\n______________\n"
         return _repr
 
     @property
     def best_buy(self):
-        try:
-            best_buy_price = max(
-                price
-                for price, orders in self.buy_levels.items()
-                if len(orders) > 0
-            )
-        except ValueError:
-            return None
-        else:
-            return best_buy_price
+        return self.buy_levels.best_price
 
     @property
     def best_sell(self):
-        try:
-            best_sell_price = min(
-                price
-                for price, orders in self.sell_levels.items()
-                if len(orders) > 0
-            )
-        except ValueError:
-            return None
-        else:
-            return best_sell_price
+        return self.sell_levels.best_price
 
     def process_order(self, order):
+        if self._stats is not None:
+            self._stats.orders += 1
         if order.amount == 0:
             return
 
-        if isinstance(order, BuyOrder):
-            self._process_buy_order(order)
-        elif isinstance(order, SellOrder):
-            self._process_sell_order(order)
+        if order._id is not None:
+            raise ValueError(f"The order {order._id} was already submitted")
+        order._id = next(self._order_ids)
+        fills = None if self._feed is None else []
+        self._match_order(
+            order,
+            self._levels[order.side],
+            self._levels[1 - order.side],
+            fills,
+        )
+        self._book_changed(fills or ())
+
+    def process_orders(self, orders) -> list:
+        """Process a batch of ``orders`` in their arrival order, which is the
+        order of the iterable. Returns the list of ``Fill``s of the batch.
+        """
+        fills = []
+        order_ids = self._order_ids
+        levels = self._levels
+        match_order = self._match_order
+        stats = self._stats
+        try:
+            for order in orders:
+                if stats is not None:
+                    stats.orders += 1
+                if order.amount == 0:
+                    continue
+                if order._id is not None:
+                    raise ValueError(
+                        f"The order {order._id} was already submitted"
+                    )
+                order._id = next(order_ids)
+                match_order(
+                    order, levels[order.side], levels[1 - order.side], fills
+                )
+        finally:
+            # The orders of the batch before a rejected order stay processed
+            self._book_changed(fills)
+        return fills
 
     def _exchange_assets(
         self, buyer: Trader, seller: Trader, stocks: int, money: int
@@ -99,161 +298,374 @@ class Exchange:
             message={"price": money / stocks, "amount": stocks},
         )
 
-    def _process_buy_order(self, order: BuyOrder):
-        if order.amount <= 0:
-            return
-
-        current_best_sell = self.best_sell
-        if current_best_sell is None or order.price < current_best_sell:
-            self.buy_levels[order.price].append(order)
-            return
-
-        matched_sell_order = self.sell_levels[current_best_sell][0]
-        stocks_to_transfer = min(order.amount, matched_sell_order.amount)
-        money_to_transfer = stocks_to_transfer * matched_sell_order.price
-
-        try:
-            self._exchange_assets(
-                order.owner,
-                matched_sell_order.owner,
-                stocks_to_transfer,
-                money_to_transfer,
-            )
-        except NotEnoughMoneyError:
-            logger.warning(
-                f"Could not complete exchange: buyer {order.owner} does not"
-                " have enough money. Adjusting the buyer's order and retrying"
-                " the exchange."
-            )
-            buyer_can_afford = int(
-                order.owner.money / matched_sell_order.price
-            )
-            order.amount = buyer_can_afford
-            self._process_buy_order(order)
-        except NotEnoughStocksError:
-            _seller = matched_sell_order.owner
-            logger.warning(
-                f"Could not complete exchange: seller {_seller}"
-                " does not have enough stocks. Adjusting the seller's order "
-                "and retrying the exchange."
-            )
-            matched_sell_order.amount = matched_sell_order.owner.stocks
-            self._process_buy_order(order)
-        else:
-            order.amount -= stocks_to_transfer
-            matched_sell_order.amount -= stocks_to_transfer
-
-            if matched_sell_order.amount == 0:
-                self.sell_levels[current_best_sell].popleft()
-                if len(self.sell_levels[current_best_sell]) == 0:
-                    self.sell_levels.pop(current_best_sell)
-            self._process_buy_order(order)
-
-    def _process_sell_order(self, order: SellOrder):
-        if order.amount <= 0:
-            return
-
-        current_best_buy = self.best_buy
-        if current_best_buy is None or order.price > current_best_buy:
-            self.sell_levels[order.price].append(order)
-            return
-
-        matched_buy_order = self.buy_levels[current_best_buy][0]
-        stocks_to_transfer = min(order.amount, matched_buy_order.amount)
-        money_to_transfer = stocks_to_transfer * matched_buy_order.price
-
-        try:
-            self._exchange_assets(
-                matched_buy_order.owner,
-                order.owner,
-                stocks_to_transfer,
-                money_to_transfer,
-            )
-        except NotEnoughMoneyError:
-            logger.warning(
-                f"Could not complete exchange: buyer {matched_buy_order.owner}"
-                "  does not have enough money. Adjusting the buyer's order and"
-                " retrying the exchange."
-            )
-            buyer_can_afford = int(
-                matched_buy_order.owner.money / matched_buy_order.price
-            )
-            matched_buy_order.amount = buyer_can_afford
-            self._process_sell_order(order)
-        except NotEnoughStocksError:
-            logger.warning(
-                f"Could not complete exchange: seller {order.owner}"
-                " does not have enough stocks. Adjusting the seller's order "
-                "and retrying the exchange."
-            )
-            order.amount = order.owner.stocks
-            self._process_sell_order(order)
-        else:
-            order.amount -= stocks_to_transfer
-            matched_buy_order.amount -= stocks_to_transfer
-
-            if matched_buy_order.amount == 0:
-                self.buy_levels[current_best_buy].popleft()
-                if len(self.buy_levels[current_best_buy]) == 0:
-                    self.buy_levels.pop(current_best_buy)
-            self._process_sell_order(order)
+    def _match_order(
+        self,
+        order: _Order,
+        levels: PriceLevels,
+        opposite_levels: PriceLevels,
+        fills: list = None,
+    ):
+        """Match the incoming ``order`` against the ``opposite_levels`` until
+        it is filled or does not cross the book anymore, in which case the
+        rest of the order is added to its ``levels``. The completed exchanges
+        are appended to ``fills``, if given.
+
+        If an exchange fails because the buyer or the seller cannot afford
+        it, the order of that trader is reduced to what they can afford, and
+        the exchange is retried.
+        """
+        is_buy = order.side == BUY
+        # The sign makes a buy order cross at and below its price, and a sell
+        # order at and above it
+        sign = 1 if is_buy else -1
+        opposite_side = 1 - order.side
+        feed = self._feed
+        stats = self._stats
+        while order.amount > 0:
+            best_price = opposite_levels.best_price
+            if best_price is None or sign * (order.price - best_price) < 0:
+                self._add_order(order, levels)
+                return
+
+            level = opposite_levels[best_price]
+            matched_order = level.head
+            if is_buy:
+                buy_order, sell_order = order, matched_order
+            else:
+                buy_order, sell_order = matched_order, order
+
+            matched_amount = matched_order.amount
+            stocks_to_transfer = min(order.amount, matched_amount)
+            money_to_transfer = stocks_to_transfer * matched_order.price
+
+            try:
+                self._exchange_assets(
+                    buy_order.owner,
+                    sell_order.owner,
+                    stocks_to_transfer,
+                    money_to_transfer,
+                )
+            except NotEnoughMoneyError:
+                if stats is not None:
+                    stats.money_retries += 1
+                logger.warning(
+                    f"Could not complete exchange: buyer {buy_order.owner}"
+                    " does not have enough money. Adjusting the buyer's order"
+                    " and retrying the exchange."
+                )
+                buy_order.amount = int(
+                    buy_order.owner.money / matched_order.price
+                )
+            except NotEnoughStocksError:
+                if stats is not None:
+                    stats.stock_retries += 1
+                logger.warning(
+                    f"Could not complete exchange: seller {sell_order.owner}"
+                    " does not have enough stocks. Adjusting the seller's"
+                    " order and retrying the exchange."
+                )
+                sell_order.amount = sell_order.owner.stocks
+            else:
+                order.amount -= stocks_to_transfer
+                matched_order.amount -= stocks_to_transfer
+                if stats is not None:
+                    stats.fills += 1
+                self._last_trade = (matched_order.price, stocks_to_transfer)
+                if fills is not None:
+                    fills.append(
+                        Fill(
+                            buy_order.id,
+                            sell_order.id,
+                            matched_order.price,
+                            stocks_to_transfer,
+                        )
+                    )
+
+            level.volume += matched_order.amount - matched_amount
+            if feed is not None:
+                feed.level_changed(opposite_side, best_price)
+            if matched_order.amount <= 0:
+                level.popleft()
+                self._discard_order(matched_order)
+                if len(level) == 0:
+                    opposite_levels.remove_level(best_price)
+
+    def _add_order(self, order: _Order, levels: PriceLevels):
+        levels.add(order)
+        if self._feed is not None:
+            self._feed.level_changed(order.side, order.price)
+        self._orders[order.id] = order
+        self._owner_orders.setdefault(order.owner, {})[order.id] = order
+
+    def _discard_order(self, order: _Order):
+        """Remove the ``order`` from the indices of standing orders."""
+        del self._orders[order.id]
+        owner_orders = self._owner_orders[order.owner]
+        del owner_orders[order.id]
+        if len(owner_orders) == 0:
+            del self._owner_orders[order.owner]
+
+    def _unlink_order(self, order: _Order):
+        """Remove the ``order`` from its price level, and remove the level
+        if it becomes empty."""
+        levels = self._levels_of(order)
+        level = levels[order.price]
+        level.remove(order)
+        if len(level) == 0:
+            levels.remove_level(order.price)
+        if self._feed is not None:
+            self._feed.level_changed(order.side, order.price)
+
+    def _levels_of(self, order: _Order) -> PriceLevels:
+        return self._levels[order.side]
 
     def cancel_order(self, order: _Order) -> bool:
         """ Cancel the given ``order`` by removing it from the OrderBook.
-        The order is identified by its ``id``.
-
-        Note: the existing implementation is far from optimal because the
-        ``Level`` is essentially a deque with O(n) complexity for removal by
-        index. Alternative approaches are:
-        - set the volume of the ``Order`` to zero in the orderbook (such that
-        it does not yield actual exchange)
-        - rework the ``Level`` to be an ordered dict
+        The order is identified by its ``id``. If the order's price level
+        becomes empty, the level is removed from the OrderBook.
         """
-        if isinstance(order, BuyOrder):
-            level = self.buy_levels[order.price]
-        elif isinstance(order, SellOrder):
-            level = self.sell_levels[order.price]
-        else:
+        standing_order = self._orders.get(order.id)
+        if standing_order is None:
             return False
 
-        index_in_orderbook = None
-        for index, existing_order in enumerate(level):
-            if existing_order.id == order.id:
-                index_in_orderbook = index
-                break
+        self._unlink_order(standing_order)
+        self._discard_order(standing_order)
+        self._book_changed()
+        return True
 
-        if index_in_orderbook is None:
+    def cancel_all(self, trader: Trader) -> int:
+        """ Cancel all standing orders of the ``trader``. Returns the number
+        of cancelled orders.
+        """
+        owner_orders = self._owner_orders.pop(trader, {})
+        for order_id, order in owner_orders.items():
+            self._unlink_order(order)
+            del self._orders[order_id]
+        self._book_changed()
+        return len(owner_orders)
+
+    def amend_order(self, order: _Order, amount: int) -> bool:
+        """ Change the ``amount`` of the given standing ``order``.
+        Reducing the amount keeps the order's time priority, increasing it
+        moves the order to the back of its price level, and a non-positive
+        amount cancels the order. Returns ``False`` if the order is not in
+        the OrderBook.
+        """
+        standing_order = self._orders.get(order.id)
+        if standing_order is None:
             return False
-
-        del level[index_in_orderbook]
+        if amount <= 0:
+            return self.cancel_order(standing_order)
+
+        level = self._levels_of(standing_order)[standing_order.price]
+        if amount > standing_order.amount:
+            level.remove(standing_order)
+            standing_order.amount = amount
+            level.append(standing_order)
+        else:
+            level.volume += amount - standing_order.amount
+            standing_order.amount = amount
+        if self._feed is not None:
+            self._feed.level_changed(
+                standing_order.side, standing_order.price
+            )
+        self._book_changed()
         return True
 
     def standing_orders(self, trader):
+        """Get two tuples of the standing buy and sell orders of the
+        ``trader``, in the order of their submission.
+        """
+        owner_orders = self._owner_orders.get(trader, {}).values()
         buy_orders = tuple(
-            order
-            for level in self.buy_levels.values()
-            for order in level
-            if order.owner is trader
+            order for order in owner_orders if order.side == BUY
         )
         sell_orders = tuple(
-            order
-            for level in self.sell_levels.values()
-            for order in level
-            if order.owner is trader
+            order for order in owner_orders if order.side == SELL
         )
         return buy_orders, sell_orders
 
-    def get_orderbook(self):
-        buy_orders = {
-            price: sum(order.amount for order in level)
-            for price, level in self.buy_levels.items()
-        }
-        sell_orders = {
-            price: sum(order.amount for order in level)
-            for price, level in self.sell_levels.items()
-        }
+    def get_order(self, order_id: int):
+        """Get the standing order with the ``order_id``, or ``None``."""
+        return self._orders.get(order_id)
+
+    def get_orderbook(self, depth=None):
+        """Get two dicts of price to the total volume of the buy and sell
+        price levels. If ``depth`` is given, only the ``depth`` best levels
+        of each side are included, ordered from the best price.
+        """
+        buy_orders = self.buy_levels.volumes(depth)
+        sell_orders = self.sell_levels.volumes(depth)
         return buy_orders, sell_orders
 
+    def subscribe(
+        self, maxsize=0, snapshot_interval=DEFAULT_SNAPSHOT_INTERVAL
+    ):
+        """Subscribe to the market data of the Exchange. Returns an
+        ``asyncio.Queue`` receiving a snapshot of the order book, and then
+        the level updates and trades (see ``async_exchange.market_data``).
+
+        With a ``maxsize``, the messages that do not fit in the queue are
+        dropped. A snapshot is sent every ``snapshot_interval`` messages.
+        """
+        if self._feed is None:
+            self._feed = MarketDataFeed(self)
+        return self._feed.subscribe(maxsize, snapshot_interval)
+
+    def unsubscribe(self, queue) -> bool:
+        if self._feed is None or not self._feed.unsubscribe(queue):
+            return False
+        if len(self._feed) == 0:
+            self._feed = None
+        return True
+
+    def _book_changed(self, fills=()):
+        """Account for a change of the order book by an operation."""
+        self._version += 1
+        if self._feed is not None:
+            self._feed.publish(fills)
+
+    def top_of_book(self) -> TopOfBook:
+        """Get a ``TopOfBook`` of the best prices and the last trade. The
+        snapshot is cached until the order book changes.
+        """
+        if self._top_of_book.version != self._version:
+            self._top_of_book = TopOfBook(
+                self._version, self.best_buy, self.best_sell, *self._last_trade
+            )
+        return self._top_of_book
+
+    def best_bid_ask(self):
+        """Get the best buy and sell prices, ``None`` for an empty side."""
+        top_of_book = self.top_of_book()
+        return top_of_book.best_buy, top_of_book.best_sell
+
+    def last_trade(self):
+        """Get the price and the amount of the last trade, or ``None``s if
+        nothing was traded yet."""
+        return self._last_trade
+
+    def snapshot(self, path, traders=()):
+        """Write the standing orders in their FIFO order, the assets of
+        their owners and of the given ``traders``, the next order id and the
+        last trade to a snapshot file at ``path`` (see
+        ``async_exchange.snapshot``)."""
+        orders, owners = self._snapshot_orders()
+        owner_indices = {owner: index for index, owner in enumerate(owners)}
+        for trader in traders:
+            if trader not in owner_indices:
+                owner_indices[trader] = len(owners)
+                owners.append(trader)
+
+        next_order_id = next(self._order_ids)
+        self._order_ids = count(next_order_id)
+        write_snapshot(
+            path,
+            next_order_id,
+            self._last_trade,
+            orders,
+            {
+                "trader_id": array("q", (owner._id for owner in owners)),
+                "stocks": array("q", (owner.stocks for owner in owners)),
+                "money": typed_array([owner.money for owner in owners]),
+            },
+            orders.pop("side"),
+        )
+
+    def _snapshot_orders(self):
+        """The columns of the standing orders in the snapshot order, and
+        the list of their owners indexed by the ``owner`` column."""
+        order_ids = array("q")
+        sides = array("b")
+        prices = []
+        amounts = array("q")
+        owner_indices = array("q")
+        owners = {}
+        for side, levels in enumerate(self._levels):
+            for level in levels.values():
+                for order in level:
+                    owner_index = owners.get(order.owner)
+                    if owner_index is None:
+                        owner_index = owners[order.owner] = len(owners)
+                    order_ids.append(order.id)
+                    sides.append(side)
+                    prices.append(order.price)
+                    amounts.append(order.amount)
+                    owner_indices.append(owner_index)
+        orders = {
+            "order_id": order_ids,
+            "price": typed_array(prices),
+            "amount": amounts,
+            "owner": owner_indices,
+            "side": sides,
+        }
+        return orders, list(owners)
+
+    @classmethod
+    def restore(cls, path, traders=(), **kwargs):
+        """Create an exchange (with the ``kwargs``) from the snapshot at
+        ``path``. The given ``traders`` found in the snapshot, by their id,
+        get their assets back; the other traders of the snapshot are created
+        as ``Trader``s. All of them are registered in the exchange.
+        """
+        exchange = cls(**kwargs)
+        given_traders = {trader._id: trader for trader in traders}
+        with Snapshot(path) as snapshot:
+            owners = []
+            columns = snapshot.traders
+            for trader_id, stocks, money in zip(
+                columns["trader_id"], columns["stocks"], columns["money"]
+            ):
+                trader = given_traders.get(trader_id)
+                if trader is None:
+                    trader = Trader(money=money, stocks=stocks)
+                else:
+                    trader.money = money
+                    trader.stocks = stocks
+                exchange.register_trader(trader)
+                owners.append(trader)
+
+            exchange._restore_orders(snapshot, owners)
+            exchange._order_ids = count(snapshot.next_order_id)
+            exchange._last_trade = snapshot.last_trade
+        exchange._book_changed()
+        return exchange
+
+    def _restore_orders(self, snapshot: Snapshot, owners: list):
+        """Add the standing orders of the ``snapshot`` to the empty order
+        book, in their FIFO order."""
+        columns = snapshot.orders
+        levels = self._levels
+        add_order = self._add_order
+        for order_id, side, price, amount, owner_index in zip(
+            columns["order_id"],
+            snapshot.sides,
+            columns["price"],
+            columns["amount"],
+            columns["owner"],
+        ):
+            order = ORDER_CLASSES[side](owners[owner_index], amount, price)
+            order._id = order_id
+            add_order(order, levels[side])
+        # The orders of an owner are kept in the order of their submission
+        owner_orders = self._owner_orders
+        for owner, orders in owner_orders.items():
+            owner_orders[owner] = dict(sorted(orders.items()))
+
+    def get_stats(self):
+        """Get the counters and the latency percentiles of an instrumented
+        exchange as a dict (see ``ExchangeStats.summary``), or ``None`` if
+        the exchange is not instrumented."""
+        if self._stats is None:
+            return None
+        return self._stats.summary()
+
+    def log_stats(self):
+        """Send the stats of an instrumented exchange to the logger as a
+        ``"stats"`` event."""
+        if self._stats is not None:
+            self.log_event(event_type="stats", message=self.get_stats())
+
     def register_trader(self, trader: Trader):
         """Register a ``trader`` in the Exchange.
         Provides the ``exchange_api`` to the ``trader``.
@@ -262,7 +674,12 @@ class Exchange:
 
     def shutdown(self):
         """Perform necessary actions to shutdown the ``Exchange`` instance."""
-        pass
+        self.log_stats()
+        if self._journal is not None:
+            self._journal.close()
+        close_logger = getattr(self._logger, "close", None)
+        if close_logger is not None:
+            close_logger()
 
     @property
     def api(self):
@@ -272,14 +689,27 @@ class Exchange:
 class ExchangeAPI:
     def __init__(self, exchange: Exchange):
         self._process_order = exchange.process_order
+        self._process_orders = exchange.process_orders
         self._standing_orders = exchange.standing_orders
         self._get_order_book = exchange.get_orderbook
         self._cancel_order = exchange.cancel_order
+        self._amend_order = exchange.amend_order
+        self._cancel_all = exchange.cancel_all
+        self._subscribe = exchange.subscribe
+        self._unsubscribe = exchange.unsubscribe
+        self._top_of_book = exchange.top_of_book
+        self._best_bid_ask = exchange.best_bid_ask
+        self._last_trade = exchange.last_trade
+        self._get_stats = exchange.get_stats
 
     @property
     def process_order(self):
         return self._process_order
 
+    @property
+    def process_orders(self):
+        return self._process_orders
+
     @property
     def standing_orders(self):
         return self._standing_orders
@@ -291,3 +721,35 @@ class ExchangeAPI:
     @property
     def cancel_order(self):
         return self._cancel_order
+
+    @property
+    def amend_order(self):
+        return self._amend_order
+
+    @property
+    def cancel_all(self):
+        return self._cancel_all
+
+    @property
+    def subscribe(self):
+        return self._subscribe
+
+    @property
+    def unsubscribe(self):
+        return self._unsubscribe
+
+    @property
+    def top_of_book(self):
+        return self._top_of_book
+
+    @property
+    def best_bid_ask(self):
+        return self._best_bid_ask
+
+    @property
+    def last_trade(self):
+        return self._last_trade
+
+    @property
+    def get_stats(self):
+        return self._get_stats
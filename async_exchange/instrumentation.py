@@ -0,0 +1,150 @@
+"""Optional counters and latency histograms of an ``Exchange``.
+
+An instrumented exchange (``Exchange(instrument=True)``) counts the
+submitted orders, the fills, the cancelled orders and the exchanges retried
+because a trader could not afford them, and records the latency of every
+``process_order`` and ``cancel_order`` call in a ``LatencyHistogram``.
+
+The latencies are timed by wrappers replacing the methods on the exchange
+instance, so an exchange without instrumentation runs the plain methods.
+"""
+from time import perf_counter_ns
+
+# Every power of two range of latencies is split into this many buckets, so
+# a recorded value is off by less than 1 / 2 ** SUB_BUCKET_BITS
+SUB_BUCKET_BITS = 5
+
+PERCENTILES = (50, 90, 99)
+
+COUNTERS = ("orders", "fills", "cancels", "money_retries", "stock_retries")
+TIMED_METHODS = ("process_order", "cancel_order")
+
+
+class LatencyHistogram:
+    """Counts of nanosecond latencies in log-linear buckets, as an HDR
+    histogram: the values below ``2 ** (SUB_BUCKET_BITS + 1)`` are counted
+    exactly, and every following power of two range is split into
+    ``2 ** SUB_BUCKET_BITS`` buckets. Recording is constant time, and the
+    memory does not depend on the number of values.
+    """
+
+    def __init__(self, sub_bucket_bits=SUB_BUCKET_BITS):
+        self.sub_bucket_bits = sub_bucket_bits
+        self._sub_buckets = 1 << sub_bucket_bits
+        # Enough buckets for any 64-bit value
+        self.counts = [0] * ((64 - sub_bucket_bits) * self._sub_buckets)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def _index(self, value) -> int:
+        shift = max(0, value.bit_length() - self.sub_bucket_bits - 1)
+        return shift * self._sub_buckets + (value >> shift)
+
+    def _highest_value(self, index) -> int:
+        """The largest value counted in the bucket ``index``."""
+        shift = max(0, index // self._sub_buckets - 1)
+        lowest = (index - shift * self._sub_buckets) << shift
+        return lowest + (1 << shift) - 1
+
+    def record(self, value: int):
+        self.counts[self._index(value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, percentile: float) -> int:
+        """The value below or at which ``percentile`` percent of the
+        recorded values are, rounded up to the end of its bucket. 0 if no
+        value was recorded."""
+        if self.count == 0:
+            return 0
+        rank = max(1, -(-self.count * percentile // 100))
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return min(self._highest_value(index), self.max)
+        return self.max
+
+    def summary(self, prefix="") -> dict:
+        summary = {f"{prefix}count": self.count}
+        for percentile in PERCENTILES:
+            summary[f"{prefix}p{percentile}_ns"] = self.percentile(percentile)
+        summary[f"{prefix}max_ns"] = self.max
+        return summary
+
+
+class ExchangeStats:
+    """The counters of an exchange, and a ``LatencyHistogram`` per timed
+    method."""
+
+    def __init__(self):
+        self.orders = 0
+        self.fills = 0
+        self.cancels = 0
+        self.money_retries = 0
+        self.stock_retries = 0
+        self.latencies = {name: LatencyHistogram() for name in TIMED_METHODS}
+
+    def summary(self) -> dict:
+        """The counters and the percentiles of the latencies as a flat dict
+        of ints, e.g. ``process_order_p99_ns``."""
+        summary = {name: getattr(self, name) for name in COUNTERS}
+        for name, histogram in self.latencies.items():
+            summary.update(histogram.summary(prefix=f"{name}_"))
+        return summary
+
+
+def _field_names():
+    names = list(COUNTERS)
+    for name in TIMED_METHODS:
+        names += LatencyHistogram().summary(prefix=f"{name}_")
+    return names
+
+
+# Schema of the ``"stats"`` events for the ``FileLogger``
+STATS_SCHEMA = tuple((name, "int64") for name in _field_names())
+
+
+def instrument(exchange) -> ExchangeStats:
+    """Replace the timed methods of the ``exchange`` instance by wrappers
+    recording the latencies and counting the cancels. Returns the
+    ``ExchangeStats`` they update, which the exchange updates as well."""
+    stats = ExchangeStats()
+
+    process_order = exchange.process_order
+    record_order = stats.latencies["process_order"].record
+
+    def timed_process_order(order):
+        start = perf_counter_ns()
+        result = process_order(order)
+        record_order(perf_counter_ns() - start)
+        return result
+
+    cancel_order = exchange.cancel_order
+    record_cancel = stats.latencies["cancel_order"].record
+
+    def timed_cancel_order(order):
+        start = perf_counter_ns()
+        cancelled = cancel_order(order)
+        record_cancel(perf_counter_ns() - start)
+        stats.cancels += cancelled
+        return cancelled
+
+    cancel_all = exchange.cancel_all
+
+    def counted_cancel_all(trader):
+        cancelled = cancel_all(trader)
+        stats.cancels += cancelled
+        return cancelled
+
+    exchange.process_order = timed_process_order
+    exchange.cancel_order = timed_cancel_order
+    exchange.cancel_all = counted_cancel_all
+    return stats
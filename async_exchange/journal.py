@@ -0,0 +1,315 @@
+"""Append-only journal of the operations of an ``Exchange``, and its replay.
+
+An ``OrderJournal`` passed to the exchange (``Exchange(journal=...)``)
+records every order submitted to the exchange, every successful cancel and
+amend, and the fills they produced, as fixed-width binary records numbered
+by a sequence. A trader is recorded with its assets the first time one of
+its orders is submitted. The traders' assets must only be changed by the
+exchange for the replay to be faithful.
+
+``replay`` streams a journal from disk through a fresh exchange, without a
+``TradingSession``, and checks that every operation gives the same order
+ids and fills as recorded:
+
+    $ python -m async_exchange.journal session.journal
+"""
+import argparse
+import os
+import struct
+import time
+
+from async_exchange.exchange import Exchange, Fill
+from async_exchange.orders import ORDER_CLASSES, _OrderId
+from async_exchange.trader import Trader
+
+MAGIC = b"AXJRNL01"
+
+# Record kinds, and the meaning of the ``a``, ``b``, ``price`` and ``c``
+# fields of the record
+TRADER = 1  # trader id, stocks, money, -
+ORDER = 2  # trader id, amount, price, order id; with the side
+CANCEL = 3  # order id, -, -, -
+CANCEL_ALL = 4  # trader id, number of cancelled orders, -, -
+AMEND = 5  # order id, amount, -, -
+FILL = 6  # buy order id, sell order id, price, amount
+AUCTION = 7  # -, -, -, -
+
+# Sequence, kind, side, a, b, price, c
+RECORD = struct.Struct("<qBBqqdq")
+
+# Records read from the disk at once by ``read_journal``
+CHUNK_RECORDS = 4096
+
+
+class ReplayMismatchError(RuntimeError):
+    """The replay of a journal differs from the recorded session."""
+
+
+def _decode_number(value):
+    return int(value) if value.is_integer() else value
+
+
+class OrderJournal:
+    """Appends the operations of the exchange it is attached to to a new
+    file at ``path``. As the order ids of a journal are those of a single
+    exchange, an existing file is not continued (``FileExistsError``)."""
+
+    def __init__(self, path, buffer_size=1 << 20):
+        self.path = path
+        self._file = open(path, "xb", buffering=buffer_size)
+        self._file.write(MAGIC)
+        self.sequence = 0
+        # Journal id of every trader recorded so far
+        self._trader_ids = {}
+
+    def _write(self, kind, side=0, a=0, b=0, price=0.0, c=0):
+        self._file.write(
+            RECORD.pack(self.sequence, kind, side, a, b, price, c)
+        )
+        self.sequence += 1
+
+    def _trader_id(self, trader) -> int:
+        trader_id = self._trader_ids.get(trader)
+        if trader_id is None:
+            trader_id = self._trader_ids[trader] = trader._id
+            self._write(
+                TRADER, a=trader_id, b=trader.stocks, price=trader.money
+            )
+        return trader_id
+
+    def _write_fills(self, fills):
+        for fill in fills:
+            self._write(
+                FILL,
+                a=fill.buy_order_id,
+                b=fill.sell_order_id,
+                price=fill.price,
+                c=fill.amount,
+            )
+
+    def attach(self, exchange: Exchange):
+        """Replace the methods of the ``exchange`` instance changing the
+        order book by wrappers recording them."""
+        process_orders = exchange.process_orders
+
+        def journaled_process_orders(orders) -> list:
+            orders = list(orders)
+            amounts = [order.amount for order in orders]
+            trader_ids = [self._trader_id(order.owner) for order in orders]
+            fills = process_orders(orders)
+            for order, amount, trader_id in zip(orders, amounts, trader_ids):
+                # Empty orders are ignored by the exchange
+                if amount != 0:
+                    self._write(
+                        ORDER,
+                        side=order.side,
+                        a=trader_id,
+                        b=amount,
+                        price=order.price,
+                        c=order.id,
+                    )
+            self._write_fills(fills)
+            return fills
+
+        def journaled_process_order(order):
+            journaled_process_orders((order,))
+
+        cancel_order = exchange.cancel_order
+
+        def journaled_cancel_order(order) -> bool:
+            cancelled = cancel_order(order)
+            if cancelled:
+                self._write(CANCEL, a=order.id)
+            return cancelled
+
+        cancel_all = exchange.cancel_all
+
+        def journaled_cancel_all(trader) -> int:
+            cancelled = cancel_all(trader)
+            if cancelled:
+                trader_id = self._trader_id(trader)
+                self._write(CANCEL_ALL, a=trader_id, b=cancelled)
+            return cancelled
+
+        amend_order = exchange.amend_order
+
+        def journaled_amend_order(order, amount) -> bool:
+            amended = amend_order(order, amount)
+            # A non-positive amount cancels the order via ``cancel_order``,
+            # which records it
+            if amended and amount > 0:
+                self._write(AMEND, a=order.id, b=amount)
+            return amended
+
+        exchange.process_orders = journaled_process_orders
+        exchange.process_order = journaled_process_order
+        exchange.cancel_order = journaled_cancel_order
+        exchange.cancel_all = journaled_cancel_all
+        exchange.amend_order = journaled_amend_order
+
+        run_auction = getattr(exchange, "run_auction", None)
+        if run_auction is not None:
+
+            def journaled_run_auction() -> list:
+                fills = run_auction()
+                self._write(AUCTION)
+                self._write_fills(fills)
+                return fills
+
+            exchange.run_auction = journaled_run_auction
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def read_journal(path, chunk_records=CHUNK_RECORDS):
+    """Iterate over the records of the journal at ``path`` as tuples of
+    ``(sequence, kind, side, a, b, price, c)``, reading ``chunk_records``
+    records from the disk at a time."""
+    with open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not an order journal")
+        while True:
+            chunk = file.read(RECORD.size * chunk_records)
+            if not chunk:
+                return
+            if len(chunk) % RECORD.size:
+                raise ValueError(f"The journal {path} is truncated")
+            yield from RECORD.iter_unpack(chunk)
+
+
+def replay(path, exchange: Exchange = None) -> Exchange:
+    """Feed the journal at ``path`` through the ``exchange`` (a new
+    ``Exchange`` by default), which must be of the kind of the recorded one.
+    Raises a ``ReplayMismatchError`` as soon as an operation gives other
+    order ids or fills than recorded. Returns the exchange.
+    """
+    if exchange is None:
+        exchange = Exchange()
+    traders = {}
+    # The recorded operation being replayed: the orders of a batch or an
+    # auction, whose fills are the next records
+    orders = []
+    order_ids = []
+    auction = False
+    recorded_fills = []
+    expected_sequence = 0
+
+    def check(sequence, replayed, recorded, operation):
+        if replayed != recorded:
+            raise ReplayMismatchError(
+                f"{operation} before the record {sequence} gave {replayed},"
+                f" the journal has {recorded}"
+            )
+
+    def replay_operation(sequence):
+        nonlocal auction
+        if orders:
+            fills = exchange.process_orders(orders)
+            check(
+                sequence,
+                [order.id for order in orders],
+                order_ids,
+                "The order ids",
+            )
+        elif auction:
+            fills = exchange.run_auction()
+        else:
+            fills = []
+        check(sequence, fills, recorded_fills, "The fills")
+        orders.clear()
+        order_ids.clear()
+        recorded_fills.clear()
+        auction = False
+
+    for sequence, kind, side, a, b, price, c in read_journal(path):
+        if sequence != expected_sequence:
+            raise ReplayMismatchError(
+                f"Expected the record {expected_sequence}, got {sequence}"
+            )
+        expected_sequence += 1
+
+        if kind == FILL:
+            recorded_fills.append(Fill(a, b, _decode_number(price), c))
+            continue
+        if kind == ORDER:
+            if recorded_fills or auction:
+                replay_operation(sequence)
+            orders.append(
+                ORDER_CLASSES[side](traders[a], b, _decode_number(price))
+            )
+            order_ids.append(c)
+            continue
+
+        replay_operation(sequence)
+        if kind == TRADER:
+            trader = Trader(money=_decode_number(price), stocks=b)
+            traders[a] = trader
+            exchange.register_trader(trader)
+        elif kind == CANCEL:
+            check(
+                sequence,
+                exchange.cancel_order(_OrderId(a)),
+                True,
+                f"Cancelling the order {a}",
+            )
+        elif kind == CANCEL_ALL:
+            check(
+                sequence,
+                exchange.cancel_all(traders[a]),
+                b,
+                f"Cancelling the orders of the trader {a}",
+            )
+        elif kind == AMEND:
+            check(
+                sequence,
+                exchange.amend_order(_OrderId(a), b),
+                True,
+                f"Amending the order {a}",
+            )
+        elif kind == AUCTION:
+            auction = True
+        else:
+            raise ValueError(f"Unknown record kind {kind} at {sequence}")
+    replay_operation(expected_sequence)
+    return exchange
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Replay an order journal and check its fills."
+    )
+    parser.add_argument("path")
+    parser.add_argument(
+        "--engine",
+        choices=("exchange", "array", "auction"),
+        default="exchange",
+    )
+    args = parser.parse_args()
+
+    if args.engine == "array":
+        from async_exchange.array_exchange import ArrayExchange
+
+        exchange = ArrayExchange()
+    elif args.engine == "auction":
+        from async_exchange.batch_auction import BatchAuctionExchange
+
+        exchange = BatchAuctionExchange()
+    else:
+        exchange = Exchange()
+
+    records = (os.path.getsize(args.path) - len(MAGIC)) // RECORD.size
+    start = time.perf_counter()
+    replay(args.path, exchange)
+    elapsed = time.perf_counter() - start
+    print(
+        f"Replayed {records:,} records in {elapsed:.2f} s"
+        f" ({records / elapsed:,.0f} records/s): identical fills"
+    )
+
+
+if __name__ == "__main__":
+    main()
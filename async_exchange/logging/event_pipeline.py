@@ -0,0 +1,205 @@
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+DROP = "drop"
+BLOCK = "block"
+SAMPLE = "sample"
+BACKPRESSURE_POLICIES = (DROP, BLOCK, SAMPLE)
+
+DEFAULT_CAPACITY = 65536
+DEFAULT_BATCH_SIZE = 1000
+
+
+class EventPipeline:
+    """Non-blocking logger forwarding events to another ``logger``.
+
+    ``send_event`` only puts a ``(record_type, message)`` tuple in a bounded
+    ring buffer. A background thread drains the buffer in batches of up to
+    ``batch_size`` events, and passes them to ``logger.send_events`` as
+    columns (a dict of field name to the list of values) if the logger has
+    this bulk method, or else to ``logger.send_event`` one by one.
+
+    When the buffer is full, the ``backpressure`` policy applies:
+    - ``"drop"``: the new event is dropped;
+    - ``"block"``: ``send_event`` waits until there is room in the buffer;
+    - ``"sample"``: like ``"drop"``, but already once the buffer is filled
+      above ``sample_threshold``, only one of every ``sample_every`` events
+      is kept.
+    Dropped and sampled out events are counted in ``stats``, as are the
+    events the logger failed to send (``"failed"``): a failure is logged,
+    and the following events of the batch are still sent.
+    """
+
+    def __init__(
+        self,
+        logger,
+        capacity=DEFAULT_CAPACITY,
+        batch_size=DEFAULT_BATCH_SIZE,
+        backpressure=DROP,
+        sample_threshold=0.5,
+        sample_every=10,
+    ):
+        if backpressure not in BACKPRESSURE_POLICIES:
+            raise ValueError(
+                f"Unknown backpressure policy {backpressure!r}, expected "
+                f"one of {BACKPRESSURE_POLICIES}"
+            )
+        self.logger = logger
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.backpressure = backpressure
+        self._sample_size = int(sample_threshold * capacity)
+        self._sample_every = sample_every
+        self._sample_count = 0
+
+        self._buffer = [None] * capacity
+        self._head = 0
+        self._size = 0
+        # Number of events taken by the background thread and not yet sent
+        self._in_flight = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._drained = threading.Condition(self._lock)
+
+        self.stats = {
+            "enqueued": 0,
+            "sent": 0,
+            "failed": 0,
+            "dropped": 0,
+            "sampled": 0,
+        }
+
+        self._thread = threading.Thread(
+            target=self._drain, name="EventPipeline", daemon=True
+        )
+        self._thread.start()
+
+    def send_event(self, record_type, message):
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("The EventPipeline is closed")
+
+            if self._size >= self._sample_size and self.backpressure == SAMPLE:
+                self._sample_count += 1
+                if self._sample_count % self._sample_every != 0:
+                    self.stats["sampled"] += 1
+                    return
+
+            if self._size == self.capacity:
+                if self.backpressure != BLOCK:
+                    self.stats["dropped"] += 1
+                    return
+                while self._size == self.capacity:
+                    self._not_full.wait()
+
+            tail = (self._head + self._size) % self.capacity
+            self._buffer[tail] = (record_type, message)
+            self._size += 1
+            self.stats["enqueued"] += 1
+            self._not_empty.notify()
+
+    def _take_batch(self):
+        """Take up to ``batch_size`` events from the buffer. Returns an
+        empty list when the pipeline is closed and drained."""
+        with self._lock:
+            while self._size == 0 and not self._closed:
+                self._not_empty.wait()
+
+            batch = []
+            for _ in range(min(self._size, self.batch_size)):
+                batch.append(self._buffer[self._head])
+                self._buffer[self._head] = None
+                self._head = (self._head + 1) % self.capacity
+            self._size -= len(batch)
+            self._in_flight = len(batch)
+            self._not_full.notify_all()
+            return batch
+
+    def _drain(self):
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                break
+            failed, error = self._send_batch(batch)
+            if failed:
+                logger.error(
+                    f"Could not send {failed} of {len(batch)} events.",
+                    exc_info=error,
+                )
+            with self._lock:
+                self.stats["sent"] += len(batch) - failed
+                self.stats["failed"] += failed
+                self._in_flight = 0
+                self._drained.notify_all()
+
+    def _send_batch(self, batch):
+        """Send the ``batch``, going on after a failure. Returns the number
+        of events that could not be sent, and the first exception."""
+        failed = 0
+        error = None
+        send_events = getattr(self.logger, "send_events", None)
+        if send_events is None:
+            for record_type, message in batch:
+                try:
+                    self.logger.send_event(
+                        record_type=record_type, message=message
+                    )
+                except Exception as send_error:
+                    failed += 1
+                    error = error or send_error
+            return failed, error
+
+        # Send the consecutive events of the same type and fields as columns
+        start = 0
+        for index in range(1, len(batch) + 1):
+            record_type, message = batch[start]
+            if index < len(batch):
+                next_record_type, next_message = batch[index]
+                if next_record_type == record_type and (
+                    next_message.keys() == message.keys()
+                ):
+                    continue
+            messages = [message for _, message in batch[start:index]]
+            try:
+                send_events(
+                    record_type,
+                    {
+                        field: [message[field] for message in messages]
+                        for field in messages[0]
+                    },
+                )
+            except Exception as send_error:
+                failed += len(messages)
+                error = error or send_error
+            start = index
+        return failed, error
+
+    def flush(self, timeout=None) -> bool:
+        """Wait until all enqueued events are sent. Returns ``False`` if the
+        ``timeout`` expired first."""
+        with self._lock:
+            return self._drained.wait_for(
+                lambda: self._size == 0 and self._in_flight == 0, timeout
+            )
+
+    def close(self):
+        """Send the remaining events, stop the background thread, and flush
+        and close the logger, if it has these methods."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._not_empty.notify_all()
+        self._thread.join()
+        for name in ("flush", "close"):
+            method = getattr(self.logger, name, None)
+            if method is not None:
+                method()
+
+    def get_events(self, record_type):
+        self.flush()
+        return self.logger.get_events(record_type)
@@ -0,0 +1,175 @@
+import logging
+import os
+import struct
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+TIME_FIELD = "time"
+
+# Fields of the events of each record type, in addition to the time
+DEFAULT_SCHEMAS = {"exchange": (("price", "float64"), ("amount", "int64"))}
+
+MAX_FILE_SIZE = 64 * 1024 * 1024
+
+_STRUCT_CODES = {"int64": "q", "float64": "d"}
+
+
+class _RecordFile:
+    """Appends fixed-width records of one record type to a series of files,
+    starting a new file once the current one reaches ``max_file_size``."""
+
+    def __init__(self, directory, record_type, fields, max_file_size):
+        self.directory = directory
+        self.record_type = record_type
+        self.fields = tuple(name for name, _ in fields)
+        self.dtype = np.dtype(
+            [(TIME_FIELD, "<i8")]
+            + [(name, "<" + np.dtype(kind).str[1:]) for name, kind in fields]
+        )
+        self._struct = struct.Struct(
+            "<q" + "".join(_STRUCT_CODES[kind] for _, kind in fields)
+        )
+        # Rotate before the file exceeds ``max_file_size``, but keep at least
+        # one record per file
+        self._records_per_file = max(1, max_file_size // self.dtype.itemsize)
+
+        self._index = len(self.paths()) - 1
+        self._file = None
+        self._records = 0
+        if self._index >= 0:
+            self._records = (
+                os.path.getsize(self.paths()[-1]) // self.dtype.itemsize
+            )
+        self._open_next_file()
+
+    def paths(self):
+        prefix = f"{self.record_type}."
+        names = sorted(
+            name
+            for name in os.listdir(self.directory)
+            if name.startswith(prefix) and name.endswith(".bin")
+        )
+        return [os.path.join(self.directory, name) for name in names]
+
+    def _path(self, index):
+        return os.path.join(
+            self.directory, f"{self.record_type}.{index:06d}.bin"
+        )
+
+    def _open_next_file(self):
+        if self._file is not None:
+            self._file.close()
+        if self._index < 0 or self._records >= self._records_per_file:
+            self._index += 1
+            self._records = 0
+        self._file = open(self._path(self._index), "ab")
+
+    def append(self, timestamp, message):
+        if self._records >= self._records_per_file:
+            self._open_next_file()
+        self._file.write(
+            self._struct.pack(
+                timestamp, *(message[field] for field in self.fields)
+            )
+        )
+        self._records += 1
+
+    def extend(self, timestamp, columns):
+        size = len(columns[self.fields[0]])
+        records = np.empty(size, dtype=self.dtype)
+        records[TIME_FIELD] = timestamp
+        for field in self.fields:
+            records[field] = columns[field]
+
+        start = 0
+        while start < size:
+            if self._records >= self._records_per_file:
+                self._open_next_file()
+            stop = min(size, start + self._records_per_file - self._records)
+            self._file.write(records[start:stop].tobytes())
+            self._records += stop - start
+            start = stop
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def read(self):
+        """Get read-only memory-mapped views of the records of every file."""
+        self.flush()
+        segments = []
+        for path in self.paths():
+            size = os.path.getsize(path) // self.dtype.itemsize
+            if size == 0:
+                continue
+            segments.append(
+                np.memmap(path, dtype=self.dtype, mode="r", shape=(size,))
+            )
+        return segments
+
+
+class FileLogger:
+    """Logger appending the events to local binary files.
+
+    The events of every record type are stored as fixed-width records (a
+    ``time`` in nanoseconds followed by the fields of the record type's
+    schema) in the files ``<record_type>.<index>.bin`` of the ``directory``.
+    A new file is started when the current one reaches ``max_file_size``
+    bytes.
+
+    ``schemas`` maps every record type to its ``(field, dtype)`` pairs, the
+    dtypes being ``"int64"`` or ``"float64"``. By default, only the
+    ``"exchange"`` events of the ``Exchange`` are logged.
+
+    Requires the optional ``numpy`` dependency.
+    """
+
+    def __init__(
+        self, directory, schemas=None, max_file_size=MAX_FILE_SIZE
+    ):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        if schemas is None:
+            schemas = DEFAULT_SCHEMAS
+        self._files = {
+            record_type: _RecordFile(
+                directory, record_type, fields, max_file_size
+            )
+            for record_type, fields in schemas.items()
+        }
+
+    def _file(self, record_type):
+        try:
+            return self._files[record_type]
+        except KeyError:
+            raise ValueError(
+                f"No schema for the record type {record_type!r}"
+            ) from None
+
+    def send_event(self, record_type, message):
+        self._file(record_type).append(time.time_ns(), message)
+
+    def send_events(self, record_type, columns):
+        """Log a batch of events given as ``columns``, a dict of field name
+        to the list (or array) of values."""
+        self._file(record_type).extend(time.time_ns(), columns)
+
+    def get_events(self, record_type):
+        """Get the events of the ``record_type`` as a list of read-only
+        NumPy structured arrays, one per file, memory-mapped from the files
+        without copying. A column of a file is e.g. ``segment["price"]``.
+        """
+        return self._file(record_type).read()
+
+    def flush(self):
+        for record_file in self._files.values():
+            record_file.flush()
+
+    def close(self):
+        for record_file in self._files.values():
+            record_file.close()
@@ -1,4 +1,6 @@
 import logging
+from numbers import Integral, Real
+import time
 
 from influxdb_client import (
     BucketRetentionRules,
@@ -26,16 +28,78 @@ FIELDS_TYPE_FIELD = "fields"
 LOG_BATCH_SIZE = 1000
 
 
+def _escape(name, special_characters):
+    name = name.replace("\\", "\\\\")
+    for character in special_characters:
+        name = name.replace(character, "\\" + character)
+    return name
+
+
+def _format_field(key, value):
+    """Format a field of the line protocol like the ``Point`` does."""
+    if isinstance(value, bool):
+        value = "true" if value else "false"
+    elif isinstance(value, Integral):
+        value = f"{value}i"
+    elif isinstance(value, Real):
+        value = repr(float(value))
+    else:
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"')
+        value = f'"{value}"'
+    return f"{key}={value}"
+
+
+def _format_column(key, values):
+    """Format the fields of a column, ``None`` standing for missing values."""
+    fields = []
+    for value in values:
+        # Fast paths of the most common types
+        kind = type(value)
+        if kind is float:
+            fields.append(f"{key}={value!r}")
+        elif kind is int:
+            fields.append(f"{key}={value}i")
+        elif value is None:
+            fields.append(None)
+        else:
+            fields.append(_format_field(key, value))
+    return fields
+
+
+def to_line_protocol(record_type, columns, timestamp):
+    """Serialise the events given as ``columns``, a dict of field name to
+    the list of values, to lines of the InfluxDB line protocol.
+
+    The events get consecutive nanosecond timestamps from ``timestamp``, so
+    that the points of a batch do not overwrite each other. ``None`` values
+    are skipped.
+    """
+    measurement = _escape(record_type, ", ")
+    formatted_columns = [
+        _format_column(_escape(str(key), ",= "), values)
+        for key, values in columns.items()
+    ]
+    lines = []
+    for index, fields in enumerate(zip(*formatted_columns), timestamp):
+        if None in fields:
+            fields = [field for field in fields if field is not None]
+            if not fields:
+                continue
+        lines.append(f"{measurement} {','.join(fields)} {index}")
+    return lines
+
+
 class InfluxDBLogger:
     def __init__(
         self,
         bucket_name=BUCKET,
         batch_size=LOG_BATCH_SIZE,
         data_retention=3600,
+        url=INFLUXDB_URL,
     ):
         self.organization = ORGANIZATION
         self.client = InfluxDBClient(
-            url=INFLUXDB_URL, token=INFLUXDB_TOKEN, org=self.organization
+            url=url, token=INFLUXDB_TOKEN, org=self.organization
         )
         self.batch_size = batch_size
         self.bucket_name = bucket_name
@@ -68,6 +132,16 @@ class InfluxDBLogger:
             point = point.field(key, value)
         self.write_api.write(bucket=self.bucket_name, record=point)
 
+    def send_events(self, record_type, columns):
+        """Log a batch of events given as ``columns``, a dict of field name
+        to the list of values.
+
+        The batch is serialised straight to the line protocol and written at
+        once, which is much faster than a ``send_event`` per event.
+        """
+        lines = to_line_protocol(record_type, columns, time.time_ns())
+        self.write_api.write(bucket=self.bucket_name, record=lines)
+
     def get_events(self, record_type):
         query = '''
             from(bucket: currentBucket)
@@ -0,0 +1,104 @@
+import os
+import tempfile
+import unittest
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from async_exchange.exchange import Exchange
+from async_exchange.trader import Trader
+
+if np is not None:
+    from async_exchange.logging.file_logger import FileLogger
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestFileLogger(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.logger = FileLogger(self.directory)
+        self.addCleanup(self.logger.close)
+
+    def test_send_event_get_event(self):
+        self.logger.send_event(
+            record_type="exchange", message={"price": 10.5, "amount": 3}
+        )
+        segment, = self.logger.get_events("exchange")
+        event, = segment
+        self.assertEqual(event["price"], 10.5)
+        self.assertEqual(event["amount"], 3)
+        self.assertGreater(event["time"], 0)
+
+    def test_events_are_memory_mapped(self):
+        self.logger.send_event(
+            record_type="exchange", message={"price": 1, "amount": 2}
+        )
+        segment, = self.logger.get_events("exchange")
+        self.assertIsInstance(segment, np.memmap)
+        self.assertFalse(segment.flags.writeable)
+        self.assertIsInstance(segment["price"], np.memmap)
+
+    def test_send_events(self):
+        self.logger.send_events(
+            "exchange", {"price": [1.0, 2.0, 3.0], "amount": [4, 5, 6]}
+        )
+        segment, = self.logger.get_events("exchange")
+        np.testing.assert_array_equal(segment["price"], [1.0, 2.0, 3.0])
+        np.testing.assert_array_equal(segment["amount"], [4, 5, 6])
+
+    def test_unknown_record_type(self):
+        with self.assertRaises(ValueError):
+            self.logger.send_event(record_type="unknown", message={})
+
+    def test_rotation(self):
+        # Records of a time, a price and an amount take 24 bytes
+        logger = FileLogger(
+            os.path.join(self.directory, "rotated"), max_file_size=48
+        )
+        self.addCleanup(logger.close)
+        logger.send_event("exchange", {"price": 1, "amount": 1})
+        logger.send_events(
+            "exchange", {"price": [2, 3, 4, 5], "amount": [2, 3, 4, 5]}
+        )
+
+        segments = logger.get_events("exchange")
+        self.assertEqual([len(segment) for segment in segments], [2, 2, 1])
+        np.testing.assert_array_equal(
+            np.concatenate([segment["price"] for segment in segments]),
+            [1, 2, 3, 4, 5],
+        )
+        for name in os.listdir(logger.directory):
+            path = os.path.join(logger.directory, name)
+            self.assertLessEqual(os.path.getsize(path), 48)
+
+    def test_reopen_appends(self):
+        self.logger.send_event("exchange", {"price": 1, "amount": 1})
+        self.logger.close()
+
+        logger = FileLogger(self.directory)
+        self.addCleanup(logger.close)
+        logger.send_event("exchange", {"price": 2, "amount": 2})
+        segment, = logger.get_events("exchange")
+        np.testing.assert_array_equal(segment["price"], [1, 2])
+
+    def test_exchange_logging(self):
+        exchange = Exchange(logger=self.logger)
+        buyer = Trader(money=100, stocks=0)
+        seller = Trader(money=0, stocks=10)
+        for trader in (buyer, seller):
+            exchange.register_trader(trader)
+        seller.sell(5, 4)
+        buyer.buy(5, 4)
+
+        segment, = self.logger.get_events("exchange")
+        self.assertEqual(len(segment), 1)
+        self.assertEqual(segment[0]["price"], 4)
+        self.assertEqual(segment[0]["amount"], 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
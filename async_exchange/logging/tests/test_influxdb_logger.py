@@ -2,7 +2,10 @@ import unittest
 
 from influxdb_client.client.write_api import SYNCHRONOUS
 
-from async_exchange.logging.influxdb_logger import InfluxDBLogger
+from async_exchange.logging.influxdb_logger import (
+    InfluxDBLogger,
+    to_line_protocol
+)
 
 
 class TestInfluxDBLogger(unittest.TestCase):
@@ -32,11 +35,51 @@ class TestInfluxDBLogger(unittest.TestCase):
         self.assertEqual(point["data"], "my data")
         self.assertEqual(point["another data"], "something else")
 
+    def test_send_events_get_events(self):
+        self.logger.write_api = self.logger.client.write_api(
+            write_options=SYNCHRONOUS
+        )
+
+        self.logger.send_events(
+            record_type="type",
+            columns={"price": [1.5, 2.5], "amount": [3, 4]},
+        )
+        points = self.logger.get_events("type")
+        self.assertEqual([point["price"] for point in points], [1.5, 2.5])
+        self.assertEqual([point["amount"] for point in points], [3, 4])
+
     def test_batch_set(self):
         self.assertEqual(
             self.logger.write_api._write_options.batch_size, 10
         )
 
 
+class TestLineProtocol(unittest.TestCase):
+    def test_fields(self):
+        lines = to_line_protocol(
+            "exchange",
+            {"price": [1.5, 2], "amount": [3, 4], "symbol": ["A", 'B "1"']},
+            timestamp=100,
+        )
+        self.assertEqual(
+            lines,
+            [
+                'exchange price=1.5,amount=3i,symbol="A" 100',
+                'exchange price=2i,amount=4i,symbol="B \\"1\\"" 101',
+            ],
+        )
+
+    def test_escaping(self):
+        (line,) = to_line_protocol(
+            "my type", {"a,b=c": [True], "skipped": [None]}, timestamp=0
+        )
+        self.assertEqual(line, "my\\ type a\\,b\\=c=true 0")
+
+    def test_no_fields(self):
+        self.assertEqual(
+            to_line_protocol("exchange", {"price": [None]}, timestamp=0), []
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,221 @@
+"""Streaming market data of an ``Exchange``.
+
+Subscribers get the changes of the order book pushed into an
+``asyncio.Queue`` instead of polling the whole book:
+- ``BookUpdate``: the new total volume of a price level, 0 when the level is
+  gone;
+- ``Trade``: a trade print;
+- ``BookSnapshot``: the whole order book, sent on subscription and then
+  every ``snapshot_interval`` messages.
+
+Updates and trades are numbered by a ``sequence`` shared by all subscribers.
+A snapshot carries the sequence of the last message it includes, so a
+subscriber that missed messages (because its queue was full) can discard
+everything until the next snapshot, and apply the later messages to it.
+"""
+import asyncio
+from collections import namedtuple
+from heapq import heapify, heappop, heappush
+import logging
+
+from async_exchange.orders import BUY, SELL
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SNAPSHOT_INTERVAL = 1000
+
+BookUpdate = namedtuple("BookUpdate", ("sequence", "side", "price", "volume"))
+Trade = namedtuple("Trade", ("sequence", "price", "amount"))
+BookSnapshot = namedtuple(
+    "BookSnapshot", ("sequence", "buy_levels", "sell_levels")
+)
+
+
+class _Subscription:
+    __slots__ = ("queue", "snapshot_interval", "last_snapshot", "dropped")
+
+    def __init__(self, queue, snapshot_interval, sequence):
+        self.queue = queue
+        self.snapshot_interval = snapshot_interval
+        self.last_snapshot = sequence
+        self.dropped = 0
+
+
+class MarketDataFeed:
+    """Publishes the changes of the order book of an ``exchange``.
+
+    The exchange records the price levels it changes with ``level_changed``,
+    and calls ``publish`` with the fills at the end of every operation. The
+    changes of a level within an operation are coalesced into a single
+    ``BookUpdate``.
+    """
+
+    def __init__(self, exchange):
+        self._exchange = exchange
+        self._subscriptions = {}
+        # (side, price) of the levels changed since the last ``publish``
+        self._changed = {}
+        self.sequence = 0
+
+    def __len__(self):
+        return len(self._subscriptions)
+
+    def subscribe(
+        self, maxsize=0, snapshot_interval=DEFAULT_SNAPSHOT_INTERVAL
+    ) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=maxsize)
+        subscription = _Subscription(queue, snapshot_interval, self.sequence)
+        self._subscriptions[queue] = subscription
+        self._push(subscription, self._snapshot())
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> bool:
+        return self._subscriptions.pop(queue, None) is not None
+
+    def level_changed(self, side, price):
+        self._changed[(side, price)] = None
+
+    def _snapshot(self):
+        buy_levels, sell_levels = (
+            {price: volume for price, volume in volumes.items() if volume > 0}
+            for volumes in self._exchange.get_orderbook()
+        )
+        return BookSnapshot(self.sequence, buy_levels, sell_levels)
+
+    def _push(self, subscription, message):
+        try:
+            subscription.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            subscription.dropped += 1
+
+    def publish(self, fills=()):
+        """Push the ``fills`` and the changed levels to the subscribers."""
+        messages = []
+        for fill in fills:
+            self.sequence += 1
+            messages.append(Trade(self.sequence, fill.price, fill.amount))
+
+        levels = self._exchange._levels
+        for side, price in self._changed:
+            level = levels[side].get(price)
+            self.sequence += 1
+            messages.append(
+                BookUpdate(
+                    self.sequence,
+                    side,
+                    price,
+                    0 if level is None else level.volume,
+                )
+            )
+        self._changed.clear()
+
+        snapshot = None
+        for subscription in self._subscriptions.values():
+            for message in messages:
+                self._push(subscription, message)
+            if (
+                self.sequence - subscription.last_snapshot
+                >= subscription.snapshot_interval
+            ):
+                if snapshot is None:
+                    snapshot = self._snapshot()
+                self._push(subscription, snapshot)
+                subscription.last_snapshot = self.sequence
+
+
+class LocalBook:
+    """An order book maintained from the messages of a market data feed.
+
+    ``apply`` every message received from the queue, in order. After a gap
+    in the sequence numbers, the messages are ignored until the next
+    snapshot.
+
+    Like ``PriceLevels``, the prices of each side are indexed in a heap, so
+    the best prices are available in amortized O(1). Prices of removed
+    levels are dropped from the heap lazily, when they reach its top.
+    """
+
+    # Sign of the prices in the heap of each side, indexed by the side, to
+    # keep the best price (the highest buy, the lowest sell) on top
+    _SIGNS = (-1, 1)
+
+    def __init__(self):
+        self.levels = ({}, {})
+        # Heaps of the signed prices of each side, indexed by the side
+        self._heaps = [[], []]
+        self.sequence = None
+        self.last_trade = None
+
+    @property
+    def buy_levels(self):
+        return self.levels[BUY]
+
+    @property
+    def sell_levels(self):
+        return self.levels[SELL]
+
+    @property
+    def synced(self):
+        return self.sequence is not None
+
+    def apply(self, message):
+        if isinstance(message, BookSnapshot):
+            if self.synced and message.sequence < self.sequence:
+                return
+            self.levels = (
+                dict(message.buy_levels), dict(message.sell_levels)
+            )
+            for side in (BUY, SELL):
+                self._rebuild_heap(side)
+            self.sequence = message.sequence
+            return
+
+        if not self.synced or message.sequence <= self.sequence:
+            return
+        if message.sequence != self.sequence + 1:
+            logger.warning(
+                f"Missed the market data messages {self.sequence + 1} to"
+                f" {message.sequence - 1}. Waiting for the next snapshot."
+            )
+            self.sequence = None
+            return
+
+        self.sequence = message.sequence
+        if isinstance(message, Trade):
+            self.last_trade = message
+        elif message.volume == 0:
+            self.levels[message.side].pop(message.price, None)
+        else:
+            levels = self.levels[message.side]
+            if message.price not in levels:
+                heap = self._heaps[message.side]
+                heappush(heap, self._SIGNS[message.side] * message.price)
+                if len(heap) > 2 * len(levels) + 64:
+                    self._rebuild_heap(message.side)
+            levels[message.price] = message.volume
+
+    def _rebuild_heap(self, side):
+        """Index the prices of the ``side`` only, without the stale ones."""
+        sign = self._SIGNS[side]
+        heap = [sign * price for price in self.levels[side]]
+        heapify(heap)
+        self._heaps[side] = heap
+
+    def _best_price(self, side):
+        levels = self.levels[side]
+        heap = self._heaps[side]
+        sign = self._SIGNS[side]
+        while heap:
+            price = sign * heap[0]
+            if price in levels:
+                return price
+            heappop(heap)
+        return None
+
+    @property
+    def best_buy(self):
+        return self._best_price(BUY)
+
+    @property
+    def best_sell(self):
+        return self._best_price(SELL)
@@ -0,0 +1,482 @@
+"""A multi-instrument exchange hosting one order book per symbol.
+
+The books can be sharded across worker processes. To keep the traders'
+balances consistent without sharing them between processes, the
+``MultiExchange`` reserves the money of buy orders and the stocks of sell
+orders when they are submitted. The books only match fully reserved orders,
+and the resulting fills are settled by the ``MultiExchange``.
+"""
+from collections import defaultdict
+import logging
+import multiprocessing
+
+from async_exchange.exchange import Exchange, ExchangeAPI, TopOfBook
+from async_exchange.orders import BUY, ORDER_CLASSES, SELL, _Order
+from async_exchange.trader import Trader
+
+logger = logging.getLogger(__name__)
+
+
+class ShardExchange(Exchange):
+    """An ``Exchange`` matching orders whose assets are already reserved.
+
+    The order owners are trader ids, and the assets are exchanged by the
+    ``MultiExchange`` from the fills.
+    """
+
+    def _exchange_assets(self, buyer, seller, stocks: int, money: int):
+        pass
+
+    def cancel_order_by_id(self, order_id: int) -> bool:
+        order = self._orders.get(order_id)
+        return order is not None and self.cancel_order(order)
+
+    def amend_order_by_id(self, order_id: int, amount: int) -> bool:
+        order = self._orders.get(order_id)
+        return order is not None and self.amend_order(order, amount)
+
+
+class Shard:
+    """Order books of a subset of the symbols."""
+
+    def __init__(self):
+        self.exchanges = defaultdict(ShardExchange)
+
+    def process_orders(self, orders):
+        """Process ``(symbol, side, amount, price, owner_id)`` orders.
+        Returns the assigned order id and the fills of every order, or
+        ``None`` and the exception raised by an order that could not be
+        processed."""
+        results = []
+        for symbol, side, amount, price, owner_id in orders:
+            try:
+                order = ORDER_CLASSES[side](owner_id, amount, price)
+                fills = self.exchanges[symbol].process_orders((order,))
+            except Exception as error:
+                results.append((None, error))
+            else:
+                results.append((order.id, fills))
+        return results
+
+    def cancel_orders(self, orders):
+        """Cancel ``(symbol, order_id)`` orders."""
+        return [
+            self.exchanges[symbol].cancel_order_by_id(order_id)
+            for symbol, order_id in orders
+        ]
+
+    def amend_order(self, symbol, order_id, amount):
+        return self.exchanges[symbol].amend_order_by_id(order_id, amount)
+
+    def get_orderbook(self, symbol, depth):
+        return self.exchanges[symbol].get_orderbook(depth)
+
+
+class LocalShard:
+    """A ``Shard`` running in the current process."""
+
+    def __init__(self):
+        self._shard = Shard()
+        self._result = None
+
+    def send(self, command, *args):
+        # Like a ``ProcessShard``, an exception is raised by ``receive``
+        try:
+            self._result = (True, getattr(self._shard, command)(*args))
+        except Exception as error:
+            self._result = (False, error)
+
+    def receive(self):
+        success, result = self._result
+        self._result = None
+        if not success:
+            raise result
+        return result
+
+    def close(self):
+        pass
+
+
+def _serve_shard(connection):
+    shard = Shard()
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        command, args = message
+        try:
+            connection.send((True, getattr(shard, command)(*args)))
+        except Exception as error:
+            connection.send((False, error))
+    connection.close()
+
+
+class ProcessShard:
+    """A ``Shard`` running in a worker process.
+
+    Sending a command does not wait for its result, so the commands sent to
+    several shards are executed in parallel.
+    """
+
+    def __init__(self, context=multiprocessing):
+        self._connection, worker_connection = context.Pipe()
+        self._process = context.Process(
+            target=_serve_shard, args=(worker_connection,), daemon=True
+        )
+        self._process.start()
+        worker_connection.close()
+
+    def send(self, command, *args):
+        self._connection.send((command, args))
+
+    def receive(self):
+        success, result = self._connection.recv()
+        if not success:
+            raise result
+        return result
+
+    def close(self):
+        self._connection.send(None)
+        self._process.join()
+        self._connection.close()
+
+
+class MultiExchange:
+    """An exchange hosting an order book per symbol in ``symbols``.
+
+    With ``workers`` > 0, the books are sharded across that many worker
+    processes. Orders must have a ``symbol``, and the traders' stocks of
+    every symbol are kept in their ``holdings``.
+
+    Submitting an order reserves the money (at the order's price) or the
+    stocks it needs; an order exceeding the trader's assets is reduced to
+    what the trader can afford. The unused reservation is returned when an
+    order is cancelled or filled at a better price.
+    """
+
+    def __init__(self, symbols, logger=None, workers=0):
+        self.symbols = tuple(symbols)
+        self._logger = logger
+
+        if workers > 0:
+            self._shards = [ProcessShard() for _ in range(workers)]
+        else:
+            self._shards = [LocalShard()]
+        self._shard_of = {
+            symbol: self._shards[index % len(self._shards)]
+            for index, symbol in enumerate(self.symbols)
+        }
+
+        # (symbol, order id) -> standing order
+        self._orders = {}
+        self._owner_orders = {}
+
+        # Versions of the books, incremented by every operation on them,
+        # and the cached ``TopOfBook`` of each symbol
+        self._versions = defaultdict(int)
+        self._tops_of_book = {}
+        self._last_trades = {}
+
+    def log_event(self, event_type, message):
+        if self._logger is not None:
+            self._logger.send_event(record_type=event_type, message=message)
+
+    def _shard(self, symbol):
+        try:
+            return self._shard_of[symbol]
+        except KeyError:
+            raise ValueError(f"Unknown symbol {symbol!r}") from None
+
+    def _reserve(self, order: _Order) -> bool:
+        """Reserve the assets of the ``order``, reducing its amount to what
+        the owner can afford. Returns ``False`` if nothing is left."""
+        trader = order.owner
+        if order.side == BUY:
+            if order.price <= 0:
+                raise ValueError("The price of a buy order must be positive")
+            order.amount = min(order.amount, trader.money // order.price)
+            trader.money -= order.amount * order.price
+        else:
+            stocks = trader.holdings.get(order.symbol, 0)
+            order.amount = min(order.amount, stocks)
+            trader.holdings[order.symbol] = stocks - order.amount
+        return order.amount > 0
+
+    def _release(self, order: _Order, amount: int):
+        """Return the reserved assets of ``amount`` of the ``order``."""
+        trader = order.owner
+        if order.side == BUY:
+            trader.money += amount * order.price
+        else:
+            trader.holdings[order.symbol] += amount
+
+    def _add_order(self, order: _Order):
+        self._orders[(order.symbol, order.id)] = order
+        self._owner_orders.setdefault(order.owner, {})[
+            (order.symbol, order.id)
+        ] = order
+
+    def _discard_order(self, order: _Order):
+        key = (order.symbol, order.id)
+        del self._orders[key]
+        owner_orders = self._owner_orders[order.owner]
+        del owner_orders[key]
+        if len(owner_orders) == 0:
+            del self._owner_orders[order.owner]
+
+    def _settle(self, symbol, fill):
+        buy_order = self._orders[(symbol, fill.buy_order_id)]
+        sell_order = self._orders[(symbol, fill.sell_order_id)]
+        buyer = buy_order.owner
+        seller = sell_order.owner
+
+        buyer.holdings[symbol] = buyer.holdings.get(symbol, 0) + fill.amount
+        # The buyer's money was reserved at the price of the buy order
+        buyer.money += (buy_order.price - fill.price) * fill.amount
+        seller.money += fill.price * fill.amount
+
+        self._last_trades[symbol] = (fill.price, fill.amount)
+        for order in (buy_order, sell_order):
+            order.amount -= fill.amount
+            if order.amount == 0:
+                self._discard_order(order)
+
+        self.log_event(
+            event_type="exchange",
+            message={
+                "price": fill.price,
+                "amount": fill.amount,
+                "symbol": symbol,
+            },
+        )
+
+    def process_order(self, order: _Order):
+        self.process_orders((order,))
+
+    def process_orders(self, orders) -> list:
+        """Process a batch of ``orders``. The orders of the different shards
+        are matched in parallel. Returns a list of ``(symbol, Fill)``.
+        """
+        # Resolved before anything is reserved, as an unknown symbol fails
+        # the whole batch
+        shards = [self._shard(order.symbol) for order in orders]
+        batches = defaultdict(list)
+        try:
+            for shard, order in zip(shards, orders):
+                if order.amount > 0 and self._reserve(order):
+                    batches[shard].append(order)
+                    self._versions[order.symbol] += 1
+        except Exception:
+            for batch in batches.values():
+                self._release_orders(batch)
+            raise
+
+        sent, error = self._send_batches(
+            batches,
+            "process_orders",
+            lambda batch: [
+                (
+                    order.symbol,
+                    order.side,
+                    order.amount,
+                    order.price,
+                    order.owner._id,
+                )
+                for order in batch
+            ],
+        )
+        for shard, batch in batches.items():
+            if shard not in sent:
+                self._release_orders(batch)
+
+        # Every reply is read, so that the shards are left in sync, before
+        # an error is raised
+        fills = []
+        for shard, batch in sent.items():
+            try:
+                results = shard.receive()
+            except Exception as receive_error:
+                self._release_orders(batch)
+                error = error or receive_error
+                continue
+            for order, (order_id, result) in zip(batch, results):
+                if order_id is None:
+                    # Not accepted by the shard
+                    self._release(order, order.amount)
+                    error = error or result
+                    continue
+                order._id = order_id
+                self._add_order(order)
+                for fill in result:
+                    self._settle(order.symbol, fill)
+                    fills.append((order.symbol, fill))
+        if error is not None:
+            raise error
+        return fills
+
+    def _release_orders(self, orders):
+        for order in orders:
+            self._release(order, order.amount)
+
+    def _send_batches(self, batches, command, arguments):
+        """Send the ``command`` with the ``arguments`` of its batch to every
+        shard. Returns the batches sent, and the first error raised by a
+        send."""
+        sent = {}
+        error = None
+        for shard, batch in batches.items():
+            try:
+                shard.send(command, arguments(batch))
+            except Exception as send_error:
+                error = error or send_error
+                continue
+            sent[shard] = batch
+        return sent, error
+
+    def _cancel_orders(self, orders) -> list:
+        batches = defaultdict(list)
+        for order in orders:
+            batches[self._shard(order.symbol)].append(order)
+            self._versions[order.symbol] += 1
+        sent, error = self._send_batches(
+            batches,
+            "cancel_orders",
+            lambda batch: [(order.symbol, order.id) for order in batch],
+        )
+
+        results = []
+        for shard, batch in sent.items():
+            try:
+                cancelled_orders = shard.receive()
+            except Exception as receive_error:
+                error = error or receive_error
+                continue
+            for order, cancelled in zip(batch, cancelled_orders):
+                if cancelled:
+                    self._release(order, order.amount)
+                    self._discard_order(order)
+                results.append(cancelled)
+        if error is not None:
+            raise error
+        return results
+
+    def cancel_order(self, order: _Order) -> bool:
+        standing_order = self._orders.get((order.symbol, order.id))
+        if standing_order is None:
+            return False
+        (cancelled,) = self._cancel_orders((standing_order,))
+        return cancelled
+
+    def cancel_all(self, trader: Trader) -> int:
+        owner_orders = tuple(self._owner_orders.get(trader, {}).values())
+        return sum(self._cancel_orders(owner_orders))
+
+    def amend_order(self, order: _Order, amount: int) -> bool:
+        standing_order = self._orders.get((order.symbol, order.id))
+        if standing_order is None:
+            return False
+        if amount <= 0:
+            return self.cancel_order(standing_order)
+
+        extra_amount = amount - standing_order.amount
+        if extra_amount > 0:
+            extra_order = ORDER_CLASSES[standing_order.side](
+                standing_order.owner,
+                extra_amount,
+                standing_order.price,
+                symbol=standing_order.symbol,
+            )
+            if not self._reserve(extra_order) or (
+                extra_order.amount < extra_amount
+            ):
+                self._release(extra_order, extra_order.amount)
+                return False
+
+        shard = self._shard(standing_order.symbol)
+        self._versions[standing_order.symbol] += 1
+        try:
+            shard.send(
+                "amend_order",
+                standing_order.symbol,
+                standing_order.id,
+                amount,
+            )
+            amended = shard.receive()
+        except Exception:
+            if extra_amount > 0:
+                self._release(standing_order, extra_amount)
+            raise
+        if not amended:
+            if extra_amount > 0:
+                self._release(standing_order, extra_amount)
+            return False
+
+        if extra_amount < 0:
+            self._release(standing_order, -extra_amount)
+        standing_order.amount = amount
+        return True
+
+    def standing_orders(self, trader):
+        owner_orders = self._owner_orders.get(trader, {}).values()
+        buy_orders = tuple(
+            order for order in owner_orders if order.side == BUY
+        )
+        sell_orders = tuple(
+            order for order in owner_orders if order.side == SELL
+        )
+        return buy_orders, sell_orders
+
+    def get_orderbook(self, symbol, depth=None):
+        shard = self._shard(symbol)
+        shard.send("get_orderbook", symbol, depth)
+        return shard.receive()
+
+    def top_of_book(self, symbol) -> TopOfBook:
+        """Get a ``TopOfBook`` of the ``symbol``. The snapshot is cached
+        until the book of the symbol changes."""
+        version = self._versions[symbol]
+        top_of_book = self._tops_of_book.get(symbol)
+        if top_of_book is None or top_of_book.version != version:
+            buy_levels, sell_levels = self.get_orderbook(symbol, depth=1)
+            top_of_book = self._tops_of_book[symbol] = TopOfBook(
+                version,
+                next(iter(buy_levels), None),
+                next(iter(sell_levels), None),
+                *self.last_trade(symbol),
+            )
+        return top_of_book
+
+    def best_bid_ask(self, symbol):
+        top_of_book = self.top_of_book(symbol)
+        return top_of_book.best_buy, top_of_book.best_sell
+
+    def last_trade(self, symbol):
+        return self._last_trades.get(symbol, (None, None))
+
+    def subscribe(self, *args, **kwargs):
+        """The market data is not served by the MultiExchange: raises a
+        ``TypeError``."""
+        raise TypeError("The MultiExchange does not serve market data")
+
+    def unsubscribe(self, queue) -> bool:
+        return False
+
+    def get_stats(self):
+        """The shards are not instrumented."""
+        return None
+
+    def register_trader(self, trader: Trader):
+        """Register a ``trader`` in the MultiExchange.
+        Provides the ``exchange_api`` to the ``trader``.
+        """
+        trader.exchange_api = self.api
+
+    def shutdown(self):
+        """Stop the worker processes."""
+        for shard in self._shards:
+            shard.close()
+        self._shards = []
+
+    @property
+    def api(self):
+        return ExchangeAPI(exchange=self)
@@ -1,13 +1,35 @@
-from uuid import uuid4
+# Order sides. The ``Exchange`` also uses them as indices of its books.
+BUY = 0
+SELL = 1
 
 
 class _Order:
-    def __init__(self, owner, amount, price):
+    __slots__ = (
+        "owner",
+        "amount",
+        "price",
+        "symbol",
+        "_id",
+        "_prev",
+        "_next",
+        "__weakref__",
+    )
+
+    side = None
+
+    def __init__(self, owner, amount, price, symbol=None):
         self.owner = owner
         self.amount = amount
         self.price = price
+        # The instrument traded, only used by a multi-instrument exchange
+        self.symbol = symbol
+
+        # The id is assigned by the ``Exchange`` when the order is submitted
+        self._id = None
 
-        self._id = uuid4()
+        # Neighbours in the price ``Level`` the order is standing in
+        self._prev = None
+        self._next = None
 
     def __repr__(self):
         return f"Trader {self.owner._id} {self.action} {self.amount}"
@@ -18,8 +40,29 @@ class _Order:
 
 
 class BuyOrder(_Order):
+    __slots__ = ()
+
     action = "buys"
+    side = BUY
 
 
 class SellOrder(_Order):
+    __slots__ = ()
+
     action = "sells"
+    side = SELL
+
+
+class _OrderId(_Order):
+    """Stands for the standing order with the ``order_id`` in the
+    ``Exchange`` methods looking orders up by their id."""
+
+    __slots__ = ()
+
+    def __init__(self, order_id):
+        super().__init__(None, 0, None)
+        self._id = order_id
+
+
+# Order classes indexed by the order side
+ORDER_CLASSES = (BuyOrder, SellOrder)
@@ -0,0 +1,65 @@
+import asyncio
+from heapq import heappop, heappush
+from itertools import count
+
+
+class AgentScheduler:
+    """Runs the synchronous ``step`` of many agents from a single priority
+    queue keyed by their next wake-up time.
+
+    ``step`` makes the agent act once, and returns the delay in seconds until
+    its next step, or ``None`` to stop stepping the agent. The agents waking
+    up at the same time step in the order they were scheduled.
+
+    Unlike a coroutine per agent, the scheduler needs a single task and a
+    single timer of the event loop (see ``run``). It can also be driven
+    without an event loop with ``run_until``.
+    """
+
+    def __init__(self):
+        # (wake-up time, tie breaker, agent)
+        self._queue = []
+        self._sequence = count()
+        self.time = 0.0
+
+    def __len__(self):
+        return len(self._queue)
+
+    def add(self, agent, delay=0.0):
+        """Schedule the first ``step`` of the ``agent`` in ``delay`` seconds
+        from the current time of the scheduler."""
+        heappush(self._queue, (self.time + delay, next(self._sequence), agent))
+
+    @property
+    def next_wake_up(self):
+        """The time of the next step, or ``None`` if no agent is left."""
+        if not self._queue:
+            return None
+        return self._queue[0][0]
+
+    def run_until(self, time) -> int:
+        """Step all agents due at or before ``time``, in the order of their
+        wake-up times, and advance the scheduler to ``time``. Returns the
+        number of steps."""
+        queue = self._queue
+        sequence = self._sequence
+        steps = 0
+        while queue and queue[0][0] <= time:
+            wake_up, _, agent = heappop(queue)
+            self.time = wake_up
+            delay = agent.step()
+            steps += 1
+            if delay is not None:
+                heappush(queue, (wake_up + delay, next(sequence), agent))
+        self.time = max(self.time, time)
+        return steps
+
+    async def run(self):
+        """Step the agents on the clock of the running event loop, until no
+        agent is left."""
+        loop = asyncio.get_running_loop()
+        start = loop.time() - self.time
+        while self._queue:
+            delay = start + self.next_wake_up - loop.time()
+            await asyncio.sleep(max(0.0, delay))
+            self.run_until(loop.time() - start)
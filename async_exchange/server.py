@@ -0,0 +1,542 @@
+"""An ``Exchange`` served over a Unix domain socket.
+
+The ``ExchangeServer`` runs the matching engine in one process, and the
+agents connect to it from other processes through an ``ExchangeClient``,
+which provides the ``ExchangeAPI`` of the remote exchange. The traders'
+assets are kept by the server, and their copies in the clients are updated
+from the replies concerning the traders.
+
+Every message is a frame of a 4-byte payload length followed by the payload.
+A request starts with its command code, and a reply with a status byte. The
+numbers are packed with ``struct``: prices and money as doubles (``NaN``
+standing for ``None``), amounts and ids as 64-bit integers. Integral prices
+and money are decoded as ints.
+
+The replies come in the order of the requests, so the client pipelines the
+requests whose result is not needed right away (e.g. ``process_order``),
+and only waits for the replies when it needs a result.
+"""
+import asyncio
+from collections import deque
+import logging
+import math
+import socket
+import struct
+
+from async_exchange.exchange import Exchange, ExchangeAPI, Fill, TopOfBook
+from async_exchange.orders import ORDER_CLASSES, _Order
+from async_exchange.trader import Trader
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PIPELINE_DEPTH = 256
+
+REGISTER = 1
+ORDERS = 2
+CANCEL = 3
+CANCEL_ALL = 4
+AMEND = 5
+STANDING_ORDERS = 6
+ORDERBOOK = 7
+TOP_OF_BOOK = 8
+BALANCE = 9
+
+OK = 0
+ERROR = 1
+
+_LENGTH = struct.Struct("<I")
+_COMMAND = struct.Struct("<B")
+_COUNT = struct.Struct("<I")
+_ID = struct.Struct("<q")
+_FLAG = struct.Struct("<?")
+_BALANCE = struct.Struct("<dq")
+
+_REGISTER = struct.Struct("<dq")
+_CANCEL = struct.Struct("<qq")
+_AMEND = struct.Struct("<qqq")
+# Trader id, side, amount and price of a submitted order
+_ORDER = struct.Struct("<qBqd")
+# Order id assigned to a submitted order, and the owner's balance after the
+# batch
+_ORDER_RESULT = struct.Struct("<qdq")
+_FILL = struct.Struct("<qqdq")
+# Order id, side, amount and price of a standing order
+_STANDING_ORDER = struct.Struct("<qBqd")
+_LEVEL = struct.Struct("<dq")
+_TOP_OF_BOOK = struct.Struct("<qdddd")
+
+
+class RemoteExchangeError(RuntimeError):
+    """An error raised by the exchange server while processing a request."""
+
+
+def _encode_number(value):
+    return math.nan if value is None else value
+
+
+def _decode_number(value):
+    if math.isnan(value):
+        return None
+    if value.is_integer():
+        return int(value)
+    return value
+
+
+def _unpack_array(item_struct, data, offset):
+    """Unpack an array of ``item_struct`` prefixed by its length. Returns
+    the items and the offset after the array."""
+    (count,) = _COUNT.unpack_from(data, offset)
+    offset += _COUNT.size
+    end = offset + count * item_struct.size
+    return list(item_struct.iter_unpack(data[offset:end])), end
+
+
+def _pack_array(item_struct, items):
+    return _COUNT.pack(len(items)) + b"".join(
+        item_struct.pack(*item) for item in items
+    )
+
+
+class ExchangeServer:
+    """Serves the ``exchange`` to ``ExchangeClient``s connecting to the
+    Unix domain socket at ``path``.
+
+    The requests of all connections are processed one by one in the event
+    loop of the server, so the matching stays single-threaded.
+    """
+
+    def __init__(self, path, exchange: Exchange = None):
+        self.path = path
+        self.exchange = exchange if exchange is not None else Exchange()
+        # Traders registered by the clients, indexed by their remote id
+        self._traders = []
+        self._handlers = {
+            REGISTER: self._register,
+            ORDERS: self._process_orders,
+            CANCEL: self._cancel_order,
+            CANCEL_ALL: self._cancel_all,
+            AMEND: self._amend_order,
+            STANDING_ORDERS: self._standing_orders,
+            ORDERBOOK: self._get_orderbook,
+            TOP_OF_BOOK: self._top_of_book,
+            BALANCE: self._balance,
+        }
+
+    def run(self):
+        asyncio.run(self.serve())
+
+    async def serve(self, started: asyncio.Event = None):
+        """Serve forever. Sets ``started`` once the socket is listening.
+
+        When cancelled, the connections are closed and their handlers are
+        awaited before returning."""
+        handlers = set()
+
+        async def handle_connection(reader, writer):
+            task = asyncio.current_task()
+            handlers.add(task)
+            try:
+                await self._handle_connection(reader, writer)
+            except asyncio.CancelledError:
+                # The server is stopping. The task ends normally, as the
+                # stream callback would report its cancellation as an error
+                pass
+            finally:
+                handlers.discard(task)
+
+        server = await asyncio.start_unix_server(
+            handle_connection, path=self.path
+        )
+        async with server:
+            if started is not None:
+                started.set()
+            try:
+                await server.serve_forever()
+            finally:
+                for task in handlers:
+                    task.cancel()
+                await asyncio.gather(*handlers, return_exceptions=True)
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(_LENGTH.size)
+                    (length,) = _LENGTH.unpack(header)
+                    request = await reader.readexactly(length)
+                except asyncio.IncompleteReadError:
+                    break
+                reply = self.handle_request(request)
+                writer.write(_LENGTH.pack(len(reply)) + reply)
+                # Stop reading the requests of a client not reading its
+                # replies, rather than buffering them
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    def handle_request(self, request: bytes) -> bytes:
+        (command,) = _COMMAND.unpack_from(request)
+        try:
+            handler = self._handlers[command]
+            return bytes([OK]) + handler(request, _COMMAND.size)
+        except Exception as error:
+            logger.warning(
+                f"Could not process the request {command}: {error!r}"
+            )
+            return bytes([ERROR]) + repr(error).encode()
+
+    def _trader(self, trader_id) -> Trader:
+        if not 0 <= trader_id < len(self._traders):
+            raise ValueError(f"Unknown trader {trader_id}")
+        return self._traders[trader_id]
+
+    def _pack_balance(self, trader: Trader) -> bytes:
+        return _BALANCE.pack(trader.money, trader.stocks)
+
+    def _register(self, request, offset):
+        money, stocks = _REGISTER.unpack_from(request, offset)
+        trader = Trader(money=_decode_number(money), stocks=stocks)
+        self.exchange.register_trader(trader)
+        self._traders.append(trader)
+        return _ID.pack(len(self._traders) - 1)
+
+    def _process_orders(self, request, offset):
+        items, _ = _unpack_array(_ORDER, request, offset)
+        if any(math.isnan(price) for _, _, _, price in items):
+            raise ValueError("The orders must have a price")
+        orders = [
+            ORDER_CLASSES[side](
+                self._trader(trader_id), amount, _decode_number(price)
+            )
+            for trader_id, side, amount, price in items
+        ]
+        fills = self.exchange.process_orders(orders)
+        results = [
+            (order.id or 0, order.owner.money, order.owner.stocks)
+            for order in orders
+        ]
+        return _pack_array(_ORDER_RESULT, results) + _pack_array(
+            _FILL, fills
+        )
+
+    def _owned_order(self, trader: Trader, order_id: int):
+        """The standing order with the ``order_id`` if it belongs to the
+        ``trader``, or ``None``: a client cannot change the orders of the
+        other traders."""
+        order = self.exchange.get_order(order_id)
+        if order is None or order.owner is not trader:
+            return None
+        return order
+
+    def _cancel_order(self, request, offset):
+        trader_id, order_id = _CANCEL.unpack_from(request, offset)
+        trader = self._trader(trader_id)
+        order = self._owned_order(trader, order_id)
+        cancelled = order is not None and self.exchange.cancel_order(order)
+        return _FLAG.pack(cancelled) + self._pack_balance(trader)
+
+    def _cancel_all(self, request, offset):
+        (trader_id,) = _ID.unpack_from(request, offset)
+        trader = self._trader(trader_id)
+        cancelled = self.exchange.cancel_all(trader)
+        return _ID.pack(cancelled) + self._pack_balance(trader)
+
+    def _amend_order(self, request, offset):
+        trader_id, order_id, amount = _AMEND.unpack_from(request, offset)
+        trader = self._trader(trader_id)
+        order = self._owned_order(trader, order_id)
+        amended = order is not None and self.exchange.amend_order(
+            order, amount
+        )
+        return _FLAG.pack(amended) + self._pack_balance(trader)
+
+    def _standing_orders(self, request, offset):
+        (trader_id,) = _ID.unpack_from(request, offset)
+        trader = self._trader(trader_id)
+        buy_orders, sell_orders = self.exchange.standing_orders(trader)
+        orders = [
+            (order.id, order.side, order.amount, order.price)
+            for order in buy_orders + sell_orders
+        ]
+        return _pack_array(_STANDING_ORDER, orders) + self._pack_balance(
+            trader
+        )
+
+    def _get_orderbook(self, request, offset):
+        (depth,) = _ID.unpack_from(request, offset)
+        buy_levels, sell_levels = self.exchange.get_orderbook(
+            None if depth < 0 else depth
+        )
+        return _pack_array(_LEVEL, list(buy_levels.items())) + _pack_array(
+            _LEVEL, list(sell_levels.items())
+        )
+
+    def _top_of_book(self, request, offset):
+        top_of_book = self.exchange.top_of_book()
+        return _TOP_OF_BOOK.pack(
+            top_of_book.version,
+            *(_encode_number(value) for value in top_of_book[1:]),
+        )
+
+    def _balance(self, request, offset):
+        (trader_id,) = _ID.unpack_from(request, offset)
+        return self._pack_balance(self._trader(trader_id))
+
+
+class ExchangeClient:
+    """Connection to an ``ExchangeServer`` at the Unix domain socket
+    ``path``, providing the methods of an ``Exchange``.
+
+    ``process_order`` does not wait for its reply: up to ``pipeline_depth``
+    requests are sent before the client reads the replies. The ids of the
+    pipelined orders and the assets of their owners are updated when the
+    replies are read, at the latest by the next method returning a result,
+    or by ``sync``.
+    """
+
+    def __init__(self, path, pipeline_depth=DEFAULT_PIPELINE_DEPTH):
+        self.pipeline_depth = pipeline_depth
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.connect(path)
+        self._reader = self._socket.makefile("rb")
+        self._buffer = bytearray()
+        # Handlers of the replies to the sent requests, in order
+        self._pending = deque()
+        self._trader_ids = {}
+
+    def _send(self, request: bytes, handler):
+        self._buffer += _LENGTH.pack(len(request))
+        self._buffer += request
+        self._pending.append(handler)
+        if len(self._pending) >= self.pipeline_depth:
+            self.sync()
+
+    def _call(self, request: bytes, handler):
+        self._send(request, handler)
+        return self.sync()
+
+    def _read_reply(self) -> bytes:
+        header = self._reader.read(_LENGTH.size)
+        if len(header) < _LENGTH.size:
+            raise ConnectionError("The exchange server closed the connection")
+        (length,) = _LENGTH.unpack(header)
+        return self._reader.read(length)
+
+    def sync(self):
+        """Send the buffered requests and handle all pending replies.
+        Returns the result of the last request."""
+        if self._buffer:
+            self._socket.sendall(self._buffer)
+            self._buffer.clear()
+
+        result = None
+        error = None
+        while self._pending:
+            handler = self._pending.popleft()
+            reply = self._read_reply()
+            if reply[0] == ERROR:
+                error = error or RemoteExchangeError(reply[1:].decode())
+                continue
+            result = handler(reply, 1)
+        if error is not None:
+            raise error
+        return result
+
+    def _trader_id(self, trader) -> int:
+        try:
+            return self._trader_ids[trader]
+        except KeyError:
+            raise ValueError(
+                f"{trader} is not registered in the exchange"
+            ) from None
+
+    @staticmethod
+    def _update_balance(trader, reply, offset):
+        money, stocks = _BALANCE.unpack_from(reply, offset)
+        trader.money = _decode_number(money)
+        trader.stocks = stocks
+
+    def register_trader(self, trader: Trader):
+        """Register a ``trader`` with its current assets in the remote
+        exchange. Provides the ``exchange_api`` to the ``trader``."""
+
+        def handle(reply, offset):
+            (self._trader_ids[trader],) = _ID.unpack_from(reply, offset)
+
+        self._call(
+            _COMMAND.pack(REGISTER)
+            + _REGISTER.pack(trader.money, trader.stocks),
+            handle,
+        )
+        trader.exchange_api = self.api
+
+    def _send_orders(self, orders):
+        orders = list(orders)
+        request = _COMMAND.pack(ORDERS) + _pack_array(
+            _ORDER,
+            [
+                (
+                    self._trader_id(order.owner),
+                    order.side,
+                    order.amount,
+                    _encode_number(order.price),
+                )
+                for order in orders
+            ],
+        )
+
+        def handle(reply, offset):
+            results, offset = _unpack_array(_ORDER_RESULT, reply, offset)
+            for order, (order_id, money, stocks) in zip(orders, results):
+                order._id = order_id or None
+                order.owner.money = _decode_number(money)
+                order.owner.stocks = stocks
+            fills, _ = _unpack_array(_FILL, reply, offset)
+            return [
+                Fill(buy_id, sell_id, _decode_number(price), amount)
+                for buy_id, sell_id, price, amount in fills
+            ]
+
+        self._send(request, handle)
+
+    def process_order(self, order: _Order):
+        self._send_orders((order,))
+
+    def process_orders(self, orders) -> list:
+        self._send_orders(orders)
+        return self.sync()
+
+    def cancel_order(self, order: _Order) -> bool:
+        if order.id is None:
+            # The order may be pipelined
+            self.sync()
+            if order.id is None:
+                return False
+
+        def handle(reply, offset):
+            self._update_balance(order.owner, reply, offset + _FLAG.size)
+            return _FLAG.unpack_from(reply, offset)[0]
+
+        return self._call(
+            _COMMAND.pack(CANCEL)
+            + _CANCEL.pack(self._trader_id(order.owner), order.id),
+            handle,
+        )
+
+    def cancel_all(self, trader: Trader) -> int:
+        def handle(reply, offset):
+            self._update_balance(trader, reply, offset + _ID.size)
+            return _ID.unpack_from(reply, offset)[0]
+
+        return self._call(
+            _COMMAND.pack(CANCEL_ALL) + _ID.pack(self._trader_id(trader)),
+            handle,
+        )
+
+    def amend_order(self, order: _Order, amount: int) -> bool:
+        if order.id is None:
+            self.sync()
+            if order.id is None:
+                return False
+
+        def handle(reply, offset):
+            self._update_balance(order.owner, reply, offset + _FLAG.size)
+            return _FLAG.unpack_from(reply, offset)[0]
+
+        amended = self._call(
+            _COMMAND.pack(AMEND)
+            + _AMEND.pack(self._trader_id(order.owner), order.id, amount),
+            handle,
+        )
+        if amended:
+            order.amount = max(0, amount)
+        return amended
+
+    def standing_orders(self, trader: Trader):
+        def handle(reply, offset):
+            items, offset = _unpack_array(_STANDING_ORDER, reply, offset)
+            self._update_balance(trader, reply, offset)
+            orders = ([], [])
+            for order_id, side, amount, price in items:
+                order = ORDER_CLASSES[side](
+                    trader, amount, _decode_number(price)
+                )
+                order._id = order_id
+                orders[side].append(order)
+            return tuple(orders[0]), tuple(orders[1])
+
+        return self._call(
+            _COMMAND.pack(STANDING_ORDERS) + _ID.pack(self._trader_id(trader)),
+            handle,
+        )
+
+    def get_orderbook(self, depth=None):
+        def handle(reply, offset):
+            books = []
+            for _ in range(2):
+                levels, offset = _unpack_array(_LEVEL, reply, offset)
+                books.append(
+                    {
+                        _decode_number(price): volume
+                        for price, volume in levels
+                    }
+                )
+            return tuple(books)
+
+        if depth is None:
+            depth = -1
+        return self._call(_COMMAND.pack(ORDERBOOK) + _ID.pack(depth), handle)
+
+    def top_of_book(self) -> TopOfBook:
+        def handle(reply, offset):
+            version, *values = _TOP_OF_BOOK.unpack_from(reply, offset)
+            return TopOfBook(
+                version, *(_decode_number(value) for value in values)
+            )
+
+        return self._call(_COMMAND.pack(TOP_OF_BOOK), handle)
+
+    def best_bid_ask(self):
+        top_of_book = self.top_of_book()
+        return top_of_book.best_buy, top_of_book.best_sell
+
+    def last_trade(self):
+        top_of_book = self.top_of_book()
+        return top_of_book.last_price, top_of_book.last_amount
+
+    def update_balance(self, trader: Trader):
+        """Update the assets of the ``trader`` from the server."""
+        self._call(
+            _COMMAND.pack(BALANCE) + _ID.pack(self._trader_id(trader)),
+            lambda reply, offset: self._update_balance(trader, reply, offset),
+        )
+
+    def subscribe(self, *args, **kwargs):
+        """The market data is not served by the ExchangeClient: raises a
+        ``TypeError``."""
+        raise TypeError("The ExchangeClient does not serve market data")
+
+    def unsubscribe(self, queue) -> bool:
+        return False
+
+    def get_stats(self):
+        """The stats of the remote exchange are not served."""
+        return None
+
+    def shutdown(self):
+        """Handle the pending replies and close the connection."""
+        try:
+            self.sync()
+        finally:
+            self._reader.close()
+            self._socket.close()
+
+    @property
+    def api(self):
+        return ExchangeAPI(exchange=self)
@@ -0,0 +1,152 @@
+"""Binary snapshots of the order book of an ``Exchange``.
+
+A snapshot is written by ``Exchange.snapshot`` and loaded by
+``Exchange.restore``. After a fixed header (the next order id, the number
+of standing orders and of traders, and the last trade), the file holds one
+contiguous column per field, in the native byte order:
+
+- the standing orders, buy side then sell side, price level by price level,
+  in the FIFO order of each level: ``order_id``, ``price``, ``amount`` and
+  ``owner``, the index of the owner in the traders' columns;
+- the traders: ``trader_id``, ``stocks`` and ``money``;
+- the ``side`` of the orders, as bytes, last to keep the other columns
+  8-byte aligned.
+
+Prices and money are stored as 64-bit integers if all of them are ints, and
+as doubles otherwise. ``Snapshot`` maps the file in memory and exposes the
+columns as ``memoryview``s, without reading the file.
+"""
+from array import array
+import math
+import mmap
+import struct
+
+MAGIC = b"AXSNAP01"
+
+# Next order id, number of orders, number of traders, last trade price (NaN
+# if none) and amount (-1 if none), and the typecodes of the prices and of
+# the money
+HEADER = struct.Struct("<qqqdq2s6x")
+
+ORDER_COLUMNS = ("order_id", "price", "amount", "owner")
+TRADER_COLUMNS = ("trader_id", "stocks", "money")
+
+
+def typed_array(values) -> array:
+    """An array of 64-bit integers of the ``values`` if they are all ints,
+    or else of doubles."""
+    try:
+        return array("q", values)
+    except (TypeError, OverflowError):
+        return array("d", values)
+
+
+def write_snapshot(path, next_order_id, last_trade, orders, traders, sides):
+    """Write a snapshot to ``path``. ``orders`` and ``traders`` map the
+    names of their columns to buffers of 64-bit items (``array``s or NumPy
+    arrays), whose prices and money are of type ``"q"`` or ``"d"``, and
+    ``sides`` is a buffer of bytes."""
+    price_type = memoryview(orders["price"]).format
+    money_type = memoryview(traders["money"]).format
+    last_price, last_amount = last_trade
+    header = HEADER.pack(
+        next_order_id,
+        len(sides),
+        len(traders["trader_id"]),
+        math.nan if last_price is None else last_price,
+        -1 if last_amount is None else last_amount,
+        _typecode(price_type).encode() + _typecode(money_type).encode(),
+    )
+    with open(path, "wb") as file:
+        file.write(MAGIC)
+        file.write(header)
+        for name in ORDER_COLUMNS:
+            file.write(orders[name])
+        for name in TRADER_COLUMNS:
+            file.write(traders[name])
+        file.write(sides)
+
+
+def _typecode(buffer_format) -> str:
+    """``"q"`` or ``"d"`` for the format of a buffer of 64-bit items."""
+    if buffer_format in ("d", "<d", "=d"):
+        return "d"
+    if struct.calcsize(buffer_format) != 8:
+        raise TypeError(f"Expected 64-bit items, got {buffer_format!r}")
+    return "q"
+
+
+class Snapshot:
+    """A snapshot file mapped in memory. The columns are ``memoryview``s of
+    the mapping, in ``orders``, ``traders`` and ``sides``; they must not be
+    used after ``close``."""
+
+    def __init__(self, path):
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if (
+            len(self._mmap) < len(MAGIC) + HEADER.size
+            or self._mmap[: len(MAGIC)] != MAGIC
+        ):
+            self._mmap.close()
+            raise ValueError(f"{path} is not an order book snapshot")
+
+        (
+            self.next_order_id,
+            self.order_count,
+            self.trader_count,
+            last_price,
+            last_amount,
+            typecodes,
+        ) = HEADER.unpack_from(self._mmap, len(MAGIC))
+        if math.isnan(last_price):
+            self.last_trade = (None, None)
+        else:
+            if last_price.is_integer():
+                last_price = int(last_price)
+            self.last_trade = (last_price, last_amount)
+        price_type, money_type = typecodes.decode()
+
+        offset = len(MAGIC) + HEADER.size
+        size = offset + 8 * (
+            len(ORDER_COLUMNS) * self.order_count
+            + len(TRADER_COLUMNS) * self.trader_count
+        )
+        if len(self._mmap) != size + self.order_count:
+            self._mmap.close()
+            raise ValueError(f"The snapshot {path} is truncated")
+
+        self._views = []
+        self.orders = {}
+        for name in ORDER_COLUMNS:
+            typecode = price_type if name == "price" else "q"
+            self.orders[name], offset = self._column(
+                offset, typecode, self.order_count
+            )
+        self.traders = {}
+        for name in TRADER_COLUMNS:
+            typecode = money_type if name == "money" else "q"
+            self.traders[name], offset = self._column(
+                offset, typecode, self.trader_count
+            )
+        self.sides, _ = self._column(offset, "b", self.order_count)
+
+    def _column(self, offset, typecode, length):
+        """The column of ``length`` items at ``offset``, and the offset of
+        the next column."""
+        end = offset + struct.calcsize(typecode) * length
+        view = memoryview(self._mmap)[offset:end].cast(typecode)
+        self._views.append(view)
+        return view, end
+
+    def close(self):
+        for view in self._views:
+            view.release()
+        self._views.clear()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
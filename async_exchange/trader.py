@@ -1,4 +1,23 @@
-from async_exchange.orders import BuyOrder, SellOrder, _Order
+import asyncio
+from collections import namedtuple
+
+from async_exchange.orders import BUY, BuyOrder, SellOrder, _Order
+
+# Picklable input of a trader's decision function: the order book (as
+# ``get_orderbook`` returns it), the last trade, the trader's assets, and a
+# seed for the decision's random numbers
+MarketView = namedtuple(
+    "MarketView",
+    (
+        "buy_levels",
+        "sell_levels",
+        "last_price",
+        "last_amount",
+        "money",
+        "stocks",
+        "seed",
+    ),
+)
 
 
 class NotEnoughMoneyError(ValueError):
@@ -12,14 +31,20 @@ class NotEnoughStocksError(ValueError):
 class Trader:
     _id = 1
 
-    def __init__(self, exchange_api=None, money=100, stocks=10):
+    def __init__(
+        self, exchange_api=None, money=100, stocks=10, holdings=None
+    ):
         self._money = None
         self._stocks = None
 
         self.exchange_api = exchange_api
+        # Executor running the decision functions, in-process if ``None``
+        self.executor = None
 
         self.money = money
         self.stocks = stocks
+        # Stocks per symbol, traded on a multi-instrument exchange
+        self.holdings = dict(holdings or {})
         self._id = Trader._id
         Trader._id += 1
 
@@ -43,11 +68,29 @@ class Trader:
             raise NotEnoughStocksError
         self._stocks = value
 
-    def sell(self, amount, price):
-        self.exchange_api.process_order(SellOrder(self, amount, price))
+    def sell(self, amount, price, symbol=None):
+        self.exchange_api.process_order(
+            SellOrder(self, amount, price, symbol=symbol)
+        )
+
+    def buy(self, amount, price, symbol=None):
+        self.exchange_api.process_order(
+            BuyOrder(self, amount, price, symbol=symbol)
+        )
 
-    def buy(self, amount, price):
-        self.exchange_api.process_order(BuyOrder(self, amount, price))
+    def submit_many(self, orders) -> list:
+        """ Submit a batch of ``orders``, given as ``(side, amount, price)``
+        tuples with ``side`` being ``BUY`` or ``SELL``. Returns the list of
+        fills of the batch.
+        """
+        return self.exchange_api.process_orders(
+            [
+                BuyOrder(self, amount, price)
+                if side == BUY
+                else SellOrder(self, amount, price)
+                for side, amount, price in orders
+            ]
+        )
 
     def has_enough_money(self, money):
         if self.money < money:
@@ -62,6 +105,32 @@ class Trader:
     def inspect_exchange(self):
         return self.exchange_api.get_orderbook()
 
+    def market_view(self, depth=None, seed=None) -> MarketView:
+        """ Get a ``MarketView`` of the ``depth`` best price levels of
+        each side of the order book.
+        """
+        buy_levels, sell_levels = self.exchange_api.get_orderbook(depth)
+        last_price, last_amount = self.exchange_api.last_trade()
+        return MarketView(
+            buy_levels,
+            sell_levels,
+            last_price,
+            last_amount,
+            self.money,
+            self.stocks,
+            seed,
+        )
+
+    async def run_decision(self, function, *args):
+        """ Run ``function(*args)`` in the ``executor`` of the trader, e.g.
+        a process pool, and return its result. The ``function`` and its
+        arguments must be picklable to run in another process.
+        """
+        if self.executor is None:
+            return function(*args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, function, *args)
+
     @property
     def standing_orders(self):
         """ Get two tuples of standing orders from ``self``.
@@ -76,17 +145,28 @@ class Trader:
         """
         return self.exchange_api.cancel_order(order)
 
+    def amend_order(self, order: _Order, amount: int) -> bool:
+        """ Change the ``amount`` of the standing ``order``. Returns
+        ``False`` if the ``order`` is not in the exchange's order book.
+        """
+        return self.exchange_api.amend_order(order, amount)
+
     def cancel_all_orders(self) -> bool:
         """ Cancel all orders the ``_Trader`` has submitted. Returns
         ``True`` iif all standing orders have been successfully removed.
         """
-        buy_orders, sell_orders = self.standing_orders
-        return all(
-            self.cancel_order(order) for order in buy_orders + sell_orders
-        )
+        self.exchange_api.cancel_all(self)
+        return True
 
     def __str__(self):
         return f"Trader {self._id}: stocks {self.stocks}, cash {self.money}"
 
     async def cycle(self):
         raise NotImplementedError
+
+    def step(self):
+        """ Synchronous alternative to ``cycle``, run by an
+        ``AgentScheduler``: act once, and return the delay in seconds until
+        the next ``step``, or ``None`` to stop.
+        """
+        raise NotImplementedError
@@ -1,10 +1,14 @@
 import asyncio
+from concurrent.futures import ProcessPoolExecutor
 import logging
 from signal import SIGTERM, SIGINT
 from typing import List
 
+from async_exchange.batch_auction import BatchAuctionExchange
 from async_exchange.exchange import Exchange
+from async_exchange.scheduler import AgentScheduler
 from async_exchange.trader import Trader
+from async_exchange.virtual_time import run as run_in_virtual_time
 
 default_logger = logging.getLogger(__name__)
 
@@ -12,42 +16,121 @@ default_logger = logging.getLogger(__name__)
 CANCEL_SIGNALS = (SIGTERM, SIGINT)
 
 
+def _implements_step(trader) -> bool:
+    return isinstance(trader, Trader) and type(trader).step is not Trader.step
+
+
 class TradingSession:
     """Trading session generator.
 
     Activates all ``traders`` that interact with the given ``exchange``.
+
+    If ``auction_interval`` is given, the orders are matched in batch
+    auctions run every ``auction_interval`` seconds, which requires a
+    ``BatchAuctionExchange``.
+
+    With ``virtual_time``, the session runs on a simulated clock (see
+    ``async_exchange.virtual_time``): the traders' sleeps return at once,
+    and the session runs as fast as the CPU allows.
+
+    With ``use_scheduler``, the traders implementing ``step`` are run by a
+    single ``AgentScheduler`` instead of a ``cycle`` coroutine each, which
+    scales to many more traders. They take their first step at the start
+    of the session. The other traders still run their ``cycle``.
+
+    With ``decision_workers``, the traders get a process pool of that many
+    workers as their ``executor``, to offload their CPU-bound decisions with
+    ``Trader.run_decision`` (see ``DecisionTrader``). The matching stays in
+    the event loop.
     """
 
     def __init__(
-        self, traders: List[Trader], exchange: Exchange = None, logger=None
+        self,
+        traders: List[Trader],
+        exchange: Exchange = None,
+        logger=None,
+        auction_interval: float = None,
+        virtual_time: bool = False,
+        use_scheduler: bool = False,
+        decision_workers: int = None,
     ):
         self.traders = traders
+        self.auction_interval = auction_interval
+        self.virtual_time = virtual_time
+        self.use_scheduler = use_scheduler
+        self.decision_workers = decision_workers
 
         if exchange is not None:
             self.exchange = exchange
+        elif auction_interval is not None:
+            self.exchange = BatchAuctionExchange(logger=logger)
         else:
             self.exchange = Exchange(logger=logger)
 
+        if auction_interval is not None and not isinstance(
+            self.exchange, BatchAuctionExchange
+        ):
+            raise TypeError(
+                "Batch auctions require a BatchAuctionExchange, got "
+                f"{type(self.exchange).__name__}."
+            )
+
         if logger is None:
             self.logger = default_logger
 
         for trader in self.traders:
             self.exchange.register_trader(trader)
 
-    def run(self):
-        asyncio.run(self._runnable())
-
-    async def _runnable(self):
+    def run(self, duration: float = None):
+        """Run the session, forever or for ``duration`` seconds (of the
+        simulated clock with ``virtual_time``)."""
+        executor = None
+        if self.decision_workers is not None:
+            executor = ProcessPoolExecutor(self.decision_workers)
+            for trader in self.traders:
+                trader.executor = executor
+        try:
+            if self.virtual_time:
+                run_in_virtual_time(self._runnable(duration))
+            else:
+                asyncio.run(self._runnable(duration))
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+                for trader in self.traders:
+                    trader.executor = None
+
+    async def _runnable(self, duration=None):
         loop = asyncio.get_running_loop()
         for signal in CANCEL_SIGNALS:
             loop.add_signal_handler(signal, self.shutdown, signal)
 
-        tasks = [trader.cycle() for trader in self.traders]
+        scheduler = AgentScheduler()
+        tasks = []
+        for trader in self.traders:
+            if self.use_scheduler and _implements_step(trader):
+                scheduler.add(trader)
+            else:
+                tasks.append(trader.cycle())
+        if len(scheduler) > 0:
+            tasks.append(scheduler.run())
+        if self.auction_interval is not None:
+            tasks.append(self._run_auctions())
         group = asyncio.gather(*tasks, return_exceptions=False)
+        if duration is not None:
+            loop.call_later(duration, group.cancel)
         try:
             await group
         except asyncio.CancelledError:
             default_logger.info("Trading session cancelled.")
+        finally:
+            for signal in CANCEL_SIGNALS:
+                loop.remove_signal_handler(signal)
+
+    async def _run_auctions(self):
+        while True:
+            await asyncio.sleep(self.auction_interval)
+            self.exchange.run_auction()
 
     def shutdown(self, signal: str):
         loop = asyncio.get_running_loop()
@@ -0,0 +1,85 @@
+"""An asyncio event loop running on a simulated clock.
+
+The loop's ``time()`` is a virtual clock. Whenever there is nothing ready to
+run, the loop jumps the clock to the next scheduled callback instead of
+waiting for it, so ``asyncio.sleep`` returns immediately while keeping the
+order and the relative timing of the wake-ups.
+
+While a function runs in an executor (``run_in_executor``), the clock is
+stopped and the loop waits for it, so the computations take no simulated
+time. Other I/O is polled without waiting while a timer is scheduled, so the
+virtual time is meant for simulations whose coroutines wait on
+``asyncio.sleep`` and executors only.
+"""
+import asyncio
+import selectors
+
+
+class _VirtualTimeSelector(selectors.DefaultSelector):
+    """A selector advancing the virtual clock of the ``loop`` instead of
+    blocking until a timeout."""
+
+    def __init__(self):
+        super().__init__()
+        self.loop = None
+
+    def select(self, timeout=None):
+        if timeout is None or (timeout > 0 and self.loop._executor_jobs):
+            # Only I/O, or the completion of an executor job, can wake the
+            # loop up
+            return super().select(None)
+
+        events = super().select(0)
+        if not events and timeout > 0:
+            self.loop.advance(timeout)
+        return events
+
+
+class VirtualTimeEventLoop(asyncio.SelectorEventLoop):
+    """An event loop whose clock starts at ``start_time`` and jumps to the
+    next scheduled callback when the loop would otherwise wait."""
+
+    def __init__(self, start_time=0.0):
+        selector = _VirtualTimeSelector()
+        super().__init__(selector=selector)
+        selector.loop = self
+        self._virtual_time = start_time
+        # Number of functions running in executors
+        self._executor_jobs = 0
+
+    def time(self):
+        return self._virtual_time
+
+    def advance(self, seconds):
+        self._virtual_time += seconds
+
+    def run_in_executor(self, executor, func, *args):
+        future = super().run_in_executor(executor, func, *args)
+        self._executor_jobs += 1
+        future.add_done_callback(self._executor_job_done)
+        return future
+
+    def _executor_job_done(self, future):
+        self._executor_jobs -= 1
+
+
+def run(main, start_time=0.0):
+    """Run the ``main`` coroutine in a new ``VirtualTimeEventLoop``, like
+    ``asyncio.run``."""
+    loop = VirtualTimeEventLoop(start_time)
+    try:
+        asyncio.set_event_loop(loop)
+        return loop.run_until_complete(main)
+    finally:
+        try:
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(
+                asyncio.gather(*tasks, return_exceptions=True)
+            )
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.run_until_complete(loop.shutdown_default_executor())
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
@@ -0,0 +1,82 @@
+"""Agent steps per second with a coroutine per trader and with the
+``AgentScheduler``, for a growing number of traders.
+
+The sessions run on the virtual time event loop, so the measure is the
+overhead of waking the agents up and of their decisions. The last column
+drives the scheduler with ``run_until``, without an event loop.
+
+    $ python benchmarks/agent_scheduler.py --traders 1000 10000 100000
+"""
+import argparse
+import random
+import time
+
+from async_exchange.algorithms.random_trader import RandomTrader
+from async_exchange.exchange import Exchange
+from async_exchange.scheduler import AgentScheduler
+from async_exchange.trading_session import TradingSession
+
+
+class CountingTrader(RandomTrader):
+    steps = 0
+
+    def place_random_order(self):
+        CountingTrader.steps += 1
+        return super().place_random_order()
+
+
+def benchmark(traders, duration, use_scheduler):
+    random.seed(0)
+    CountingTrader.steps = 0
+    session = TradingSession(
+        traders=[
+            CountingTrader(money=300, stocks=10) for _ in range(traders)
+        ],
+        virtual_time=True,
+        use_scheduler=use_scheduler,
+    )
+    start = time.perf_counter()
+    session.run(duration=duration)
+    return CountingTrader.steps / (time.perf_counter() - start)
+
+
+def benchmark_run_until(traders, duration):
+    random.seed(0)
+    CountingTrader.steps = 0
+    exchange = Exchange()
+    scheduler = AgentScheduler()
+    for _ in range(traders):
+        trader = CountingTrader(money=300, stocks=10)
+        exchange.register_trader(trader)
+        scheduler.add(trader)
+    start = time.perf_counter()
+    scheduler.run_until(duration)
+    return CountingTrader.steps / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--traders", type=int, nargs="+", default=[1000, 10000, 100000]
+    )
+    parser.add_argument(
+        "--duration", type=float, default=2.0, help="simulated seconds"
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{'traders':>8} {'coroutines':>12} {'scheduler':>12}"
+        f" {'run_until':>12}  steps/s"
+    )
+    for traders in args.traders:
+        coroutines = benchmark(traders, args.duration, use_scheduler=False)
+        scheduler = benchmark(traders, args.duration, use_scheduler=True)
+        run_until = benchmark_run_until(traders, args.duration)
+        print(
+            f"{traders:8} {coroutines:12,.0f} {scheduler:12,.0f}"
+            f" {run_until:12,.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
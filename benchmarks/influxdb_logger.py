@@ -0,0 +1,96 @@
+"""Throughput of the ``InfluxDBLogger`` against a local stand-in server.
+
+The stand-in HTTP server answers the bucket lookup and accepts every write,
+so the benchmark measures the serialisation and the HTTP writes of the
+client, without an InfluxDB service.
+
+    $ python benchmarks/influxdb_logger.py --events 100000
+"""
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+import time
+
+from influxdb_client.client.write_api import SYNCHRONOUS
+
+from async_exchange.logging.influxdb_logger import InfluxDBLogger
+
+
+class StandInInfluxDB(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    received_bytes = 0
+
+    def do_GET(self):
+        # The bucket lookup of the logger
+        body = json.dumps(
+            {"buckets": [{"name": "benchmark", "retentionRules": []}]}
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        StandInInfluxDB.received_bytes += len(self.rfile.read(length))
+        self.send_response(204)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def benchmark(logger, events, batch_size, bulk):
+    prices = [100 + (index % 50) / 2 for index in range(events)]
+    amounts = [1 + index % 10 for index in range(events)]
+
+    start = time.perf_counter()
+    if bulk:
+        for index in range(0, events, batch_size):
+            logger.send_events(
+                "exchange",
+                {
+                    "price": prices[index:index + batch_size],
+                    "amount": amounts[index:index + batch_size],
+                },
+            )
+    else:
+        for price, amount in zip(prices, amounts):
+            logger.send_event("exchange", {"price": price, "amount": amount})
+    logger.write_api.close()
+    return events / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInInfluxDB)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        for bulk in (False, True):
+            logger = InfluxDBLogger(
+                bucket_name="benchmark", batch_size=args.batch_size, url=url
+            )
+            if bulk:
+                # Write every batch in a single request
+                logger.write_api = logger.client.write_api(
+                    write_options=SYNCHRONOUS
+                )
+            rate = benchmark(logger, args.events, args.batch_size, bulk)
+            logger.client.close()
+            name = "send_events" if bulk else "send_event"
+            print(f"{name:12} {rate:12,.0f} events/s")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
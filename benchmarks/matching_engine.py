@@ -0,0 +1,218 @@
+"""Throughput, latency and memory of the matching engine on seeded
+synthetic order flows.
+
+Every flow of ``order_flow.py`` is replayed through ``process_order`` and
+``cancel_order`` of a fresh exchange three times: once for the throughput,
+timing the runs of consecutive orders and of consecutive cancels apart
+(orders/s, cancels/s, and fills/s of the orders), once timing every
+operation for the p50/p99 latencies, and once under ``tracemalloc`` for the
+peak memory. The traders are rich enough for every exchange to succeed.
+
+    $ python benchmarks/matching_engine.py --operations 200000 \\
+        --output new.json --baseline old.json
+"""
+import argparse
+from itertools import groupby
+import json
+import platform
+import time
+import tracemalloc
+
+from async_exchange.exchange import Exchange
+from async_exchange.orders import ORDER_CLASSES
+from async_exchange.trader import Trader
+
+from order_flow import FLOWS, Cancel
+
+
+class FillCounter:
+    """A logger counting the ``"exchange"`` events, one per fill."""
+
+    def __init__(self):
+        self.fills = 0
+
+    def send_event(self, record_type, message):
+        self.fills += 1
+
+
+def make_engine(name, logger):
+    if name == "array":
+        from async_exchange.array_exchange import ArrayExchange
+
+        return ArrayExchange(logger=logger)
+    return Exchange(logger=logger)
+
+
+def prepare(engine, flow):
+    """A fresh exchange with its traders, and the flow as a list of
+    ``(method, order)`` calls."""
+    counter = FillCounter()
+    exchange = make_engine(engine, counter)
+    traders = [Trader(money=10 ** 15, stocks=10 ** 12) for _ in range(100)]
+    for trader in traders:
+        exchange.register_trader(trader)
+
+    orders = []
+    calls = []
+    for operation in flow:
+        if isinstance(operation, Cancel):
+            calls.append((exchange.cancel_order, orders[operation.order]))
+        else:
+            order = ORDER_CLASSES[operation.side](
+                traders[operation.trader % len(traders)],
+                operation.amount,
+                operation.price,
+            )
+            orders.append(order)
+            calls.append((exchange.process_order, order))
+    return counter, calls
+
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def benchmark(engine, flow):
+    orders = sum(not isinstance(operation, Cancel) for operation in flow)
+    cancels = len(flow) - orders
+
+    counter, calls = prepare(engine, flow)
+    # Runs of consecutive orders (False) or cancels (True)
+    runs = [
+        (is_cancel, [call for _, call in run])
+        for is_cancel, run in groupby(
+            zip((isinstance(operation, Cancel) for operation in flow), calls),
+            key=lambda item: item[0],
+        )
+    ]
+    # Seconds spent in the orders and in the cancels
+    seconds = [0.0, 0.0]
+    clock = time.perf_counter
+    for is_cancel, run in runs:
+        start = clock()
+        for method, order in run:
+            method(order)
+        seconds[is_cancel] += clock() - start
+    order_seconds, cancel_seconds = seconds
+    elapsed = order_seconds + cancel_seconds
+    fills = counter.fills
+
+    _, calls = prepare(engine, flow)
+    latencies = []
+    clock = time.perf_counter_ns
+    for method, order in calls:
+        start_ns = clock()
+        method(order)
+        latencies.append(clock() - start_ns)
+    latencies.sort()
+
+    _, calls = prepare(engine, flow)
+    tracemalloc.start()
+    for method, order in calls:
+        method(order)
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "operations": len(flow),
+        "orders": orders,
+        "cancels": cancels,
+        "fills": fills,
+        "seconds": elapsed,
+        "order_seconds": order_seconds,
+        "cancel_seconds": cancel_seconds,
+        "orders_per_second": orders / order_seconds,
+        "cancels_per_second": (
+            cancels / cancel_seconds if cancels else None
+        ),
+        "fills_per_second": fills / order_seconds,
+        "operations_per_second": len(flow) / elapsed,
+        "p50_latency_ns": percentile(latencies, 0.5),
+        "p99_latency_ns": percentile(latencies, 0.99),
+        "peak_memory_bytes": peak_memory,
+    }
+
+
+# Metrics compared with the baseline, as ratios new / old
+COMPARED = (
+    "operations_per_second",
+    "p50_latency_ns",
+    "p99_latency_ns",
+    "peak_memory_bytes",
+)
+
+
+def compare(results, baseline):
+    print(
+        f"\n{'vs baseline':>14} {'ops/s':>8} {'p50':>8} {'p99':>8}"
+        f" {'memory':>8}"
+    )
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        ratios = "".join(
+            f" {result[metric] / baseline[name][metric]:8.2f}"
+            for metric in COMPARED
+        )
+        print(f"{name:>14}{ratios}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--flows", nargs="+", choices=sorted(FLOWS), default=list(FLOWS)
+    )
+    parser.add_argument("--operations", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--engine", choices=("exchange", "array"), default="exchange"
+    )
+    parser.add_argument("--output", help="write the results to a JSON file")
+    parser.add_argument(
+        "--baseline", help="JSON results of a previous run to compare with"
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{'flow':>14} {'orders/s':>10} {'cancels/s':>10} {'fills/s':>10}"
+        f" {'p50 ns':>8} {'p99 ns':>8} {'peak MiB':>9}"
+    )
+    results = {}
+    for name in args.flows:
+        flow = FLOWS[name](args.operations, seed=args.seed)
+        result = results[name] = benchmark(args.engine, flow)
+        cancels_per_second = result["cancels_per_second"]
+        if cancels_per_second is None:
+            cancels_per_second = "-"
+        else:
+            cancels_per_second = f"{cancels_per_second:,.0f}"
+        print(
+            f"{name:>14} {result['orders_per_second']:10,.0f}"
+            f" {cancels_per_second:>10}"
+            f" {result['fills_per_second']:10,.0f}"
+            f" {result['p50_latency_ns']:8,}"
+            f" {result['p99_latency_ns']:8,}"
+            f" {result['peak_memory_bytes'] / 2 ** 20:9.1f}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(
+                {
+                    "engine": args.engine,
+                    "operations": args.operations,
+                    "seed": args.seed,
+                    "python": platform.python_version(),
+                    "results": results,
+                },
+                file,
+                indent=2,
+            )
+    if args.baseline:
+        with open(args.baseline) as file:
+            compare(results, json.load(file)["results"])
+
+
+if __name__ == "__main__":
+    main()
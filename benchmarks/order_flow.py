@@ -0,0 +1,112 @@
+"""Seeded synthetic order flows for the matching engine benchmarks.
+
+A flow is a list of operations: ``NewOrder``s, and ``Cancel``s of an earlier
+``NewOrder`` given by its index among the new orders of the flow. The same
+``seed`` always gives the same flow, so the results of two versions of the
+engine are comparable.
+"""
+from collections import namedtuple
+import random
+
+from async_exchange.orders import BUY, SELL
+
+NewOrder = namedtuple("NewOrder", ("trader", "side", "amount", "price"))
+Cancel = namedtuple("Cancel", ("order",))
+
+MID_PRICE = 10_000
+
+
+class _FlowBuilder:
+    def __init__(self, seed, traders):
+        self.rng = random.Random(seed)
+        self.traders = traders
+        self.operations = []
+        # Index of every new order among the new orders of the flow
+        self.orders = 0
+
+    def order(self, side, amount, price):
+        trader = self.rng.randrange(self.traders)
+        self.operations.append(NewOrder(trader, side, amount, price))
+        self.orders += 1
+        return self.orders - 1
+
+    def cancel(self, order):
+        self.operations.append(Cancel(order))
+
+
+def deep_book(operations, seed=0, traders=100, levels=10):
+    """Few price levels around the mid price with long queues of orders,
+    and a crossing order once in a while."""
+    flow = _FlowBuilder(seed, traders)
+    rng = flow.rng
+    while len(flow.operations) < operations:
+        side = rng.choice((BUY, SELL))
+        offset = rng.randint(1, levels)
+        if rng.random() < 0.1:
+            # Crossing order, filled by the head of the opposite queue
+            offset = -rng.randint(0, 2)
+        price = MID_PRICE - offset if side == BUY else MID_PRICE + offset
+        flow.order(side, rng.randint(1, 10), price)
+    return flow.operations
+
+
+def sweeps(operations, seed=0, traders=100, levels=50):
+    """A book rebuilt on many levels, and large orders sweeping through
+    several levels at once."""
+    flow = _FlowBuilder(seed, traders)
+    rng = flow.rng
+    while len(flow.operations) < operations:
+        side = rng.choice((BUY, SELL))
+        if rng.random() < 0.05:
+            # Sweep up to a price deep into the opposite side
+            depth = rng.randint(levels // 4, levels)
+            price = MID_PRICE + depth if side == BUY else MID_PRICE - depth
+            flow.order(side, rng.randint(50, 500), price)
+        else:
+            offset = rng.randint(1, levels)
+            price = MID_PRICE - offset if side == BUY else MID_PRICE + offset
+            flow.order(side, rng.randint(1, 10), price)
+    return flow.operations
+
+
+def cancel_heavy(operations, seed=0, traders=100, levels=20, cancels=0.8):
+    """Mostly cancels of random standing orders, as market makers
+    requoting."""
+    flow = _FlowBuilder(seed, traders)
+    rng = flow.rng
+    standing = []
+    while len(flow.operations) < operations:
+        if standing and rng.random() < cancels:
+            # Swap the cancelled order out of the list of standing orders
+            index = rng.randrange(len(standing))
+            standing[index], standing[-1] = standing[-1], standing[index]
+            flow.cancel(standing.pop())
+            continue
+        side = rng.choice((BUY, SELL))
+        offset = rng.randint(1, levels)
+        price = MID_PRICE - offset if side == BUY else MID_PRICE + offset
+        standing.append(flow.order(side, rng.randint(1, 10), price))
+    return flow.operations
+
+
+def wide_book(operations, seed=0, traders=100, levels=10_000):
+    """Orders spread over many price levels, most of them small queues, so
+    the cost of finding and removing levels dominates."""
+    flow = _FlowBuilder(seed, traders)
+    rng = flow.rng
+    while len(flow.operations) < operations:
+        side = rng.choice((BUY, SELL))
+        offset = 1 + int(rng.expovariate(4 / levels)) % levels
+        if rng.random() < 0.2:
+            offset = -rng.randint(0, 5)
+        price = MID_PRICE - offset if side == BUY else MID_PRICE + offset
+        flow.order(side, rng.randint(1, 10), max(1, price))
+    return flow.operations
+
+
+FLOWS = {
+    "deep_book": deep_book,
+    "sweeps": sweeps,
+    "cancel_heavy": cancel_heavy,
+    "wide_book": wide_book,
+}
@@ -0,0 +1,81 @@
+"""Time to snapshot and restore a large order book.
+
+The book is generated as a snapshot file (random sides, prices over
+``--levels`` levels per side and owners among ``--traders``), so building
+it does not go through the matching engine. It is then restored and
+snapshotted again with each engine.
+
+    $ python benchmarks/snapshot.py --orders 10000000 --engines array
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from async_exchange.array_exchange import ArrayExchange
+from async_exchange.exchange import Exchange
+from async_exchange.snapshot import write_snapshot
+
+ENGINES = {"exchange": Exchange, "array": ArrayExchange}
+
+
+def generate_book(path, orders, levels, traders, seed=0):
+    rng = np.random.default_rng(seed)
+    sides = rng.integers(0, 2, orders).astype(np.int8)
+    offsets = rng.integers(1, levels + 1, orders)
+    prices = np.where(sides == 0, 10_000 - offsets, 10_000 + offsets)
+    # The rows of a price level must be contiguous, in their FIFO order
+    order = np.lexsort((np.arange(orders), prices, sides))
+    write_snapshot(
+        path,
+        orders + 1,
+        (None, None),
+        {
+            "order_id": np.arange(1, orders + 1, dtype=np.int64),
+            "price": prices[order].astype(np.int64),
+            "amount": rng.integers(1, 100, orders)[order].astype(np.int64),
+            "owner": rng.integers(0, traders, orders)[order].astype(np.int64),
+        },
+        {
+            "trader_id": np.arange(traders, dtype=np.int64),
+            "stocks": np.full(traders, 10 ** 6, dtype=np.int64),
+            "money": np.full(traders, 10 ** 9, dtype=np.int64),
+        },
+        sides[order],
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--levels", type=int, default=1000)
+    parser.add_argument("--traders", type=int, default=1000)
+    parser.add_argument(
+        "--engines", nargs="+", choices=sorted(ENGINES), default=list(ENGINES)
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        book = os.path.join(directory, "book.snapshot")
+        generate_book(book, args.orders, args.levels, args.traders)
+        size = os.path.getsize(book)
+        print(f"{args.orders:,} orders, {size / 2 ** 20:.0f} MiB")
+
+        print(f"{'engine':>10} {'restore s':>10} {'snapshot s':>11}")
+        for name in args.engines:
+            start = time.perf_counter()
+            exchange = ENGINES[name].restore(book)
+            restored = time.perf_counter()
+            exchange.snapshot(os.path.join(directory, f"{name}.snapshot"))
+            end = time.perf_counter()
+            print(
+                f"{name:>10} {restored - start:10.2f}"
+                f" {end - restored:11.2f}"
+            )
+            del exchange
+
+
+if __name__ == "__main__":
+    main()
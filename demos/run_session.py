@@ -1,4 +1,5 @@
 from async_exchange.algorithms.random_trader import RandomTrader
+from async_exchange.logging.event_pipeline import EventPipeline
 from async_exchange.trading_session import TradingSession
 
 try:
@@ -7,7 +8,8 @@ except ImportError:
     logger = None
     RandomTrader.verbose = True
 else:
-    logger = InfluxDBLogger()
+    # Sends the events to InfluxDB in batches through ``send_events``
+    logger = EventPipeline(InfluxDBLogger())
     RandomTrader.verbose = False
 
 
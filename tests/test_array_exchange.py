@@ -0,0 +1,93 @@
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from tests import test_exchange
+from async_exchange.orders import BuyOrder, SellOrder
+from async_exchange.trader import Trader
+
+if numpy is not None:
+    from async_exchange.array_exchange import ArrayExchange
+else:
+    ArrayExchange = None
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class TestArrayExchange(test_exchange.TestExchange):
+    exchange_class = ArrayExchange
+
+    def test_slots_are_reused(self):
+        exchange = ArrayExchange(capacity=2)
+        trader = Trader(exchange_api=exchange.api, money=100, stocks=10)
+
+        trader.buy(1, 1)
+        trader.buy(1, 2)
+        self.assertEqual(exchange._arrays.capacity, 2)
+
+        exchange.cancel_all(trader)
+        trader.buy(1, 3)
+        trader.sell(1, 4)
+        self.assertEqual(exchange._arrays.capacity, 2)
+
+    def test_capacity_grows(self):
+        exchange = ArrayExchange(capacity=2)
+        trader = Trader(exchange_api=exchange.api, money=100, stocks=10)
+
+        for price in range(1, 6):
+            trader.buy(1, price)
+        self.assertEqual(exchange._arrays.capacity, 8)
+        self.assertEqual(
+            exchange.get_orderbook(), ({price: 1 for price in range(1, 6)}, {})
+        )
+
+    def test_order_handles(self):
+        self.exchange.process_order(
+            SellOrder(owner=self.trader_1, amount=5, price=10)
+        )
+        self.trader_2.buy(2, 10)
+
+        (sell_order,) = self.exchange.sell_levels[10]
+        self.assertIsInstance(sell_order, SellOrder)
+        self.assertEqual(sell_order.amount, 3)
+        self.assertIs(sell_order.owner, self.trader_1)
+
+        _, (standing_order,) = self.exchange.standing_orders(self.trader_1)
+        self.assertIs(standing_order, sell_order)
+
+        self.trader_2.buy(1, 10)
+        self.assertEqual(sell_order.amount, 2)
+
+    def test_handle_amount_synced(self):
+        order = BuyOrder(owner=self.trader_1, amount=5, price=10)
+        self.exchange.process_order(order)
+
+        self.trader_2.sell(3, 10)
+        self.assertEqual(order.amount, 2)
+
+    def test_float_price_rejected(self):
+        with self.assertRaises(TypeError):
+            self.trader_1.sell(1, 10.5)
+        with self.assertRaises(TypeError):
+            self.exchange.process_orders(
+                [
+                    SellOrder(owner=self.trader_1, amount=1, price=11),
+                    SellOrder(owner=self.trader_1, amount=1.5, price=11),
+                ]
+            )
+        self.assertEqual(self.exchange.get_orderbook(), ({}, {}))
+
+    def test_float_amount_amend_rejected(self):
+        order = SellOrder(owner=self.trader_1, amount=2, price=11)
+        self.exchange.process_order(order)
+        with self.assertRaises(TypeError):
+            self.exchange.amend_order(order, 1.5)
+
+        self.assertTrue(self.exchange.cancel_order(order))
+        self.assertEqual(self.exchange.get_orderbook(), ({}, {}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+
+from async_exchange.batch_auction import BatchAuctionExchange
+from async_exchange.exchange import Fill
+from async_exchange.orders import BuyOrder, SellOrder
+from async_exchange.trader import Trader
+
+
+class TestBatchAuctionExchange(unittest.TestCase):
+    def setUp(self):
+        self.exchange = BatchAuctionExchange()
+        api = self.exchange.api
+        self.trader_1 = Trader(exchange_api=api, money=100, stocks=10)
+        self.trader_2 = Trader(exchange_api=api, money=100, stocks=10)
+        self.trader_3 = Trader(exchange_api=api, money=100, stocks=10)
+        self.trader_4 = Trader(exchange_api=api, money=100, stocks=10)
+
+    def test_orders_are_not_matched_on_arrival(self):
+        self.trader_1.buy(2, 6)
+        self.trader_2.sell(2, 4)
+
+        self.assertEqual(self.exchange.get_orderbook(), ({6: 2}, {4: 2}))
+        self.assertEqual(self.trader_1.stocks, 10)
+
+    def test_clearing_price_not_crossed(self):
+        self.assertIsNone(self.exchange.clearing_price())
+
+        self.trader_1.buy(2, 4)
+        self.trader_2.sell(2, 6)
+        self.assertIsNone(self.exchange.clearing_price())
+        self.assertEqual(self.exchange.run_auction(), [])
+
+    def test_clearing_price_maximises_volume(self):
+        self.trader_1.buy(3, 7)
+        self.trader_2.buy(2, 5)
+        self.trader_3.sell(1, 4)
+        self.trader_4.sell(4, 6)
+
+        # The executable volume is 1 at 4 and 5, and 3 at 6 and 7, where the
+        # demand and supply imbalance is the same; the lower median is taken
+        self.assertEqual(self.exchange.clearing_price(), 6)
+
+    def test_run_auction(self):
+        buy_order = BuyOrder(owner=self.trader_1, amount=3, price=7)
+        self.exchange.process_order(buy_order)
+        self.trader_2.buy(2, 5)
+        sell_order_1 = SellOrder(owner=self.trader_3, amount=1, price=4)
+        self.exchange.process_order(sell_order_1)
+        sell_order_2 = SellOrder(owner=self.trader_4, amount=4, price=6)
+        self.exchange.process_order(sell_order_2)
+
+        fills = self.exchange.run_auction()
+
+        self.assertEqual(
+            fills,
+            [
+                Fill(buy_order.id, sell_order_1.id, 6, 1),
+                Fill(buy_order.id, sell_order_2.id, 6, 2),
+            ],
+        )
+        self.assertEqual(self.exchange.last_clearing_price, 6)
+        self.assertEqual(self.exchange.last_trade(), (6, 2))
+        self.assertEqual(self.exchange.best_bid_ask(), (5, 6))
+        self.assertEqual(self.exchange.get_orderbook(), ({5: 2}, {6: 2}))
+        self.assertEqual(self.trader_1.stocks, 13)
+        self.assertEqual(self.trader_1.money, 100 - 3 * 6)
+        self.assertEqual(self.trader_3.money, 106)
+        self.assertEqual(self.trader_4.money, 112)
+
+    def test_run_auction_not_enough_money(self):
+        self.trader_1.buy(5, 30)
+        self.trader_2.sell(5, 20)
+
+        self.exchange.run_auction()
+
+        self.assertEqual(self.exchange.last_clearing_price, 20)
+        self.assertEqual(self.trader_1.stocks, 15)
+        self.assertEqual(self.trader_1.money, 0)
+        self.assertEqual(self.exchange.get_orderbook(), ({}, {}))
+
+
+if __name__ == "__main__":
+    unittest.main()
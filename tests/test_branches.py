@@ -0,0 +1,87 @@
+import multiprocessing
+import os
+import random
+import tempfile
+import unittest
+
+from async_exchange.algorithms.random_trader import RandomTrader
+from async_exchange.branches import run_branches
+from async_exchange.exchange import Exchange
+from async_exchange.journal import OrderJournal
+from async_exchange.scheduler import AgentScheduler
+
+
+@unittest.skipIf(
+    "fork" not in multiprocessing.get_all_start_methods(),
+    "The fork start method is not available",
+)
+class TestRunBranches(unittest.TestCase):
+    def setUp(self):
+        random.seed(0)
+        self.exchange = Exchange()
+        self.traders = [RandomTrader(money=300, stocks=10) for _ in range(20)]
+        self.scheduler = AgentScheduler()
+        for trader in self.traders:
+            self.exchange.register_trader(trader)
+            self.scheduler.add(trader)
+        self.scheduler.run_until(20)
+
+    def continue_session(self, exchange, seed):
+        self.scheduler.run_until(60)
+        return (
+            exchange.get_orderbook(),
+            exchange.last_trade(),
+            [(trader.money, trader.stocks) for trader in self.traders],
+        )
+
+    def test_branches(self):
+        orderbook = self.exchange.get_orderbook()
+        assets = [(trader.money, trader.stocks) for trader in self.traders]
+
+        results = run_branches(
+            self.exchange, self.continue_session, [1, 2, 1], workers=2
+        )
+
+        self.assertEqual(results[0], results[2])
+        self.assertNotEqual(results[0], results[1])
+        # The parent's state is left untouched
+        self.assertEqual(self.exchange.get_orderbook(), orderbook)
+        self.assertEqual(
+            [(trader.money, trader.stocks) for trader in self.traders], assets
+        )
+
+        # A branch continues the session as it would have in this process
+        random.seed(2)
+        self.assertEqual(
+            self.continue_session(self.exchange, 2), results[1]
+        )
+
+    def test_no_seeds(self):
+        self.assertEqual(run_branches(self.exchange, print, []), [])
+
+    def test_error(self):
+        def continuation(exchange, seed):
+            raise ValueError(seed)
+
+        with self.assertRaises(ValueError) as context:
+            run_branches(self.exchange, continuation, [5])
+        self.assertEqual(context.exception.args, (5,))
+
+    def test_exited(self):
+        def continuation(exchange, seed):
+            os._exit(3)
+
+        with self.assertRaisesRegex(RuntimeError, "code 3"):
+            run_branches(self.exchange, continuation, [1, 2], workers=1)
+
+    def test_journal(self):
+        with tempfile.TemporaryDirectory() as directory:
+            journal = OrderJournal(os.path.join(directory, "session.journal"))
+            exchange = Exchange(journal=journal)
+            with self.assertRaises(ValueError):
+                run_branches(exchange, self.continue_session, [1])
+            exchange.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
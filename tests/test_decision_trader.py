@@ -0,0 +1,91 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+import pickle
+import unittest
+
+from async_exchange.algorithms.decision_trader import (
+    RandomDecisionTrader,
+    random_orders,
+)
+from async_exchange.algorithms.random_trader import DEFAULT_PRICE
+from async_exchange.exchange import Exchange
+from async_exchange.orders import BUY, SELL
+from async_exchange.trader import MarketView
+from async_exchange.trading_session import TradingSession
+
+
+def make_view(buy_levels=None, sell_levels=None, money=100, stocks=10):
+    return MarketView(
+        buy_levels or {}, sell_levels or {}, None, None, money, stocks, 1
+    )
+
+
+class TestRandomOrders(unittest.TestCase):
+    def test_empty_book(self):
+        ((side, amount, price),) = random_orders(make_view())
+        self.assertIn(side, (BUY, SELL))
+        self.assertEqual(price, DEFAULT_PRICE)
+        self.assertLessEqual(amount, 100 // DEFAULT_PRICE)
+
+    def test_deterministic(self):
+        view = make_view({9: 1}, {16: 2})
+        self.assertEqual(random_orders(view), random_orders(view))
+
+    def test_price_around_the_median(self):
+        for seed in range(20):
+            view = make_view({9: 1}, {16: 2})._replace(seed=seed)
+            for _, amount, price in random_orders(view):
+                self.assertGreaterEqual(price, 12 - 3)
+                self.assertLessEqual(price, 12 + 3)
+                self.assertGreater(amount, 0)
+
+    def test_no_assets(self):
+        self.assertEqual(random_orders(make_view(money=0, stocks=0)), [])
+
+
+class TestDecisionTrader(unittest.TestCase):
+    def setUp(self):
+        self.exchange = Exchange()
+        self.trader = RandomDecisionTrader(money=100, stocks=10)
+        self.exchange.register_trader(self.trader)
+
+    def test_market_view(self):
+        other = RandomDecisionTrader(money=100, stocks=10)
+        self.exchange.register_trader(other)
+        other.buy(2, 5)
+        other.sell(1, 7)
+
+        view = self.trader.market_view(depth=1, seed=3)
+        self.assertEqual(
+            view, MarketView({5: 2}, {7: 1}, None, None, 100, 10, 3)
+        )
+        self.assertEqual(pickle.loads(pickle.dumps(view)), view)
+
+    def test_make_decision_in_process(self):
+        asyncio.run(self.trader.make_decision())
+        buy_orders, sell_orders = self.trader.standing_orders
+        self.assertEqual(len(buy_orders) + len(sell_orders), 1)
+
+    def test_make_decision_in_process_pool(self):
+        with ProcessPoolExecutor(1) as executor:
+            self.trader.executor = executor
+            asyncio.run(self.trader.make_decision())
+        buy_orders, sell_orders = self.trader.standing_orders
+        self.assertEqual(len(buy_orders) + len(sell_orders), 1)
+
+    def test_trading_session(self):
+        traders = [
+            RandomDecisionTrader(money=300, stocks=10) for _ in range(4)
+        ]
+        session = TradingSession(
+            traders=traders, virtual_time=True, decision_workers=2
+        )
+        session.run(duration=5)
+
+        self.assertGreater(session.exchange.top_of_book().version, 0)
+        for trader in traders:
+            self.assertIsNone(trader.executor)
+
+
+if __name__ == "__main__":
+    unittest.main()
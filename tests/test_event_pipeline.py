@@ -0,0 +1,203 @@
+import threading
+import unittest
+
+from async_exchange.exchange import Exchange
+from async_exchange.logging.event_pipeline import EventPipeline
+from async_exchange.trader import Trader
+
+
+class ListLogger:
+    def __init__(self):
+        self.events = []
+
+    def send_event(self, record_type, message):
+        self.events.append((record_type, message))
+
+    def get_events(self, record_type):
+        return [
+            message for _record_type, message in self.events
+            if _record_type == record_type
+        ]
+
+
+class BlockedLogger(ListLogger):
+    """A logger that blocks until ``release`` is set."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def send_event(self, record_type, message):
+        self.release.wait()
+        super().send_event(record_type, message)
+
+
+class ColumnLogger(ListLogger):
+    def send_events(self, record_type, columns):
+        self.events.append((record_type, columns))
+
+
+class FailingLogger(ListLogger):
+    """A logger failing to send the events of the ``"fail"`` type."""
+
+    def __init__(self):
+        super().__init__()
+        self.closed = False
+
+    def send_event(self, record_type, message):
+        if record_type == "fail":
+            raise ConnectionError("The database is down")
+        super().send_event(record_type, message)
+
+    def close(self):
+        self.closed = True
+
+
+class FailingColumnLogger(FailingLogger):
+    def send_events(self, record_type, columns):
+        if record_type == "fail":
+            raise ConnectionError("The database is down")
+        self.events.append((record_type, columns))
+
+
+class TestEventPipeline(unittest.TestCase):
+    def test_send_event(self):
+        downstream = ListLogger()
+        pipeline = EventPipeline(downstream)
+        self.addCleanup(pipeline.close)
+
+        pipeline.send_event("type", {"data": 1})
+        pipeline.send_event("type", {"data": 2})
+        pipeline.send_event("other", {"data": 3})
+
+        self.assertEqual(
+            pipeline.get_events("type"), [{"data": 1}, {"data": 2}]
+        )
+        self.assertEqual(pipeline.stats["sent"], 3)
+
+    def test_send_events_as_columns(self):
+        downstream = ColumnLogger()
+        pipeline = EventPipeline(downstream)
+
+        for data in range(3):
+            pipeline.send_event("type", {"data": data, "more": -data})
+        pipeline.send_event("other", {"data": 3})
+        pipeline.close()
+
+        self.assertEqual(
+            downstream.events,
+            [
+                ("type", {"data": [0, 1, 2], "more": [0, -1, -2]}),
+                ("other", {"data": [3]}),
+            ],
+        )
+
+    def test_failing_logger(self):
+        for downstream in (FailingLogger(), FailingColumnLogger()):
+            pipeline = EventPipeline(downstream)
+            with self.assertLogs(
+                "async_exchange.logging.event_pipeline", "ERROR"
+            ):
+                for data in range(5):
+                    pipeline.send_event("fail", {"data": data})
+                pipeline.flush()
+            self.assertEqual(pipeline.stats["sent"], 0)
+            self.assertEqual(pipeline.stats["failed"], 5)
+
+            with self.assertLogs("async_exchange.logging.event_pipeline"):
+                pipeline.send_event("type", {"data": 1})
+                pipeline.send_event("fail", {"data": 2})
+                pipeline.send_event("type", {"data": 3})
+                pipeline.close()
+            self.assertEqual(pipeline.stats["sent"], 2)
+            self.assertEqual(pipeline.stats["failed"], 6)
+            self.assertEqual(len(downstream.events), 2)
+            self.assertTrue(downstream.closed)
+
+    def test_unknown_backpressure(self):
+        with self.assertRaises(ValueError):
+            EventPipeline(ListLogger(), backpressure="wait")
+
+    def test_drop(self):
+        downstream = BlockedLogger()
+        pipeline = EventPipeline(downstream, capacity=4, batch_size=1)
+
+        for data in range(10):
+            pipeline.send_event("type", {"data": data})
+        downstream.release.set()
+        pipeline.close()
+
+        # One event may already be taken by the background thread
+        self.assertIn(pipeline.stats["dropped"], (5, 6))
+        self.assertEqual(
+            pipeline.stats["sent"], 10 - pipeline.stats["dropped"]
+        )
+
+    def test_sample(self):
+        downstream = BlockedLogger()
+        pipeline = EventPipeline(
+            downstream,
+            capacity=100,
+            backpressure="sample",
+            sample_threshold=0.1,
+            sample_every=10,
+        )
+
+        for data in range(110):
+            pipeline.send_event("type", {"data": data})
+        downstream.release.set()
+        pipeline.close()
+
+        stats = pipeline.stats
+        self.assertEqual(stats["dropped"], 0)
+        self.assertGreater(stats["sampled"], 0)
+        self.assertEqual(stats["sent"] + stats["sampled"], 110)
+        self.assertEqual(stats["sent"], stats["enqueued"])
+
+    def test_block(self):
+        downstream = BlockedLogger()
+        pipeline = EventPipeline(
+            downstream, capacity=2, batch_size=1, backpressure="block"
+        )
+
+        sender = threading.Thread(
+            target=lambda: [
+                pipeline.send_event("type", {"data": data})
+                for data in range(10)
+            ]
+        )
+        sender.start()
+        sender.join(timeout=0.1)
+        self.assertTrue(sender.is_alive())
+
+        downstream.release.set()
+        sender.join()
+        pipeline.close()
+        self.assertEqual(pipeline.stats["sent"], 10)
+        self.assertEqual(pipeline.stats["dropped"], 0)
+
+    def test_closed(self):
+        pipeline = EventPipeline(ListLogger())
+        pipeline.close()
+
+        with self.assertRaises(RuntimeError):
+            pipeline.send_event("type", {})
+
+    def test_exchange_shutdown_closes_pipeline(self):
+        downstream = ListLogger()
+        pipeline = EventPipeline(downstream)
+        exchange = Exchange(logger=pipeline)
+        trader_1 = Trader(exchange_api=exchange.api)
+        trader_2 = Trader(exchange_api=exchange.api)
+
+        trader_1.buy(2, 5)
+        trader_2.sell(2, 5)
+        exchange.shutdown()
+
+        self.assertEqual(
+            downstream.events, [("exchange", {"price": 5.0, "amount": 2})]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
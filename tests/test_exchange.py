@@ -1,13 +1,15 @@
 import unittest
 
-from async_exchange.exchange import Exchange, ExchangeAPI
+from async_exchange.exchange import Exchange, ExchangeAPI, Fill, Level
 from async_exchange.trader import Trader
 from async_exchange.orders import BuyOrder, SellOrder
 
 
 class TestExchange(unittest.TestCase):
+    exchange_class = Exchange
+
     def setUp(self):
-        self.exchange = Exchange()
+        self.exchange = self.exchange_class()
         api = self.exchange.api
         self.trader_1 = Trader(exchange_api=api, money=100, stocks=10)
         self.trader_2 = Trader(exchange_api=api, money=100, stocks=10)
@@ -370,6 +372,93 @@ class TestExchange(unittest.TestCase):
         self.assertEqual(self.trader_3.stocks, 11)
         self.assertEqual(self.trader_3.money, 99)
 
+    def test_order_ids(self):
+        order_1 = BuyOrder(owner=self.trader_1, amount=1, price=1)
+        order_2 = SellOrder(owner=self.trader_2, amount=1, price=5)
+        self.assertIsNone(order_1.id)
+
+        self.exchange.process_order(order_1)
+        self.exchange.process_order(order_2)
+        self.assertIsInstance(order_1.id, int)
+        self.assertGreater(order_2.id, order_1.id)
+
+    def test_best_buy_best_sell(self):
+        self.assertIsNone(self.exchange.best_buy)
+        self.assertIsNone(self.exchange.best_sell)
+
+        self.trader_1.buy(1, 3)
+        self.trader_1.buy(1, 5)
+        self.trader_1.buy(1, 4)
+        self.trader_2.sell(1, 9)
+        self.trader_2.sell(1, 7)
+        self.trader_2.sell(1, 8)
+
+        self.assertEqual(self.exchange.best_buy, 5)
+        self.assertEqual(self.exchange.best_sell, 7)
+
+    def test_best_sell_after_level_is_consumed(self):
+        self.trader_1.sell(1, 4)
+        self.trader_2.sell(2, 5)
+        self.trader_3.sell(3, 7)
+
+        self.trader_4.buy(3, 5)
+        self.assertEqual(self.exchange.best_sell, 7)
+
+        self.trader_5.sell(1, 5)
+        self.assertEqual(self.exchange.best_sell, 5)
+
+    def test_best_buy_after_cancel(self):
+        order = BuyOrder(owner=self.trader_1, amount=1, price=10)
+        self.exchange.process_order(order)
+        self.trader_2.buy(1, 8)
+        self.assertEqual(self.exchange.best_buy, 10)
+
+        self.exchange.cancel_order(order)
+        self.assertEqual(self.exchange.best_buy, 8)
+
+    def test_sweep_many_resting_orders(self):
+        nof_orders = 100_000
+        seller = Trader(exchange_api=self.exchange.api, stocks=nof_orders)
+        buyer = Trader(exchange_api=self.exchange.api, money=2 * nof_orders)
+        for index in range(nof_orders):
+            seller.sell(1, 1 + index % 2)
+
+        buyer.buy(nof_orders, 2)
+
+        self.assertEqual(len(self.exchange.sell_levels), 0)
+        self.assertEqual(len(self.exchange.buy_levels), 0)
+        self.assertEqual(seller.stocks, 0)
+        self.assertEqual(buyer.stocks, 10 + nof_orders)
+        self.assertEqual(buyer.money, nof_orders // 2)
+
+    def test_process_orders(self):
+        resting_sell = SellOrder(owner=self.trader_1, amount=2, price=5)
+        self.exchange.process_order(resting_sell)
+
+        orders = [
+            SellOrder(owner=self.trader_2, amount=3, price=6),
+            BuyOrder(owner=self.trader_3, amount=4, price=6),
+            BuyOrder(owner=self.trader_4, amount=0, price=6),
+            BuyOrder(owner=self.trader_5, amount=1, price=4),
+        ]
+        fills = self.exchange.process_orders(orders)
+
+        self.assertEqual(
+            fills,
+            [
+                Fill(orders[1].id, resting_sell.id, 5, 2),
+                Fill(orders[1].id, orders[0].id, 6, 2),
+            ],
+        )
+        first_id = resting_sell.id + 1
+        self.assertEqual(
+            [order.id for order in orders],
+            [first_id, first_id + 1, None, first_id + 2],
+        )
+        self.assertEqual(self.exchange.get_orderbook(), ({4: 1}, {6: 1}))
+        self.assertEqual(self.trader_3.stocks, 14)
+        self.assertEqual(self.trader_3.money, 100 - 2 * 5 - 2 * 6)
+
     def test_cancel_order(self):
         order = BuyOrder(owner=self.trader_1, amount=10, price=10)
         self.exchange.process_order(order)
@@ -377,8 +466,8 @@ class TestExchange(unittest.TestCase):
 
         result = self.exchange.cancel_order(order=order)
         self.assertTrue(result)
-        self.assertEqual(len(self.exchange.buy_levels[10]), 0)
-        self.assertEqual(len(self.exchange.buy_levels), 1)
+        self.assertNotIn(10, self.exchange.buy_levels)
+        self.assertEqual(len(self.exchange.buy_levels), 0)
 
     def test_cancel_order_two_traders(self):
         order_1 = BuyOrder(owner=self.trader_1, amount=10, price=10)
@@ -400,6 +489,207 @@ class TestExchange(unittest.TestCase):
         result = self.exchange.cancel_order(order=order)
         self.assertFalse(result)
 
+    def test_cancel_partially_filled_order(self):
+        order = SellOrder(owner=self.trader_1, amount=5, price=10)
+        self.exchange.process_order(order)
+        self.trader_2.buy(2, 10)
+
+        result = self.exchange.cancel_order(order=order)
+        self.assertTrue(result)
+        self.assertEqual(len(self.exchange.sell_levels), 0)
+
+    def test_cancel_filled_order(self):
+        order = SellOrder(owner=self.trader_1, amount=5, price=10)
+        self.exchange.process_order(order)
+        self.trader_2.buy(5, 10)
+
+        result = self.exchange.cancel_order(order=order)
+        self.assertFalse(result)
+
+    def test_submit_order_twice(self):
+        order = BuyOrder(owner=self.trader_1, amount=10, price=10)
+        self.exchange.process_order(order)
+        with self.assertRaises(ValueError):
+            self.exchange.process_order(order)
+
+        other_order = BuyOrder(owner=self.trader_1, amount=1, price=9)
+        with self.assertRaises(ValueError):
+            self.exchange.process_orders([other_order, other_order])
+        self.assertEqual(self.exchange.get_orderbook(), ({10: 10, 9: 1}, {}))
+
+        self.trader_2.sell(10, 10)
+        self.assertEqual(self.exchange.get_orderbook(), ({9: 1}, {}))
+        self.assertEqual(self.trader_1.stocks, 20)
+
+    def test_standing_orders(self):
+        self.trader_1.buy(1, 4)
+        self.trader_2.buy(1, 4)
+        self.trader_1.sell(2, 6)
+        self.trader_1.buy(3, 2)
+
+        buy_orders, sell_orders = self.exchange.standing_orders(self.trader_1)
+        self.assertEqual([order.amount for order in buy_orders], [1, 3])
+        self.assertEqual([order.amount for order in sell_orders], [2])
+
+        self.trader_3.sell(1, 4)
+        self.trader_3.buy(2, 6)
+        buy_orders, sell_orders = self.exchange.standing_orders(self.trader_1)
+        self.assertEqual([order.amount for order in buy_orders], [3])
+        self.assertEqual(sell_orders, ())
+
+    def test_cancel_all(self):
+        self.trader_1.buy(1, 4)
+        self.trader_2.buy(1, 4)
+        self.trader_1.sell(2, 6)
+        self.trader_1.buy(3, 2)
+
+        result = self.exchange.cancel_all(self.trader_1)
+        self.assertEqual(result, 3)
+        self.assertEqual(
+            self.exchange.standing_orders(self.trader_1), ((), ())
+        )
+        self.assertEqual(self.exchange.get_orderbook(), ({4: 1}, {}))
+
+        result = self.exchange.cancel_all(self.trader_1)
+        self.assertEqual(result, 0)
+
+    def test_amend_order_decrease_keeps_priority(self):
+        order_1 = SellOrder(owner=self.trader_1, amount=5, price=10)
+        self.exchange.process_order(order_1)
+        order_2 = SellOrder(owner=self.trader_2, amount=5, price=10)
+        self.exchange.process_order(order_2)
+
+        result = self.exchange.amend_order(order_1, 3)
+        self.assertTrue(result)
+        self.assertEqual(
+            list(self.exchange.sell_levels[10]), [order_1, order_2]
+        )
+        self.assertEqual(order_1.amount, 3)
+
+    def test_amend_order_increase_loses_priority(self):
+        order_1 = SellOrder(owner=self.trader_1, amount=5, price=10)
+        self.exchange.process_order(order_1)
+        order_2 = SellOrder(owner=self.trader_2, amount=5, price=10)
+        self.exchange.process_order(order_2)
+
+        result = self.exchange.amend_order(order_1, 8)
+        self.assertTrue(result)
+        self.assertEqual(
+            list(self.exchange.sell_levels[10]), [order_2, order_1]
+        )
+        self.assertEqual(order_1.amount, 8)
+
+    def test_amend_order_to_zero_cancels(self):
+        order = BuyOrder(owner=self.trader_1, amount=5, price=10)
+        self.exchange.process_order(order)
+
+        result = self.exchange.amend_order(order, 0)
+        self.assertTrue(result)
+        self.assertEqual(len(self.exchange.buy_levels), 0)
+        self.assertFalse(self.exchange.amend_order(order, 5))
+
+    def test_get_orderbook(self):
+        self.trader_1.buy(3, 4)
+        self.trader_2.buy(2, 4)
+        self.trader_3.buy(5, 2)
+        self.trader_4.sell(1, 6)
+        self.trader_5.sell(4, 8)
+
+        buy_orders, sell_orders = self.exchange.get_orderbook()
+        self.assertEqual(buy_orders, {4: 5, 2: 5})
+        self.assertEqual(sell_orders, {6: 1, 8: 4})
+
+    def test_get_orderbook_volume_updates(self):
+        order = SellOrder(owner=self.trader_1, amount=3, price=5)
+        self.exchange.process_order(order)
+        self.trader_2.sell(4, 5)
+
+        self.trader_3.buy(2, 5)
+        self.assertEqual(self.exchange.get_orderbook(), ({}, {5: 5}))
+
+        self.exchange.amend_order(order, 0)
+        self.assertEqual(self.exchange.get_orderbook(), ({}, {5: 4}))
+
+        self.trader_2.stocks = 1
+        self.trader_3.buy(4, 5)
+        self.assertEqual(self.exchange.get_orderbook(), ({5: 3}, {}))
+
+    def test_get_orderbook_depth(self):
+        for price in (1, 5, 3, 4, 2):
+            self.trader_1.buy(price, price)
+        for price in (9, 7, 8):
+            self.trader_2.sell(1, price)
+
+        buy_orders, sell_orders = self.exchange.get_orderbook(depth=2)
+        self.assertEqual(list(buy_orders.items()), [(5, 5), (4, 4)])
+        self.assertEqual(list(sell_orders.items()), [(7, 1), (8, 1)])
+
+    def test_best_bid_ask(self):
+        self.assertEqual(self.exchange.best_bid_ask(), (None, None))
+
+        self.trader_1.buy(1, 4)
+        self.trader_1.buy(1, 5)
+        self.trader_2.sell(1, 7)
+        self.assertEqual(self.exchange.best_bid_ask(), (5, 7))
+
+        self.trader_3.sell(1, 5)
+        self.assertEqual(self.exchange.best_bid_ask(), (4, 7))
+
+    def test_last_trade(self):
+        self.assertEqual(self.exchange.last_trade(), (None, None))
+
+        self.trader_1.buy(3, 5)
+        self.trader_2.sell(2, 4)
+        self.assertEqual(self.exchange.last_trade(), (5, 2))
+
+    def test_top_of_book_is_versioned(self):
+        top_of_book = self.exchange.top_of_book()
+        self.assertIs(self.exchange.top_of_book(), top_of_book)
+
+        self.trader_1.buy(1, 5)
+        new_top_of_book = self.exchange.top_of_book()
+        self.assertGreater(new_top_of_book.version, top_of_book.version)
+        self.assertEqual(new_top_of_book.best_buy, 5)
+        self.assertIs(self.exchange.top_of_book(), new_top_of_book)
+
+        (order,), _ = self.trader_1.standing_orders
+        self.trader_1.cancel_order(order)
+        self.assertIsNone(self.exchange.top_of_book().best_buy)
+
+
+class TestLevel(unittest.TestCase):
+    def setUp(self):
+        trader = Trader()
+        self.orders = [BuyOrder(trader, 1, 10) for _ in range(3)]
+        self.level = Level()
+        for order in self.orders:
+            self.level.append(order)
+
+    def test_fifo(self):
+        self.assertEqual(len(self.level), 3)
+        self.assertEqual(self.level.volume, 3)
+        self.assertEqual(list(self.level), self.orders)
+        self.assertIs(self.level.popleft(), self.orders[0])
+        self.assertEqual(list(self.level), self.orders[1:])
+
+    def test_remove(self):
+        first, middle, last = self.orders
+
+        self.level.remove(middle)
+        self.assertEqual(list(self.level), [first, last])
+
+        self.level.remove(last)
+        self.assertIs(self.level.tail, first)
+
+        self.level.remove(first)
+        self.assertEqual(len(self.level), 0)
+        self.assertIsNone(self.level.head)
+        self.assertIsNone(self.level.tail)
+        self.assertEqual(self.level.volume, 0)
+
+        with self.assertRaises(IndexError):
+            self.level.popleft()
+
 
 class TestExchangeAPI(unittest.TestCase):
     def setUp(self):
@@ -409,9 +699,19 @@ class TestExchangeAPI(unittest.TestCase):
     def test_exchange_api(self):
         self.assertIsInstance(self.api, ExchangeAPI)
         self.assertEqual(self.api.process_order, self.exchange.process_order)
+        self.assertEqual(
+            self.api.process_orders, self.exchange.process_orders
+        )
         self.assertEqual(self.api.standing_orders, self.exchange.standing_orders)
         self.assertEqual(self.api.get_orderbook, self.exchange.get_orderbook)
         self.assertEqual(self.api.cancel_order, self.exchange.cancel_order)
+        self.assertEqual(self.api.amend_order, self.exchange.amend_order)
+        self.assertEqual(self.api.cancel_all, self.exchange.cancel_all)
+        self.assertEqual(self.api.subscribe, self.exchange.subscribe)
+        self.assertEqual(self.api.unsubscribe, self.exchange.unsubscribe)
+        self.assertEqual(self.api.top_of_book, self.exchange.top_of_book)
+        self.assertEqual(self.api.best_bid_ask, self.exchange.best_bid_ask)
+        self.assertEqual(self.api.last_trade, self.exchange.last_trade)
 
 
 if __name__ == "__main__":
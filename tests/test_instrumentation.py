@@ -0,0 +1,168 @@
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from async_exchange.batch_auction import BatchAuctionExchange
+from async_exchange.exchange import Exchange
+from async_exchange.instrumentation import STATS_SCHEMA, LatencyHistogram
+from async_exchange.orders import SellOrder
+from async_exchange.trader import Trader
+
+if numpy is not None:
+    from async_exchange.array_exchange import ArrayExchange
+
+
+class RecordingLogger:
+    def __init__(self):
+        self.events = []
+
+    def send_event(self, record_type, message):
+        self.events.append((record_type, message))
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_small_values_are_exact(self):
+        histogram = LatencyHistogram(sub_bucket_bits=5)
+        for value in range(1, 64):
+            histogram.record(value)
+
+        self.assertEqual(histogram.count, 63)
+        self.assertEqual(histogram.max, 63)
+        self.assertEqual(histogram.percentile(50), 32)
+        self.assertEqual(histogram.percentile(100), 63)
+
+    def test_large_values_relative_error(self):
+        histogram = LatencyHistogram(sub_bucket_bits=5)
+        values = [1000 * 3 ** power for power in range(20)]
+        for value in values:
+            histogram.record(value)
+
+        for rank, value in enumerate(values, 1):
+            percentile = histogram.percentile(100 * rank / len(values))
+            self.assertGreaterEqual(percentile, value)
+            self.assertLessEqual(percentile, value * (1 + 2 ** -5))
+
+    def test_bucket_bounds(self):
+        histogram = LatencyHistogram(sub_bucket_bits=2)
+        for value in range(1, 10_000):
+            index = histogram._index(value)
+            self.assertGreaterEqual(histogram._highest_value(index), value)
+            if index > 0:
+                self.assertLess(histogram._highest_value(index - 1), value)
+
+    def test_empty(self):
+        histogram = LatencyHistogram()
+        self.assertEqual(histogram.percentile(99), 0)
+        self.assertEqual(histogram.mean, 0.0)
+        self.assertEqual(
+            histogram.summary(prefix="x_"),
+            {
+                "x_count": 0,
+                "x_p50_ns": 0,
+                "x_p90_ns": 0,
+                "x_p99_ns": 0,
+                "x_max_ns": 0,
+            },
+        )
+
+
+class TestExchangeInstrumentation(unittest.TestCase):
+    exchange_class = Exchange
+
+    def setUp(self):
+        self.logger = RecordingLogger()
+        self.exchange = self.exchange_class(
+            logger=self.logger, instrument=True
+        )
+        self.trader_1 = Trader(money=100, stocks=10)
+        self.trader_2 = Trader(money=100, stocks=10)
+        self.exchange.register_trader(self.trader_1)
+        self.exchange.register_trader(self.trader_2)
+
+    def test_not_instrumented(self):
+        exchange = self.exchange_class()
+        self.assertIsNone(exchange.get_stats())
+        self.assertNotIn("process_order", vars(exchange))
+
+    def test_counters(self):
+        self.trader_1.buy(2, 10)
+        self.trader_2.sell(1, 10)
+        order = SellOrder(self.trader_2, 3, 20)
+        self.trader_2.exchange_api.process_order(order)
+        self.assertTrue(self.trader_2.cancel_order(order))
+        self.assertFalse(self.trader_2.cancel_order(order))
+
+        stats = self.trader_1.exchange_api.get_stats()
+        self.assertEqual(stats["orders"], 3)
+        self.assertEqual(stats["fills"], 1)
+        self.assertEqual(stats["cancels"], 1)
+        self.assertEqual(stats["money_retries"], 0)
+        self.assertEqual(stats["stock_retries"], 0)
+        self.assertEqual(stats["process_order_count"], 3)
+        self.assertEqual(stats["cancel_order_count"], 2)
+        self.assertGreater(stats["process_order_p50_ns"], 0)
+        self.assertLessEqual(
+            stats["process_order_p50_ns"], stats["process_order_max_ns"]
+        )
+
+    def test_batch_and_cancel_all(self):
+        self.trader_1.submit_many([(0, 1, 10), (0, 1, 9), (0, 1, 8)])
+        self.trader_1.cancel_all_orders()
+
+        stats = self.exchange.get_stats()
+        self.assertEqual(stats["orders"], 3)
+        self.assertEqual(stats["cancels"], 3)
+
+    def test_retries(self):
+        self.trader_1.buy(5, 80)
+        self.trader_2.sell(5, 80)
+
+        stats = self.exchange.get_stats()
+        self.assertEqual(stats["money_retries"], 1)
+        self.assertEqual(stats["fills"], 1)
+
+        self.trader_2.sell(20, 1)
+        self.trader_1.buy(20, 1)
+        self.assertEqual(self.exchange.get_stats()["stock_retries"], 1)
+
+    def test_log_stats(self):
+        self.trader_1.buy(1, 10)
+        self.exchange.shutdown()
+
+        record_type, message = self.logger.events[-1]
+        self.assertEqual(record_type, "stats")
+        self.assertEqual(message["orders"], 1)
+        self.assertEqual(
+            sorted(message), sorted(name for name, _ in STATS_SCHEMA)
+        )
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class TestArrayExchangeInstrumentation(TestExchangeInstrumentation):
+    exchange_class = ArrayExchange if numpy is not None else None
+
+
+class TestBatchAuctionInstrumentation(unittest.TestCase):
+    def test_auction_fills(self):
+        exchange = BatchAuctionExchange(instrument=True)
+        buyer = Trader(money=100, stocks=0)
+        seller = Trader(money=0, stocks=10)
+        exchange.register_trader(buyer)
+        exchange.register_trader(seller)
+
+        buyer.submit_many([(0, 2, 10), (0, 1, 11)])
+        seller.sell(3, 10)
+        exchange.run_auction()
+
+        stats = exchange.get_stats()
+        self.assertEqual(stats["orders"], 3)
+        self.assertEqual(stats["fills"], 2)
+        # The batch does not go through ``process_order``
+        self.assertEqual(stats["process_order_count"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+import os
+import random
+import tempfile
+import unittest
+
+from async_exchange.algorithms.random_trader import RandomTrader
+from async_exchange.batch_auction import BatchAuctionExchange
+from async_exchange.exchange import Exchange
+from async_exchange.journal import (
+    FILL,
+    MAGIC,
+    RECORD,
+    OrderJournal,
+    ReplayMismatchError,
+    read_journal,
+    replay,
+)
+from async_exchange.orders import BuyOrder
+from async_exchange.scheduler import AgentScheduler
+from async_exchange.trader import Trader
+
+
+class TestOrderJournal(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "session.journal")
+
+    def record_session(self, exchange_class=Exchange):
+        exchange = exchange_class(journal=OrderJournal(self.path))
+        buyer = Trader(money=1000, stocks=0)
+        seller = Trader(money=0, stocks=100)
+        exchange.register_trader(buyer)
+        exchange.register_trader(seller)
+
+        order = BuyOrder(buyer, 5, 10)
+        buyer.exchange_api.process_order(order)
+        buyer.submit_many([(0, 3, 9), (0, 2, 11), (0, 0, 12)])
+        buyer.amend_order(order, 3)
+        seller.sell(4, 9)
+        buyer.cancel_order(order)
+        seller.sell(10, 12)
+        buyer.cancel_all_orders()
+        exchange.shutdown()
+        return exchange, buyer, seller
+
+    def test_records(self):
+        self.record_session()
+        records = list(read_journal(self.path, chunk_records=3))
+
+        self.assertEqual(
+            [record[0] for record in records], list(range(len(records)))
+        )
+        fills = [record for record in records if record[1] == FILL]
+        # The sell order of 4 fills 2 at 11 and 2 at 10
+        self.assertEqual(
+            [(price, amount) for *_, price, amount in fills],
+            [(11.0, 2), (10.0, 2)],
+        )
+
+    def test_replay(self):
+        _, buyer, seller = self.record_session()
+
+        exchange = replay(self.path)
+        self.assertEqual(exchange.get_orderbook(), ({}, {12: 10}))
+
+        (replayed_seller,) = (
+            order.owner for order in exchange.sell_levels[12]
+        )
+        self.assertEqual(replayed_seller.money, seller.money)
+        self.assertEqual(replayed_seller.stocks, seller.stocks)
+
+    def test_replay_random_session(self):
+        random.seed(0)
+        exchange = Exchange(journal=OrderJournal(self.path))
+        traders = [RandomTrader(money=300, stocks=10) for _ in range(20)]
+        scheduler = AgentScheduler()
+        for trader in traders:
+            exchange.register_trader(trader)
+            scheduler.add(trader)
+        scheduler.run_until(50)
+        for trader in traders[:5]:
+            trader.cancel_all_orders()
+        exchange.shutdown()
+
+        replayed = replay(self.path)
+        self.assertGreater(replayed.top_of_book().version, 0)
+        self.assertEqual(replayed.get_orderbook(), exchange.get_orderbook())
+        self.assertEqual(replayed.last_trade(), exchange.last_trade())
+
+    def test_replay_batch_auction(self):
+        exchange = BatchAuctionExchange(journal=OrderJournal(self.path))
+        buyer = Trader(money=100, stocks=0)
+        seller = Trader(money=0, stocks=10)
+        buyer.exchange_api = seller.exchange_api = exchange.api
+        buyer.buy(3, 10)
+        seller.sell(5, 9)
+        fills = exchange.run_auction()
+        exchange.shutdown()
+        self.assertEqual(len(fills), 1)
+
+        replayed = replay(self.path, BatchAuctionExchange())
+        self.assertEqual(replayed.get_orderbook(), ({}, {9: 2}))
+        self.assertEqual(replayed.last_clearing_price, 9)
+
+    def test_existing_journal(self):
+        self.record_session()
+        with self.assertRaises(FileExistsError):
+            OrderJournal(self.path)
+
+    def test_mismatch(self):
+        self.record_session()
+        records = list(read_journal(self.path))
+        index = next(
+            index
+            for index, record in enumerate(records)
+            if record[1] == FILL
+        )
+        sequence, kind, side, a, b, price, amount = records[index]
+        with open(self.path, "r+b") as file:
+            file.seek(len(MAGIC) + index * RECORD.size)
+            file.write(RECORD.pack(sequence, kind, side, a, b, price, 1))
+
+        with self.assertRaises(ReplayMismatchError):
+            replay(self.path)
+
+    def test_truncated(self):
+        self.record_session()
+        with open(self.path, "r+b") as file:
+            file.truncate(os.path.getsize(self.path) - 1)
+
+        with self.assertRaises(ValueError):
+            replay(self.path)
+
+    def test_not_a_journal(self):
+        with open(self.path, "wb") as file:
+            file.write(b"not a journal")
+
+        with self.assertRaises(ValueError):
+            list(read_journal(self.path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,236 @@
+import random
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from async_exchange.batch_auction import BatchAuctionExchange
+from async_exchange.exchange import Exchange
+from async_exchange.market_data import (
+    BookSnapshot,
+    BookUpdate,
+    LocalBook,
+    Trade,
+)
+from async_exchange.orders import BUY, SELL
+from async_exchange.trader import Trader
+
+if numpy is not None:
+    from async_exchange.array_exchange import ArrayExchange
+else:
+    ArrayExchange = None
+
+
+def drain(queue):
+    messages = []
+    while not queue.empty():
+        messages.append(queue.get_nowait())
+    return messages
+
+
+class TestMarketData(unittest.TestCase):
+    exchange_class = Exchange
+
+    def setUp(self):
+        self.exchange = self.exchange_class()
+        api = self.exchange.api
+        self.buyer = Trader(exchange_api=api, money=1000, stocks=0)
+        self.seller = Trader(exchange_api=api, money=0, stocks=100)
+
+    def test_initial_snapshot(self):
+        self.buyer.buy(2, 5)
+        queue = self.exchange.subscribe()
+
+        (snapshot,) = drain(queue)
+        self.assertEqual(snapshot, BookSnapshot(0, {5: 2}, {}))
+
+    def test_level_updates(self):
+        queue = self.exchange.subscribe()
+        drain(queue)
+
+        self.buyer.buy(2, 5)
+        self.buyer.buy(3, 5)
+        self.assertEqual(
+            drain(queue),
+            [BookUpdate(1, BUY, 5, 2), BookUpdate(2, BUY, 5, 5)],
+        )
+
+        (order, _), _ = self.exchange.standing_orders(self.buyer)
+        self.exchange.amend_order(order, 1)
+        self.assertEqual(drain(queue), [BookUpdate(3, BUY, 5, 4)])
+
+        self.exchange.cancel_all(self.buyer)
+        self.assertEqual(drain(queue), [BookUpdate(4, BUY, 5, 0)])
+
+    def test_trade_prints(self):
+        self.seller.sell(2, 5)
+        self.seller.sell(2, 6)
+        queue = self.exchange.subscribe()
+        drain(queue)
+
+        self.buyer.buy(3, 6)
+        self.assertEqual(
+            drain(queue),
+            [
+                Trade(1, 5, 2),
+                Trade(2, 6, 1),
+                BookUpdate(3, SELL, 5, 0),
+                BookUpdate(4, SELL, 6, 1),
+            ],
+        )
+
+    def test_periodic_snapshots(self):
+        queue = self.exchange.subscribe(snapshot_interval=2)
+        drain(queue)
+
+        self.buyer.buy(1, 1)
+        self.buyer.buy(1, 2)
+        *_, snapshot = drain(queue)
+        self.assertEqual(snapshot, BookSnapshot(2, {1: 1, 2: 1}, {}))
+
+    def test_full_queue_drops_messages(self):
+        queue = self.exchange.subscribe(maxsize=2, snapshot_interval=3)
+        self.buyer.buy(1, 1)
+        self.buyer.buy(1, 2)
+
+        book = LocalBook()
+        for message in drain(queue):
+            book.apply(message)
+        self.assertEqual(book.sequence, 1)
+
+        # The update of the price 2 was dropped, so the book waits for the
+        # snapshot following the next update
+        self.buyer.buy(1, 3)
+        with self.assertLogs("async_exchange.market_data", "WARNING") as logs:
+            for message in drain(queue):
+                book.apply(message)
+        self.assertIn("messages 2 to 2", logs.output[0])
+        self.buyer.buy(1, 4)
+        for message in drain(queue):
+            book.apply(message)
+        self.assertTrue(book.synced)
+        self.assertEqual(book.buy_levels, {1: 1, 2: 1, 3: 1, 4: 1})
+
+    def test_unsubscribe(self):
+        queue = self.exchange.subscribe()
+        self.assertTrue(self.exchange.unsubscribe(queue))
+        self.assertFalse(self.exchange.unsubscribe(queue))
+        self.assertIsNone(self.exchange._feed)
+
+        drain(queue)
+        self.buyer.buy(1, 1)
+        self.assertTrue(queue.empty())
+
+    def test_local_book_follows_the_exchange(self):
+        rng = random.Random(0)
+        queue = self.exchange.subscribe(snapshot_interval=50)
+        book = LocalBook()
+        traders = [
+            Trader(exchange_api=self.exchange.api, money=1000, stocks=100)
+            for _ in range(5)
+        ]
+        for _ in range(500):
+            trader = rng.choice(traders)
+            action = rng.random()
+            if action < 0.4:
+                trader.buy(rng.randint(1, 5), rng.randint(5, 15))
+            elif action < 0.8:
+                trader.sell(rng.randint(1, 5), rng.randint(5, 15))
+            elif action < 0.9:
+                trader.cancel_all_orders()
+            else:
+                buy_orders, sell_orders = self.exchange.standing_orders(
+                    trader
+                )
+                for order in buy_orders + sell_orders:
+                    self.exchange.amend_order(order, rng.randint(0, 8))
+            for message in drain(queue):
+                book.apply(message)
+
+            buy_levels, sell_levels = self.exchange.get_orderbook(depth=100)
+            self.assertEqual(book.buy_levels, buy_levels)
+            self.assertEqual(book.sell_levels, sell_levels)
+            self.assertEqual(book.best_buy, self.exchange.best_buy)
+            self.assertEqual(book.best_sell, self.exchange.best_sell)
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class TestArrayExchangeMarketData(TestMarketData):
+    exchange_class = ArrayExchange
+
+
+class TestBatchAuctionMarketData(unittest.TestCase):
+    def test_auction_updates(self):
+        exchange = BatchAuctionExchange()
+        buyer = Trader(exchange_api=exchange.api, money=100, stocks=0)
+        seller = Trader(exchange_api=exchange.api, money=0, stocks=10)
+        queue = exchange.subscribe()
+        buyer.buy(2, 6)
+        seller.sell(3, 5)
+        drain(queue)
+
+        exchange.run_auction()
+        self.assertEqual(
+            drain(queue),
+            [
+                Trade(3, 5, 2),
+                BookUpdate(4, BUY, 6, 0),
+                BookUpdate(5, SELL, 5, 1),
+            ],
+        )
+
+
+class TestLocalBook(unittest.TestCase):
+    def test_gap_waits_for_snapshot(self):
+        book = LocalBook()
+        book.apply(BookUpdate(1, BUY, 5, 1))
+        self.assertFalse(book.synced)
+
+        book.apply(BookSnapshot(1, {5: 1}, {}))
+        with self.assertLogs("async_exchange.market_data", "WARNING"):
+            book.apply(BookUpdate(3, BUY, 5, 2))
+        self.assertFalse(book.synced)
+
+        book.apply(BookSnapshot(3, {5: 2}, {6: 1}))
+        book.apply(Trade(4, 6, 1))
+        book.apply(BookUpdate(5, SELL, 6, 0))
+        self.assertEqual(book.sequence, 5)
+        self.assertEqual(book.sell_levels, {})
+        self.assertEqual(book.last_trade, Trade(4, 6, 1))
+
+    def test_best_prices(self):
+        book = LocalBook()
+        self.assertEqual((book.best_buy, book.best_sell), (None, None))
+
+        book.apply(BookSnapshot(1, {5: 1, 4: 2}, {7: 1}))
+        self.assertEqual((book.best_buy, book.best_sell), (5, 7))
+
+        updates = [
+            (BUY, 6, 1, (6, 7)),
+            (SELL, 6.5, 3, (6, 6.5)),
+            (BUY, 6, 0, (5, 6.5)),
+            (BUY, 5, 0, (4, 6.5)),
+            (SELL, 6.5, 0, (4, 7)),
+            (BUY, 5, 4, (5, 7)),
+            (SELL, 7, 0, (5, None)),
+            (BUY, 4, 0, (5, None)),
+            (BUY, 5, 0, (None, None)),
+        ]
+        for sequence, (side, price, volume, best) in enumerate(updates, 2):
+            book.apply(BookUpdate(sequence, side, price, volume))
+            self.assertEqual((book.best_buy, book.best_sell), best)
+
+    def test_stale_prices_are_dropped(self):
+        book = LocalBook()
+        book.apply(BookSnapshot(0, {}, {}))
+        for sequence in range(1, 1001):
+            book.apply(BookUpdate(2 * sequence - 1, SELL, 1000 - sequence, 1))
+            book.apply(BookUpdate(2 * sequence, SELL, 1000 - sequence, 0))
+        self.assertLess(len(book._heaps[SELL]), 100)
+        self.assertIsNone(book.best_sell)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,201 @@
+import unittest
+from unittest import mock
+
+from async_exchange.exchange import ExchangeAPI, Fill
+from async_exchange.multi_exchange import MultiExchange
+from async_exchange.orders import BuyOrder, SellOrder
+from async_exchange.trader import Trader
+
+
+class TestMultiExchange(unittest.TestCase):
+    workers = 0
+
+    def setUp(self):
+        self.exchange = MultiExchange(
+            symbols=("AAA", "BBB", "CCC"), workers=self.workers
+        )
+        self.addCleanup(self.exchange.shutdown)
+
+        api = self.exchange.api
+        holdings = {"AAA": 10, "BBB": 10}
+        self.trader_1 = Trader(api, money=100, stocks=0, holdings=holdings)
+        self.trader_2 = Trader(api, money=100, stocks=0, holdings=holdings)
+
+    def test_api(self):
+        self.assertIsInstance(self.trader_1.exchange_api, ExchangeAPI)
+        with self.assertRaises(TypeError):
+            self.trader_1.exchange_api.subscribe()
+
+    def test_unknown_symbol(self):
+        with self.assertRaises(ValueError):
+            self.trader_1.buy(1, 10, symbol="XXX")
+
+    def test_unknown_symbol_in_batch(self):
+        orders = [
+            BuyOrder(self.trader_1, 5, 10, symbol="AAA"),
+            BuyOrder(self.trader_1, 1, 10, symbol="ZZZ"),
+        ]
+        with self.assertRaises(ValueError):
+            self.exchange.process_orders(orders)
+
+        self.assertEqual(self.trader_1.money, 100)
+        self.assertEqual(self.exchange.get_orderbook("AAA"), ({}, {}))
+
+    def test_invalid_price_in_batch(self):
+        self.trader_2.buy(1, 10, symbol="AAA")
+        orders = [
+            SellOrder(self.trader_1, 2, 30, symbol="AAA"),
+            BuyOrder(self.trader_1, 1, -1, symbol="BBB"),
+        ]
+        with self.assertRaises(ValueError):
+            self.exchange.process_orders(orders)
+
+        self.assertEqual(self.trader_1.holdings, {"AAA": 10, "BBB": 10})
+        self.assertEqual(self.exchange.get_orderbook("AAA"), ({10: 1}, {}))
+
+    def test_shard_error(self):
+        orders = [
+            SellOrder(self.trader_1, 2, "x", symbol="AAA"),
+            SellOrder(self.trader_1, 3, 20, symbol="BBB"),
+        ]
+        self.trader_2.buy(1, 10, symbol="AAA")
+        with self.assertRaises(TypeError):
+            self.exchange.process_orders(orders)
+
+        # The invalid order is not standing, and its stocks are returned
+        self.assertEqual(self.trader_1.holdings, {"AAA": 10, "BBB": 7})
+        self.assertEqual(self.exchange.get_orderbook("AAA"), ({10: 1}, {}))
+        self.assertEqual(self.exchange.get_orderbook("BBB"), ({}, {20: 3}))
+
+        # The exchange still works
+        self.trader_2.buy(3, 20, symbol="BBB")
+        self.assertEqual(self.trader_1.money, 160)
+        self.assertEqual(self.exchange.get_orderbook("BBB"), ({}, {}))
+        self.assertEqual(self.trader_1.standing_orders, ((), ()))
+
+    def test_orders_reserve_assets(self):
+        self.trader_1.buy(3, 10, symbol="AAA")
+        self.trader_1.sell(4, 20, symbol="BBB")
+
+        self.assertEqual(self.trader_1.money, 70)
+        self.assertEqual(self.trader_1.holdings, {"AAA": 10, "BBB": 6})
+        self.assertEqual(self.exchange.get_orderbook("AAA"), ({10: 3}, {}))
+        self.assertEqual(self.exchange.get_orderbook("BBB"), ({}, {20: 4}))
+        self.assertEqual(self.exchange.get_orderbook("CCC"), ({}, {}))
+
+    def test_order_reduced_to_assets(self):
+        self.trader_1.buy(30, 10, symbol="AAA")
+        self.trader_1.sell(40, 20, symbol="BBB")
+
+        self.assertEqual(self.exchange.get_orderbook("AAA"), ({10: 10}, {}))
+        self.assertEqual(self.exchange.get_orderbook("BBB"), ({}, {20: 10}))
+        self.assertEqual(self.trader_1.money, 0)
+
+    def test_books_are_separate(self):
+        self.trader_1.buy(2, 10, symbol="AAA")
+        self.trader_2.sell(2, 10, symbol="BBB")
+
+        self.assertEqual(self.exchange.get_orderbook("AAA"), ({10: 2}, {}))
+        self.assertEqual(self.exchange.get_orderbook("BBB"), ({}, {10: 2}))
+
+    def test_exchange(self):
+        self.trader_2.sell(2, 8, symbol="AAA")
+        self.trader_1.buy(3, 10, symbol="AAA")
+
+        self.assertEqual(self.trader_1.holdings["AAA"], 12)
+        self.assertEqual(self.trader_1.money, 100 - 2 * 8 - 1 * 10)
+        self.assertEqual(self.trader_2.holdings["AAA"], 8)
+        self.assertEqual(self.trader_2.money, 116)
+        self.assertEqual(self.exchange.get_orderbook("AAA"), ({10: 1}, {}))
+
+    def test_top_of_book(self):
+        self.trader_2.sell(2, 8, symbol="AAA")
+        self.trader_1.buy(1, 7, symbol="AAA")
+        top_of_book = self.exchange.top_of_book("AAA")
+        self.assertEqual(top_of_book.best_buy, 7)
+        self.assertEqual(top_of_book.best_sell, 8)
+        self.assertIs(self.exchange.top_of_book("AAA"), top_of_book)
+        self.assertEqual(self.exchange.best_bid_ask("BBB"), (None, None))
+
+        self.trader_1.buy(1, 8, symbol="AAA")
+        self.assertEqual(self.exchange.best_bid_ask("AAA"), (7, 8))
+        self.assertEqual(self.exchange.last_trade("AAA"), (8, 1))
+        self.assertEqual(self.exchange.last_trade("BBB"), (None, None))
+
+    def test_process_orders_in_parallel(self):
+        orders = [
+            SellOrder(self.trader_2, 2, 8, symbol="AAA"),
+            SellOrder(self.trader_2, 1, 5, symbol="BBB"),
+            BuyOrder(self.trader_1, 2, 8, symbol="AAA"),
+            BuyOrder(self.trader_1, 1, 6, symbol="BBB"),
+        ]
+        fills = self.exchange.process_orders(orders)
+
+        self.assertCountEqual(
+            fills,
+            [
+                ("AAA", Fill(orders[2].id, orders[0].id, 8, 2)),
+                ("BBB", Fill(orders[3].id, orders[1].id, 5, 1)),
+            ],
+        )
+        self.assertEqual(self.trader_1.money, 100 - 16 - 5)
+        self.assertEqual(self.trader_2.money, 100 + 16 + 5)
+        self.assertEqual(self.trader_1.holdings, {"AAA": 12, "BBB": 11})
+        self.assertEqual(self.trader_2.holdings, {"AAA": 8, "BBB": 9})
+
+    def test_cancel_order(self):
+        order = BuyOrder(self.trader_1, 3, 10, symbol="AAA")
+        self.exchange.process_order(order)
+
+        self.assertTrue(self.exchange.cancel_order(order))
+        self.assertEqual(self.trader_1.money, 100)
+        self.assertEqual(self.exchange.get_orderbook("AAA"), ({}, {}))
+        self.assertFalse(self.exchange.cancel_order(order))
+
+    def test_cancel_all(self):
+        self.trader_1.buy(3, 10, symbol="AAA")
+        self.trader_1.sell(4, 20, symbol="BBB")
+        self.trader_1.sell(4, 20, symbol="AAA")
+
+        self.assertEqual(self.exchange.cancel_all(self.trader_1), 3)
+        self.assertEqual(self.trader_1.money, 100)
+        self.assertEqual(self.trader_1.holdings, {"AAA": 10, "BBB": 10})
+        self.assertEqual(self.trader_1.standing_orders, ((), ()))
+
+    def test_amend_order(self):
+        self.trader_1.sell(4, 20, symbol="BBB")
+        _, (order,) = self.trader_1.standing_orders
+
+        self.assertTrue(self.trader_1.amend_order(order, 2))
+        self.assertEqual(self.trader_1.holdings["BBB"], 8)
+
+        self.assertTrue(self.trader_1.amend_order(order, 10))
+        self.assertEqual(self.trader_1.holdings["BBB"], 0)
+        self.assertEqual(self.exchange.get_orderbook("BBB"), ({}, {20: 10}))
+
+        self.assertFalse(self.trader_1.amend_order(order, 11))
+        self.assertEqual(self.trader_1.holdings["BBB"], 0)
+
+    def test_amend_order_shard_error(self):
+        self.trader_1.buy(2, 10, symbol="AAA")
+        (order,), _ = self.trader_1.standing_orders
+
+        shard = self.exchange._shard("AAA")
+        with mock.patch.object(shard, "send", side_effect=OSError):
+            with self.assertRaises(OSError):
+                self.trader_1.amend_order(order, 5)
+        # The money reserved for the increase is returned
+        self.assertEqual(self.trader_1.money, 80)
+        self.assertEqual(order.amount, 2)
+
+        self.assertTrue(self.trader_1.amend_order(order, 5))
+        self.assertEqual(self.trader_1.money, 50)
+        self.assertEqual(self.exchange.get_orderbook("AAA"), ({10: 5}, {}))
+
+
+class TestMultiExchangeWorkers(TestMultiExchange):
+    workers = 2
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,179 @@
+from collections import Counter
+import random
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from async_exchange.algorithms.random_trader import RandomTrader
+from async_exchange.exchange import Exchange
+from async_exchange.orders import BUY, SELL
+from async_exchange.trading_session import TradingSession
+
+if numpy is not None:
+    from async_exchange.algorithms.random_population import (
+        RandomTraderPopulation,
+    )
+
+
+class RecordingAPI:
+    """Exchange API with a fixed top of the book, recording the orders
+    without matching them."""
+
+    def __init__(self, best_bid_ask):
+        self._best_bid_ask = best_bid_ask
+        self.orders = []
+
+    def best_bid_ask(self):
+        return self._best_bid_ask
+
+    def process_order(self, order):
+        self.orders.append(order)
+        return []
+
+    def process_orders(self, orders):
+        self.orders.extend(orders)
+        return []
+
+
+def distance(first, second):
+    """Total variation distance between the empirical distributions of two
+    samples."""
+    first, second = Counter(first), Counter(second)
+    first_total, second_total = sum(first.values()), sum(second.values())
+    return sum(
+        abs(first[value] / first_total - second[value] / second_total)
+        for value in first.keys() | second.keys()
+    ) / 2
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class TestRandomTraderPopulation(unittest.TestCase):
+    def setUp(self):
+        self.exchange = Exchange()
+        self.population = RandomTraderPopulation(
+            size=50, money=300, stocks=10, seed=42
+        )
+        self.exchange.register_trader(self.population)
+
+    def test_init(self):
+        self.assertEqual(len(self.population), 50)
+        member = self.population.members[3]
+        self.assertEqual(member.money, 300)
+        self.assertEqual(member.stocks, 10)
+
+        member.money = 20
+        self.assertEqual(self.population.money[3], 20)
+
+    def test_session_registers_population(self):
+        exchange = Exchange()
+        TradingSession(traders=[self.population], exchange=exchange)
+        self.assertIsNotNone(self.population.exchange_api)
+
+    def test_step_conserves_assets(self):
+        for _ in range(20):
+            self.population.step()
+
+        self.assertEqual(self.population.money.sum(), 50 * 300)
+        self.assertEqual(self.population.stocks.sum(), 50 * 10)
+        self.assertGreaterEqual(self.population.money.min(), 0)
+        self.assertGreaterEqual(self.population.stocks.min(), 0)
+
+    def test_first_step_uses_default_price(self):
+        self.population.step()
+
+        buy_orders, sell_orders = self.exchange.get_orderbook()
+        self.assertEqual(set(buy_orders) | set(sell_orders), {10})
+
+    def test_step_reproducible(self):
+        other_exchange = Exchange()
+        other_population = RandomTraderPopulation(
+            size=50, money=300, stocks=10, seed=42
+        )
+        other_exchange.register_trader(other_population)
+
+        for _ in range(5):
+            self.population.step()
+            other_population.step()
+
+        numpy.testing.assert_array_equal(
+            self.population.money, other_population.money
+        )
+        self.assertEqual(
+            self.exchange.get_orderbook(), other_exchange.get_orderbook()
+        )
+
+    def test_member_trades_through_population(self):
+        member = self.population.members[0]
+        self.assertIs(member.exchange_api, self.population.exchange_api)
+
+        member.buy(2, 12)
+        self.assertEqual(self.exchange.get_orderbook(), ({12: 2}, {}))
+
+        with self.assertRaises(ValueError):
+            member.exchange_api = Exchange().api
+
+    def test_same_distribution_as_random_trader(self):
+        samples = 20000
+        api = RecordingAPI((96, 114))
+        population = RandomTraderPopulation(
+            size=samples, money=300, stocks=10, seed=1
+        )
+        population.exchange_api = api
+        population.step()
+        population_orders = api.orders
+
+        random.seed(1)
+        api = RecordingAPI((96, 114))
+        trader = RandomTrader(exchange_api=api, money=300, stocks=10)
+        for _ in range(samples):
+            trader.place_random_order()
+        trader_orders = api.orders
+
+        # The book is never matched, so every draw leads to an order
+        self.assertEqual(len(population_orders), samples)
+        self.assertEqual(len(trader_orders), samples)
+
+        def sides(orders):
+            return [order.side for order in orders]
+
+        def prices(orders, side):
+            return [order.price for order in orders if order.side == side]
+
+        def amounts(orders, side):
+            return [order.amount for order in orders if order.side == side]
+
+        population_buys = sides(population_orders).count(BUY) / samples
+        trader_buys = sides(trader_orders).count(BUY) / samples
+        self.assertAlmostEqual(population_buys, 0.5, delta=0.02)
+        self.assertAlmostEqual(trader_buys, 0.5, delta=0.02)
+
+        for side in (BUY, SELL):
+            population_prices = prices(population_orders, side)
+            trader_prices = prices(trader_orders, side)
+            # Median price of 105, deviation of 10
+            self.assertEqual(min(population_prices), 95)
+            self.assertEqual(max(population_prices), 115)
+            self.assertEqual(min(trader_prices), 95)
+            self.assertEqual(max(trader_prices), 115)
+            self.assertLess(
+                distance(population_prices, trader_prices), 0.05
+            )
+            self.assertLess(
+                distance(
+                    amounts(population_orders, side),
+                    amounts(trader_orders, side),
+                ),
+                0.05,
+            )
+            self.assertAlmostEqual(
+                numpy.mean(amounts(population_orders, side)),
+                numpy.mean(amounts(trader_orders, side)),
+                delta=0.1,
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
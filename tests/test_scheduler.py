@@ -0,0 +1,64 @@
+import asyncio
+import unittest
+
+from async_exchange import virtual_time
+from async_exchange.scheduler import AgentScheduler
+
+
+class Agent:
+    def __init__(self, name, delays, log):
+        self.name = name
+        self.delays = list(delays)
+        self.log = log
+
+    def step(self):
+        self.log.append(self.name)
+        return self.delays.pop(0) if self.delays else None
+
+
+class TestAgentScheduler(unittest.TestCase):
+    def setUp(self):
+        self.log = []
+        self.scheduler = AgentScheduler()
+
+    def test_run_until(self):
+        self.scheduler.add(Agent("a", [2, 2], self.log))
+        self.scheduler.add(Agent("b", [3], self.log), delay=1)
+
+        self.assertEqual(self.scheduler.run_until(0), 1)
+        self.assertEqual(self.log, ["a"])
+        self.assertEqual(self.scheduler.next_wake_up, 1)
+
+        self.assertEqual(self.scheduler.run_until(10), 4)
+        # a: 0, 2, 4; b: 1, 4, rescheduled before a
+        self.assertEqual(self.log, ["a", "b", "a", "b", "a"])
+        self.assertEqual(len(self.scheduler), 0)
+        self.assertIsNone(self.scheduler.next_wake_up)
+        self.assertEqual(self.scheduler.time, 10)
+
+    def test_ties_keep_the_scheduling_order(self):
+        for name in "abc":
+            self.scheduler.add(Agent(name, [], self.log), delay=1)
+        self.scheduler.run_until(1)
+        self.assertEqual(self.log, ["a", "b", "c"])
+
+    def test_add_from_current_time(self):
+        self.scheduler.run_until(5)
+        self.scheduler.add(Agent("a", [], self.log), delay=1)
+        self.assertEqual(self.scheduler.next_wake_up, 6)
+
+    def test_run_on_event_loop(self):
+        wake_ups = []
+
+        class TimedAgent:
+            def step(self):
+                wake_ups.append(asyncio.get_running_loop().time())
+                return 1.5 if len(wake_ups) < 4 else None
+
+        self.scheduler.add(TimedAgent(), delay=1)
+        virtual_time.run(self.scheduler.run())
+        self.assertEqual(wake_ups, [1.0, 2.5, 4.0, 5.5])
+
+
+if __name__ == "__main__":
+    unittest.main()
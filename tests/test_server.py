@@ -0,0 +1,209 @@
+import asyncio
+import multiprocessing
+import os
+import socket
+import tempfile
+import threading
+import unittest
+
+from async_exchange.exchange import Fill
+from async_exchange.orders import BUY, SELL, BuyOrder, SellOrder
+from async_exchange.server import (
+    _COMMAND,
+    _ID,
+    _LENGTH,
+    ORDERBOOK,
+    ExchangeClient,
+    ExchangeServer,
+    RemoteExchangeError,
+)
+from async_exchange.trader import Trader
+
+
+def run_agent(path, side, prices):
+    client = ExchangeClient(path, pipeline_depth=4)
+    trader = Trader(money=1000, stocks=100)
+    client.register_trader(trader)
+    for price in prices:
+        if side == BUY:
+            trader.buy(1, price)
+        else:
+            trader.sell(1, price)
+    client.shutdown()
+
+
+class TestExchangeServer(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "exchange.sock")
+
+        self.server = ExchangeServer(self.path)
+        loop = asyncio.new_event_loop()
+        started = threading.Event()
+        task = loop.create_task(self.server.serve(started))
+        # Tasks left running when the server stopped
+        leaked_tasks = []
+
+        def run():
+            try:
+                loop.run_until_complete(task)
+            except asyncio.CancelledError:
+                pass
+            leaked_tasks.extend(asyncio.all_tasks(loop))
+            loop.close()
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        started.wait()
+
+        def stop():
+            loop.call_soon_threadsafe(task.cancel)
+            thread.join()
+            self.assertEqual(leaked_tasks, [])
+
+        self.addCleanup(stop)
+
+        self.client = ExchangeClient(self.path)
+        self.addCleanup(self.client.shutdown)
+        self.buyer = Trader(money=100, stocks=0)
+        self.seller = Trader(money=0, stocks=10)
+        self.client.register_trader(self.buyer)
+        self.client.register_trader(self.seller)
+
+    def test_exchange(self):
+        self.seller.sell(4, 5)
+        self.buyer.buy(3, 6)
+        self.client.sync()
+
+        self.assertEqual(self.buyer.money, 100 - 3 * 5)
+        self.assertEqual(self.buyer.stocks, 3)
+        self.assertEqual(self.client.get_orderbook(), ({}, {5: 1}))
+        # The seller's order was filled by another trader
+        self.assertEqual(self.seller.money, 0)
+        self.client.update_balance(self.seller)
+        self.assertEqual(self.seller.money, 15)
+        self.assertEqual(self.seller.stocks, 7)
+        self.assertEqual(self.client.last_trade(), (5, 3))
+
+    def test_process_orders(self):
+        sell_order = SellOrder(self.seller, 2, 5)
+        buy_order = BuyOrder(self.buyer, 3, 5)
+        fills = self.client.process_orders([sell_order, buy_order])
+
+        self.assertEqual(fills, [Fill(buy_order.id, sell_order.id, 5, 2)])
+        self.assertEqual(self.client.best_bid_ask(), (5, None))
+
+    def test_pipelined_order_ids(self):
+        orders = [BuyOrder(self.buyer, 1, price) for price in (1, 2, 3)]
+        for order in orders:
+            self.client.process_order(order)
+        self.assertIsNone(orders[0].id)
+
+        self.assertTrue(self.client.cancel_order(orders[0]))
+        self.assertEqual(len({order.id for order in orders}), 3)
+        self.assertEqual(self.client.get_orderbook(), ({2: 1, 3: 1}, {}))
+
+    def test_standing_orders_amend_cancel_all(self):
+        self.buyer.buy(2, 5)
+        self.seller.sell(3, 7)
+
+        (buy_order,), () = self.buyer.standing_orders
+        self.assertEqual((buy_order.amount, buy_order.price), (2, 5))
+        self.assertTrue(self.buyer.amend_order(buy_order, 1))
+        self.assertEqual(self.client.get_orderbook(), ({5: 1}, {7: 3}))
+
+        self.assertTrue(self.seller.cancel_all_orders())
+        self.assertEqual(self.client.get_orderbook(depth=1), ({5: 1}, {}))
+        order = SellOrder(self.seller, 1, 1)
+        self.assertFalse(self.client.cancel_order(order))
+
+    def test_other_traders_order(self):
+        self.buyer.buy(2, 5)
+        (buy_order,), () = self.buyer.standing_orders
+
+        client = ExchangeClient(self.path)
+        self.addCleanup(client.shutdown)
+        trader = Trader(money=100, stocks=0)
+        client.register_trader(trader)
+        order = BuyOrder(trader, 2, 5)
+        order._id = buy_order.id
+
+        self.assertFalse(client.cancel_order(order))
+        self.assertFalse(client.amend_order(order, 1))
+        self.assertEqual(self.client.get_orderbook(), ({5: 2}, {}))
+        self.assertEqual(trader.money, 100)
+
+    def test_float_prices(self):
+        self.buyer.buy(1, 5.5)
+        self.assertEqual(self.client.top_of_book().best_buy, 5.5)
+
+    def test_remote_error(self):
+        self.client.process_order(BuyOrder(self.buyer, 1, None))
+        with self.assertRaises(RemoteExchangeError), self.assertLogs(
+            "async_exchange.server"
+        ):
+            self.client.sync()
+        self.assertEqual(self.client.get_orderbook(), ({}, {}))
+
+    def test_no_market_data(self):
+        with self.assertRaises(TypeError):
+            self.buyer.exchange_api.subscribe()
+        self.assertFalse(self.client.unsubscribe(None))
+
+    def test_unregistered_trader(self):
+        with self.assertRaises(ValueError):
+            self.client.process_order(BuyOrder(Trader(), 1, 1))
+
+    def test_slow_reader(self):
+        trader = Trader(money=10 ** 6, stocks=0)
+        self.client.register_trader(trader)
+        trader.submit_many([(BUY, 1, price) for price in range(1, 1001)])
+        self.client.sync()
+
+        handled = []
+        handle_request = self.server.handle_request
+
+        def count_request(request):
+            handled.append(request)
+            return handle_request(request)
+
+        self.server.handle_request = count_request
+        request = _COMMAND.pack(ORDERBOOK) + _ID.pack(-1)
+        requests = 200000 * (_LENGTH.pack(len(request)) + request)
+
+        # A client pipelining requests without reading the replies
+        slow_client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        slow_client.connect(self.path)
+        slow_client.settimeout(0.5)
+        with self.assertRaises(socket.timeout):
+            slow_client.sendall(requests)
+        slow_client.close()
+
+        # The server stopped reading once its replies were not read
+        self.assertLess(len(handled), 1000)
+        self.assertEqual(len(self.client.get_orderbook()[0]), 1000)
+
+    def test_worker_processes(self):
+        context = multiprocessing.get_context("fork")
+        processes = [
+            context.Process(
+                target=run_agent, args=(self.path, BUY, range(1, 11))
+            ),
+            context.Process(
+                target=run_agent, args=(self.path, SELL, range(21, 31))
+            ),
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+            self.assertEqual(process.exitcode, 0)
+
+        buy_levels, sell_levels = self.client.get_orderbook()
+        self.assertEqual(buy_levels, {price: 1 for price in range(1, 11)})
+        self.assertEqual(sell_levels, {price: 1 for price in range(21, 31)})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,209 @@
+import os
+import tempfile
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from async_exchange.exchange import Exchange, Fill
+from async_exchange.orders import BuyOrder, SellOrder
+from async_exchange.snapshot import Snapshot
+from async_exchange.trader import Trader
+
+if numpy is not None:
+    from async_exchange.array_exchange import ArrayExchange
+
+
+class TestSnapshot(unittest.TestCase):
+    exchange_class = Exchange
+    restore_class = Exchange
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "book.snapshot")
+
+        self.exchange = self.exchange_class()
+        self.traders = [Trader(money=1000, stocks=100) for _ in range(3)]
+        for trader in self.traders:
+            self.exchange.register_trader(trader)
+        first, second, third = self.traders
+
+        first.buy(2, 10)
+        second.buy(3, 10)
+        first.buy(1, 9)
+        third.sell(4, 12)
+        first.sell(1, 12)
+        # Loses its time priority at the price level
+        self.order = SellOrder(second, 1, 12)
+        second.exchange_api.process_order(self.order)
+        third.sell(1, 10)
+        self.exchange.amend_order(third.standing_orders[1][0], 6)
+
+    def restore(self, traders=()):
+        self.exchange.snapshot(self.path, traders=traders)
+        return self.restore_class.restore(self.path, traders=traders)
+
+    def test_round_trip(self):
+        restored = self.restore()
+
+        self.assertEqual(
+            restored.get_orderbook(), self.exchange.get_orderbook()
+        )
+        self.assertEqual(
+            [
+                (order.id, order.amount, order.owner.money)
+                for order in restored.sell_levels[12]
+            ],
+            [
+                (order.id, order.amount, order.owner.money)
+                for order in self.exchange.sell_levels[12]
+            ],
+        )
+        self.assertEqual(restored.last_trade(), (10, 1))
+        self.assertEqual(restored.best_bid_ask(), (10, 12))
+
+    def test_fifo_and_ids(self):
+        restored = self.restore()
+        trader = Trader(money=1000, stocks=100)
+        restored.register_trader(trader)
+
+        fills = restored.process_orders([BuyOrder(trader, 8, 12)])
+        sell_ids = [order.id for order in self.exchange.sell_levels[12]]
+        self.assertEqual(
+            fills,
+            [
+                Fill(8, sell_ids[0], 12, 1),
+                Fill(8, sell_ids[1], 12, 1),
+                Fill(8, sell_ids[2], 12, 6),
+            ],
+        )
+
+    def test_balances(self):
+        first, second, third = self.traders
+        extra = Trader(money=5, stocks=6)
+        restored = self.restore(traders=[first, extra])
+
+        owners = {order.owner for order in restored.buy_levels[10]}
+        self.assertIn(first, owners)
+        (restored_second,) = owners - {first}
+        self.assertIsNot(restored_second, second)
+        self.assertEqual(restored_second.money, second.money)
+        self.assertEqual(restored_second.stocks, second.stocks)
+
+        self.assertIs(first.exchange_api.process_order.__self__, restored)
+        self.assertIsNotNone(extra.exchange_api)
+        self.assertEqual(extra.money, 5)
+        self.assertEqual(
+            [
+                [order.id for order in orders]
+                for orders in restored.standing_orders(first)
+            ],
+            [[1, 3], [5]],
+        )
+
+    def test_cancel_restored(self):
+        restored = self.restore()
+        self.assertTrue(restored.cancel_order(self.order))
+        self.assertFalse(restored.cancel_order(self.order))
+        self.assertEqual(restored.get_orderbook()[1], {12: 7})
+
+    def test_trade_after_restore(self):
+        first = self.traders[0]
+        restored = self.restore(traders=[first])
+        buy_orders, sell_orders = restored.standing_orders(first)
+
+        self.assertTrue(restored.cancel_order(buy_orders[0]))
+        # Reuses the slot of the cancelled order in an ArrayExchange
+        first.buy(1, 8)
+        self.assertFalse(restored.cancel_order(buy_orders[0]))
+        self.assertEqual(
+            [
+                [order.id for order in orders]
+                for orders in restored.standing_orders(first)
+            ],
+            [[3, 8], [5]],
+        )
+
+        self.assertEqual(restored.cancel_all(first), 3)
+        self.assertEqual(restored.standing_orders(first), ((), ()))
+        self.assertEqual(restored.get_orderbook(), ({10: 3}, {12: 7}))
+        self.assertFalse(restored.cancel_order(sell_orders[0]))
+
+    def test_new_trader_after_restore(self):
+        first = self.traders[0]
+        restored = self.restore(traders=[first])
+        self.assertEqual(len(restored.standing_orders(first)[0]), 2)
+
+        trader = Trader(money=1000, stocks=100)
+        restored.register_trader(trader)
+        trader.sell(3, 11)
+        self.assertEqual(
+            [order.amount for order in restored.standing_orders(trader)[1]],
+            [3],
+        )
+        self.assertEqual(restored.cancel_all(trader), 1)
+        self.assertEqual(restored.standing_orders(trader), ((), ()))
+        self.assertTrue(trader.cancel_all_orders())
+
+    def test_empty(self):
+        exchange = self.exchange_class()
+        exchange.snapshot(self.path)
+        restored = self.restore_class.restore(self.path)
+        self.assertEqual(restored.get_orderbook(), ({}, {}))
+        self.assertEqual(restored.last_trade(), (None, None))
+
+    def test_truncated(self):
+        self.exchange.snapshot(self.path)
+        with open(self.path, "r+b") as file:
+            file.truncate(os.path.getsize(self.path) - 1)
+
+        with self.assertRaises(ValueError):
+            self.restore_class.restore(self.path)
+
+    def test_float_prices(self):
+        if self.exchange_class is not Exchange:
+            self.skipTest("Float prices need the object order book")
+        trader = Trader(money=1000, stocks=10)
+        self.exchange.register_trader(trader)
+        trader.sell(1, 12.5)
+        self.exchange.snapshot(self.path)
+
+        with Snapshot(self.path) as snapshot:
+            self.assertEqual(snapshot.orders["price"].format, "d")
+        restored = Exchange.restore(self.path)
+        self.assertEqual(restored.get_orderbook()[1][12.5], 1)
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class TestArraySnapshot(TestSnapshot):
+    exchange_class = ArrayExchange if numpy is not None else None
+    restore_class = exchange_class
+
+    def test_float_prices_rejected(self):
+        exchange = Exchange()
+        trader = Trader(money=1000, stocks=10)
+        exchange.register_trader(trader)
+        trader.sell(1, 12.5)
+        exchange.snapshot(self.path)
+
+        with self.assertRaises(TypeError):
+            ArrayExchange.restore(self.path)
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class TestSnapshotAcrossEngines(TestSnapshot):
+    exchange_class = Exchange
+    restore_class = ArrayExchange if numpy is not None else None
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class TestSnapshotAcrossEnginesBack(TestSnapshot):
+    exchange_class = ArrayExchange if numpy is not None else None
+    restore_class = Exchange
+
+
+if __name__ == "__main__":
+    unittest.main()
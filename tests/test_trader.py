@@ -1,6 +1,7 @@
 import unittest
 
 from async_exchange.exchange import Exchange
+from async_exchange.orders import BUY, SELL
 from async_exchange.trader import (
     Trader,
     NotEnoughMoneyError,
@@ -80,6 +81,19 @@ class TestTrader(unittest.TestCase):
         buy_order, = self.exchange.buy_levels[12]
         self.assertIs(self.trader, buy_order.owner)
 
+    def test_submit_many(self):
+        fills = self.trader.submit_many([(BUY, 2, 5), (SELL, 3, 7)])
+        self.assertEqual(fills, [])
+
+        buy_orders, sell_orders = self.trader.standing_orders
+        self.assertEqual([order.amount for order in buy_orders], [2])
+        self.assertEqual([order.price for order in sell_orders], [7])
+
+        other_trader = Trader(exchange_api=self.exchange.api)
+        (fill,) = other_trader.submit_many([(SELL, 1, 5)])
+        self.assertEqual(fill.buy_order_id, buy_orders[0].id)
+        self.assertEqual(fill.amount, 1)
+
     def test_standing_orders(self):
         buy_orders, sell_orders = self.trader.standing_orders
         self.assertEqual(len(buy_orders), 0)
@@ -167,6 +181,15 @@ class TestTrader(unittest.TestCase):
         self.assertIs(actual_buy_order_1, buy_order_1)
         self.assertIs(actual_sell_order_2, sell_order_2)
 
+    def test_amend_order(self):
+        self.trader.sell(amount=10, price=40)
+        _, (sell_order,) = self.trader.standing_orders
+
+        result = self.trader.amend_order(sell_order, 4)
+        self.assertTrue(result)
+        _, (sell_order,) = self.trader.standing_orders
+        self.assertEqual(sell_order.amount, 4)
+
     def test_cancel_all_orders(self):
         self.trader.sell(amount=10, price=40)
         self.trader.sell(amount=20, price=30)
@@ -1,11 +1,28 @@
+import asyncio
+import time
 import unittest
 from unittest import TestCase
 
+from async_exchange.algorithms.random_trader import RandomTrader
+from async_exchange.batch_auction import BatchAuctionExchange
 from async_exchange.exchange import Exchange
 from async_exchange.trader import Trader
 from async_exchange.trading_session import TradingSession
 
 
+class SleepingTrader(Trader):
+    def __init__(self, interval, **kwargs):
+        super().__init__(**kwargs)
+        self.interval = interval
+        self.wake_ups = []
+
+    async def cycle(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.interval)
+            self.wake_ups.append(loop.time())
+
+
 class TestTradingSession(TestCase):
     def setUp(self):
         traders = [Trader()]
@@ -28,6 +45,49 @@ class TestTradingSession(TestCase):
         self.assertIsInstance(trading_session.exchange, Exchange)
         self.assertIsNone(trading_session.exchange._logger)
 
+    def test_init_auction_interval(self):
+        trading_session = TradingSession(traders=[], auction_interval=0.1)
+        self.assertIsInstance(
+            trading_session.exchange, BatchAuctionExchange
+        )
+
+        with self.assertRaises(TypeError):
+            TradingSession(traders=[], exchange=Exchange(), auction_interval=1)
+
+    def test_virtual_time(self):
+        traders = [SleepingTrader(interval=10), SleepingTrader(interval=25)]
+        trading_session = TradingSession(traders=traders, virtual_time=True)
+
+        start = time.perf_counter()
+        trading_session.run(duration=100)
+        self.assertLess(time.perf_counter() - start, 1)
+
+        self.assertEqual(
+            traders[0].wake_ups, [10.0 * step for step in range(1, 10)]
+        )
+        self.assertEqual(traders[1].wake_ups, [25.0, 50.0, 75.0])
+
+    def test_virtual_time_random_traders(self):
+        traders = [RandomTrader(money=300, stocks=10) for _ in range(10)]
+        trading_session = TradingSession(traders=traders, virtual_time=True)
+        trading_session.run(duration=60)
+
+        # Each trader sleeps 0.5 s on average
+        self.assertGreater(trading_session.exchange.top_of_book().version, 600)
+
+    def test_scheduler(self):
+        traders = [RandomTrader(money=300, stocks=10) for _ in range(10)]
+        sleeping_trader = SleepingTrader(interval=10)
+        trading_session = TradingSession(
+            traders=traders + [sleeping_trader],
+            virtual_time=True,
+            use_scheduler=True,
+        )
+        trading_session.run(duration=60)
+
+        self.assertGreater(trading_session.exchange.top_of_book().version, 600)
+        self.assertEqual(len(sleeping_trader.wake_ups), 5)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,96 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from async_exchange import virtual_time
+
+
+class TestVirtualTime(unittest.TestCase):
+    def test_sleep_advances_the_clock(self):
+        async def main():
+            loop = asyncio.get_running_loop()
+            await asyncio.sleep(3600)
+            return loop.time()
+
+        start = time.perf_counter()
+        self.assertEqual(virtual_time.run(main(), start_time=10), 3610)
+        self.assertLess(time.perf_counter() - start, 1)
+
+    def test_wake_up_order(self):
+        wake_ups = []
+
+        async def sleeper(delay):
+            await asyncio.sleep(delay)
+            wake_ups.append(delay)
+
+        async def main():
+            await asyncio.gather(*(sleeper(delay) for delay in (3, 1, 2)))
+
+        virtual_time.run(main())
+        self.assertEqual(wake_ups, [1, 2, 3])
+
+    def test_call_at_order(self):
+        calls = []
+
+        async def main():
+            loop = asyncio.get_running_loop()
+            for when in (5, 2, 8, 2):
+                loop.call_at(when, lambda: calls.append(loop.time()))
+            await asyncio.sleep(10)
+
+        virtual_time.run(main())
+        self.assertEqual(calls, [2, 2, 5, 8])
+
+    def test_run(self):
+        cancelled = []
+        loops = []
+
+        async def background():
+            try:
+                await asyncio.sleep(100)
+            except asyncio.CancelledError:
+                cancelled.append(asyncio.get_running_loop().time())
+                raise
+
+        async def main():
+            loop = asyncio.get_running_loop()
+            loops.append(loop)
+            asyncio.ensure_future(background())
+            thread = await loop.run_in_executor(
+                None, threading.current_thread
+            )
+            await asyncio.sleep(1)
+            return thread
+
+        executor_thread = virtual_time.run(main())
+        # The pending tasks are cancelled, the default executor is shut
+        # down, and the loop is closed
+        self.assertEqual(cancelled, [1])
+        self.assertFalse(executor_thread.is_alive())
+        (loop,) = loops
+        self.assertIsInstance(loop, virtual_time.VirtualTimeEventLoop)
+        self.assertTrue(loop.is_closed())
+
+    def test_run_error(self):
+        async def main():
+            await asyncio.sleep(1)
+            raise ValueError("main")
+
+        with self.assertRaisesRegex(ValueError, "main"):
+            virtual_time.run(main())
+
+    def test_executor_stops_the_clock(self):
+        async def main():
+            loop = asyncio.get_running_loop()
+            sleeper = asyncio.ensure_future(asyncio.sleep(1))
+            await loop.run_in_executor(None, time.sleep, 0.05)
+            now = loop.time()
+            await sleeper
+            return now, loop.time()
+
+        self.assertEqual(virtual_time.run(main()), (0, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()